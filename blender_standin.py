@@ -0,0 +1,575 @@
+import math
+import os
+import sys
+import types
+
+import numpy as np
+
+'''Lightweight stand-in for the parts of bpy, bmesh and mathutils that procedural_content_generation.py uses, so the
+add-on can be imported and run (e.g. by creature_benchmark.py) with plain CPython. Mesh data is stored in NumPy arrays
+the way foreach_set copies it into Blender, but nothing is evaluated: there is no depsgraph, matrix_world stays the
+identity and property update callbacks are not called. Timings taken with the stand-in measure the Python side of the
+generator only.'''
+
+class Vector:
+    '''3D vector with the arithmetic the generator uses.'''
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self.values = [float(value) for value in values]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __setitem__(self, index, value):
+        self.values[index] = float(value)
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __mul__(self, scale):
+        return Vector(a * scale for a in self)
+
+    def __repr__(self):
+        return f"Vector(({', '.join(f'{value:.4f}' for value in self)}))"
+
+    x = property(lambda self: self.values[0])
+    y = property(lambda self: self.values[1])
+    z = property(lambda self: self.values[2])
+
+class Matrix:
+    '''4x4 matrix backed by a NumPy array.'''
+
+    def __init__(self, rows=None):
+        self.array = np.identity(4) if rows is None else np.array(rows, dtype=np.float64)
+
+    def identity(self):
+        self.array = np.identity(4)
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self.array @ other.array)
+        return Vector(self.array[:3, :3] @ np.asarray(list(other), dtype=np.float64) + self.array[:3, 3])
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+'''Rotation matrix of XYZ Euler angles in radians.'''
+def euler_to_matrix(x, y, z):
+    cx, sx, cy, sy, cz, sz = math.cos(x), math.sin(x), math.cos(y), math.sin(y), math.cos(z), math.sin(z)
+    return (np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]]) @ np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+            @ np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]]))
+
+class Euler(list):
+    '''XYZ Euler rotation.'''
+
+    def __init__(self, angles=(0.0, 0.0, 0.0), order='XYZ'):
+        super().__init__(float(angle) for angle in angles)
+        self.order = order
+
+    '''Rotate around one of the object's own axes, as Euler.rotate_axis does in Blender.'''
+    def rotate_axis(self, axis, angle):
+        rotation = euler_to_matrix(*[angle if name == axis else 0.0 for name in "XYZ"])
+        matrix = euler_to_matrix(*self) @ rotation
+        self[:] = [math.atan2(matrix[2, 1], matrix[2, 2]), math.asin(max(-1.0, min(1.0, -matrix[2, 0]))),
+                   math.atan2(matrix[1, 0], matrix[0, 0])]
+
+class MeshElements:
+    '''Vertices, loops or polygons of a mesh: a length and the attribute arrays set with foreach_set.'''
+
+    def __init__(self):
+        self.count = 0
+        self.attributes = {}
+
+    def __len__(self):
+        return self.count
+
+    def add(self, count):
+        self.count += count
+
+    def foreach_set(self, attribute, values):
+        self.attributes[attribute] = np.array(values)
+
+    def foreach_get(self, attribute, values):
+        values[:] = self.attributes[attribute].ravel()
+
+class ID:
+    '''Named datablock. Names are kept unique within the collection the datablock belongs to.'''
+
+    def __init__(self, name):
+        self.owner = None
+        self.id_name = name
+        self.users = 0
+        self.properties = {}
+
+    @property
+    def name(self):
+        return self.id_name
+
+    @name.setter
+    def name(self, name):
+        self.id_name = self.owner.rename(self, name) if self.owner is not None else name
+
+    def __getitem__(self, key):
+        return self.properties[key]
+
+    def __setitem__(self, key, value):
+        self.properties[key] = value
+
+    def __contains__(self, key):
+        return key in self.properties
+
+    def get(self, key, default=None):
+        return self.properties.get(key, default)
+
+    def pop(self, key, default=None):
+        return self.properties.pop(key, default)
+
+class MaterialSlots(list):
+    '''Material slots of a mesh, counting the users of the materials like Blender.'''
+
+    def append(self, material):
+        material.users += 1
+        super().append(material)
+
+    def __setitem__(self, index, material):
+        self[index].users -= 1
+        material.users += 1
+        super().__setitem__(index, material)
+
+    def clear(self):
+        for material in self:
+            material.users -= 1
+        super().clear()
+
+class UVLayer:
+    def __init__(self, name):
+        self.name = name
+        self.data = MeshElements()
+
+class UVLayers(list):
+    def new(self, name="UVMap"):
+        self.append(UVLayer(name))
+        return self[-1]
+
+    def get(self, name, default=None):
+        return next((layer for layer in self if layer.name == name), default)
+
+class Mesh(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.materials = MaterialSlots()
+        self.clear_geometry()
+
+    '''Remove the geometry and, like Blender, the layers stored with it such as UV maps and custom normals.'''
+    def clear_geometry(self):
+        self.vertices = MeshElements()
+        self.loops = MeshElements()
+        self.polygons = MeshElements()
+        self.uv_layers = UVLayers()
+        self.custom_normals = None
+
+    def update(self, calc_edges=False):
+        pass
+
+    def normals_split_custom_set_from_vertices(self, normals):
+        self.custom_normals = np.array(normals, dtype=np.float32).reshape(-1, 3)
+
+class VertexGroup:
+    '''Vertex group of an object. The (indices, weight) of every add call are kept as given rather than per vertex.'''
+
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+        self.assignments = []
+
+    def add(self, index, weight, type):
+        self.assignments.append((index, weight))
+
+class VertexGroups(list):
+    def new(self, name="Group"):
+        self.append(VertexGroup(name, len(self)))
+        return self[-1]
+
+    def get(self, name, default=None):
+        return next((group for group in self if group.name == name), default)
+
+class Modifier:
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.object = None
+
+class Modifiers(list):
+    def new(self, name, type):
+        self.append(Modifier(name, type))
+        return self[-1]
+
+    def get(self, name, default=None):
+        return next((modifier for modifier in self if modifier.name == name), default)
+
+class EditBone:
+    def __init__(self, name):
+        self.name = name
+        self.head = Vector()
+        self.tail = Vector()
+        self.parent = None
+        self.use_connect = False
+
+class EditBones(list):
+    def new(self, name):
+        self.append(EditBone(name))
+        return self[-1]
+
+class Armature(ID):
+    '''Armature data. Its bones are only reachable as edit_bones, which Blender only allows in edit mode.'''
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.bones = EditBones()
+
+    @property
+    def edit_bones(self):
+        if MODE.object is None or MODE.object.data is not self or MODE.mode != 'EDIT':
+            raise RuntimeError("edit_bones are only available in edit mode")
+        return self.bones
+
+class Object(ID):
+    def __init__(self, name, data=None):
+        super().__init__(name)
+        self.mesh = None
+        self.data = data
+        self.type = 'EMPTY' if data is None else 'ARMATURE' if isinstance(data, Armature) else 'MESH'
+        self.vertex_groups = VertexGroups()
+        self.modifiers = Modifiers()
+        self.parent = None
+        self.location = Vector()
+        self.rotation_euler = Euler()
+        self.matrix_basis = Matrix()
+        self.matrix_parent_inverse = Matrix()
+        self.matrix_world = Matrix()
+        self.hide_viewport = False
+        self.hide_render = False
+        self.users_collection = []
+
+    @property
+    def data(self):
+        return self.mesh
+
+    @data.setter
+    def data(self, mesh):
+        if self.mesh is not None:
+            self.mesh.users -= 1
+        self.mesh = mesh
+        if mesh is not None:
+            mesh.users += 1
+
+    '''Size of the bounding box of the mesh, without scale.'''
+    @property
+    def dimensions(self):
+        coords = self.data.vertices.attributes.get("co") if self.data is not None else None
+        if coords is None or len(coords) == 0:
+            return Vector()
+        coords = coords.reshape(-1, 3)
+        return Vector(coords.max(axis=0) - coords.min(axis=0))
+
+    def select_set(self, state):
+        pass
+
+class Socket:
+    def __init__(self):
+        self.default_value = None
+
+class Node:
+    def __init__(self, node_type):
+        self.bl_idname = node_type
+        self.location = (0, 0)
+        self.texture = None
+        self.inputs = SocketMap()
+        self.outputs = SocketMap()
+
+    '''Image of an image texture node, counting the users of the image.'''
+    @property
+    def image(self):
+        return self.texture
+
+    @image.setter
+    def image(self, image):
+        if self.texture is not None:
+            self.texture.users -= 1
+        self.texture = image
+        if image is not None:
+            image.users += 1
+
+class SocketMap(dict):
+    def __missing__(self, key):
+        self[key] = Socket()
+        return self[key]
+
+class Nodes(list):
+    def new(self, type):
+        node = Node(type)
+        self.append(node)
+        return node
+
+class Links(list):
+    def new(self, output, input):
+        self.append((output, input))
+        return self[-1]
+
+class Material(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.use_nodes = False
+        self.node_tree = types.SimpleNamespace(nodes=Nodes(), links=Links())
+
+class Image(ID):
+    def __init__(self, name, filepath=""):
+        super().__init__(name)
+        self.filepath = filepath
+
+    def reload(self):
+        pass
+
+class DataCollection:
+    '''bpy.data.<collection>: datablocks of one type, by name.'''
+
+    def __init__(self, id_type):
+        self.id_type = id_type
+        self.items = {}
+        # Next free number of every base name, so numbering a name does not scan every earlier copy
+        self.next_number = {}
+
+    def unique_name(self, name, item=None):
+        unique, number = name, self.next_number.get(name, 1)
+        while self.items.get(unique, item) is not item:
+            unique, number = f"{name}.{number:03d}", number + 1
+        if unique != name:
+            self.next_number[name] = number
+        return unique
+
+    def new(self, name, *args):
+        item = self.id_type(self.unique_name(name), *args)
+        item.owner = self
+        self.items[item.id_name] = item
+        return item
+
+    '''Keep the index by name up to date when an item is renamed.'''
+    def rename(self, item, name):
+        del self.items[item.id_name]
+        name = self.unique_name(name, item)
+        self.items[name] = item
+        return name
+
+    def remove(self, item, do_unlink=True):
+        del self.items[item.id_name]
+        item.owner = None
+        if isinstance(item, Object):
+            item.data = None
+            for collection in item.users_collection:
+                collection.objects.unlink(item)
+        elif isinstance(item, Collection):
+            for obj in list(item.objects):
+                item.objects.unlink(obj)
+            for parent in [scene.collection for scene in DATA.scenes] + list(DATA.collections):
+                parent.children.unlink(item)
+        elif isinstance(item, Mesh):
+            item.materials.clear()
+        elif isinstance(item, Material):
+            for node in item.node_tree.nodes:
+                node.image = None
+
+    def get(self, name, default=None):
+        return self.items.get(name, default)
+
+    def keys(self):
+        return list(self.items)
+
+    def __iter__(self):
+        return iter(list(self.items.values()))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, name):
+        item = self.get(name)
+        if item is None:
+            raise KeyError(name)
+        return item
+
+class ImageCollection(DataCollection):
+    '''bpy.data.images, where load fails like Blender for files that cannot be read.'''
+
+    def load(self, filepath, check_existing=False):
+        if check_existing:
+            existing = next((image for image in self if image.filepath == filepath), None)
+            if existing is not None:
+                return existing
+        if not os.path.isfile(filepath):
+            raise RuntimeError(f'Error: Cannot read image file "{filepath}"')
+        image = self.new(os.path.basename(filepath), filepath)
+        return image
+
+class LinkedObjects:
+    '''Objects or child collections linked to a collection, in link order.'''
+
+    def __init__(self, collection, track_users=False):
+        self.collection = collection
+        self.track_users = track_users
+        self.items = {}
+
+    def link(self, item):
+        if id(item) not in self.items:
+            self.items[id(item)] = item
+            if self.track_users:
+                item.users_collection.append(self.collection)
+
+    def unlink(self, item):
+        if self.items.pop(id(item), None) is not None and self.track_users:
+            item.users_collection.remove(self.collection)
+
+    def get(self, name, default=None):
+        return next((item for item in self.items.values() if item.name == name), default)
+
+    def __iter__(self):
+        return iter(list(self.items.values()))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return id(item) in self.items
+
+class Collection(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.objects = LinkedObjects(self, track_users=True)
+        self.children = LinkedObjects(self)
+
+    @property
+    def all_objects(self):
+        objects = list(self.objects)
+        for child in self.children:
+            objects += child.all_objects
+        return objects
+
+class Scene(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.collection = Collection("Scene Collection")
+
+    @property
+    def objects(self):
+        return self.collection.all_objects
+
+class Property:
+    '''Property definition made by bpy.props.*Property. A pointer property set on a class (like
+    bpy.types.Scene.creature_properties) creates its property group on first access.'''
+
+    DEFAULTS = {"FloatProperty": 0.0, "IntProperty": 0, "BoolProperty": False, "StringProperty": "",
+                "EnumProperty": None}
+
+    def __init__(self, kind, **options):
+        self.kind = kind
+        self.options = options
+
+    def default(self):
+        return self.options.get("default", self.DEFAULTS.get(self.kind))
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        name = next(name for cls in type(instance).__mro__ for name, value in vars(cls).items() if value is self)
+        group = self.options["type"]()
+        instance.__dict__[name] = group
+        return group
+
+class PropertyGroup:
+    '''Property group whose fields start at the defaults of their annotations.'''
+
+    def __getattr__(self, name):
+        for cls in type(self).__mro__:
+            definition = getattr(cls, "__annotations__", {}).get(name)
+            if isinstance(definition, Property):
+                value = definition.default()
+                setattr(self, name, value)
+                return value
+        raise AttributeError(name)
+
+DATA = types.SimpleNamespace()
+
+'''Object in edit mode, set by bpy.ops.object.mode_set on the active object.'''
+MODE = types.SimpleNamespace(object=None, mode='OBJECT')
+
+'''Build the stand-in modules with an empty scene. Returns (bpy, bmesh, mathutils).'''
+def create_modules():
+    bpy = types.ModuleType("bpy")
+    DATA.objects = DataCollection(Object)
+    DATA.meshes = DataCollection(Mesh)
+    DATA.materials = DataCollection(Material)
+    DATA.images = ImageCollection(Image)
+    DATA.scenes = DataCollection(Scene)
+    DATA.collections = DataCollection(Collection)
+    DATA.armatures = DataCollection(Armature)
+    bpy.data = DATA
+
+    '''Remove several datablocks at once, like bpy.data.batch_remove.'''
+    def batch_remove(ids):
+        for item in list(ids):
+            if item.owner is not None:
+                item.owner.remove(item)
+    DATA.batch_remove = batch_remove
+    scene = DATA.scenes.new("Scene")
+    bpy.context = types.SimpleNamespace(scene=scene, collection=scene.collection,
+                                        view_layer=types.SimpleNamespace(objects=types.SimpleNamespace(active=None)))
+
+    registered_timers = []
+    bpy.app = types.SimpleNamespace(
+        version=(4, 1, 0), background=True,
+        timers=types.SimpleNamespace(register=lambda function, first_interval=0: registered_timers.append(function),
+                                     unregister=registered_timers.remove,
+                                     is_registered=lambda function: function in registered_timers))
+
+    '''Switch the active object between object and edit mode, like bpy.ops.object.mode_set.'''
+    def mode_set(mode='OBJECT'):
+        MODE.object = bpy.context.view_layer.objects.active if mode == 'EDIT' else None
+        MODE.mode = mode
+        return {'FINISHED'}
+    bpy.ops = types.SimpleNamespace(object=types.SimpleNamespace(mode_set=mode_set))
+    bpy.path = types.SimpleNamespace(abspath=lambda path: os.path.abspath(path) if path else path)
+
+    # Pointer properties are set on the Scene class like in Blender
+    bpy.types = types.SimpleNamespace(PropertyGroup=PropertyGroup, Panel=object, Operator=object, Scene=Scene)
+    property_kinds = ("FloatProperty", "IntProperty", "BoolProperty", "StringProperty", "EnumProperty",
+                      "PointerProperty")
+    bpy.props = types.SimpleNamespace(**{kind: (lambda kind: lambda **options: Property(kind, **options))(kind)
+                                         for kind in property_kinds})
+    bpy.utils = types.SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
+
+    bmesh = types.ModuleType("bmesh")
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = Vector
+    mathutils.Matrix = Matrix
+    mathutils.Euler = Euler
+    return bpy, bmesh, mathutils
+
+'''Use the stand-in unless the real bpy can be imported (e.g. inside blender --background). Returns the bpy module and
+True if it is the stand-in.'''
+def install():
+    try:
+        import bpy
+        return bpy, False
+    except ImportError:
+        bpy, bmesh, mathutils = create_modules()
+        sys.modules.update(bpy=bpy, bmesh=bmesh, mathutils=mathutils)
+        return bpy, True
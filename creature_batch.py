@@ -0,0 +1,170 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from creature_geometry import DEFAULT_PARAMS, iter_creature_objects
+from creature_export import EXPORT_FORMATS, write_creature
+
+'''Headless batch generation of creature libraries without Blender. A manifest lists one parameter set per creature
+with the same fields as CreatureProperties, the creatures are generated over a pool of worker processes and every
+creature is written to its own OBJ, PLY or binary glTF file.
+
+    python creature_batch.py creatures.json library/ --format glb --workers 8
+    python creature_batch.py creatures.csv library/ --benchmark 1,2,4,8
+
+A JSON manifest is a list of objects (or an object with a "creatures" list), a CSV manifest has one column per field.
+The optional "name" field names the output file, other missing fields take the panel defaults. Creatures whose file
+already exists in the output directory are skipped, so an interrupted run can be started again.'''
+
+'''Convert a manifest value to the type of the matching CreatureProperties field.'''
+def parse_value(field, value):
+    default = DEFAULT_PARAMS[field]
+    if isinstance(default, bool):
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+    if isinstance(default, int):
+        return int(float(value))
+    if isinstance(default, float):
+        return float(value)
+    return str(value)
+
+'''Read a JSON or CSV manifest into a list of (name, params) jobs.'''
+def load_manifest(path):
+    with open(path, newline="") as file:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(file))
+        else:
+            rows = json.load(file)
+            if isinstance(rows, dict):
+                rows = rows["creatures"]
+
+    jobs = []
+    for index, row in enumerate(rows):
+        name = str(row.get("name") or f"creature_{index:05d}")
+        params = {}
+        for field, value in row.items():
+            if field == "name" or value in ("", None):
+                continue
+            if field not in DEFAULT_PARAMS:
+                raise ValueError(f"{path}: unknown field '{field}' for creature '{name}'")
+            params[field] = parse_value(field, value)
+        jobs.append((name, params))
+    return jobs
+
+'''Generate one creature and write it to path. The objects are streamed from the generator into the writer one at a
+time, so a worker never holds more than one part. The file is written under a temporary name first so that a killed
+run never leaves a partial file that would be skipped when resuming. Returns the name, the vertex and face counts and
+the size of the file in bytes.'''
+def generate_job(name, params, path, file_format):
+    counts = [0, 0]
+
+    def counted(objects):
+        for object_name, verts, faces in objects:
+            counts[0] += len(verts)
+            counts[1] += len(faces)
+            yield object_name, verts, faces
+
+    temp_path = path + ".tmp"
+    write_creature(temp_path, counted(iter_creature_objects(params)), file_format)
+    os.replace(temp_path, path)
+    return name, counts[0], counts[1], os.path.getsize(path)
+
+'''Print a progress line, rewriting the same line when stderr is a terminal.'''
+def report_progress(done, total, name, start_time, num_bytes):
+    elapsed = time.perf_counter() - start_time
+    rate = done / elapsed if elapsed > 0 else 0.0
+    megabytes = num_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    line = f"[{done}/{total}] {name}  {rate:.1f} creatures/s  {megabytes:.1f} MB/s"
+    if sys.stderr.isatty():
+        sys.stderr.write("\r" + line.ljust(79))
+        if done == total:
+            sys.stderr.write("\n")
+    else:
+        sys.stderr.write(line + "\n")
+    sys.stderr.flush()
+
+'''Generate every job into output_dir over a pool of worker processes. Returns the number of generated and skipped
+creatures, the wall time, the total vertex and face counts and the bytes written.'''
+def run_batch(jobs, output_dir, file_format="glb", workers=None, resume=True, progress=True):
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    pending = []
+    skipped = 0
+    for name, params in jobs:
+        path = os.path.join(output_dir, f"{name}.{file_format}")
+        if resume and os.path.exists(path):
+            skipped += 1
+        else:
+            pending.append((name, params, path, file_format))
+
+    stats = {"generated": 0, "skipped": skipped, "verts": 0, "faces": 0, "bytes": 0, "workers": workers}
+    start_time = time.perf_counter()
+
+    def finished(result):
+        name, num_verts, num_faces, num_bytes = result
+        stats["generated"] += 1
+        stats["verts"] += num_verts
+        stats["faces"] += num_faces
+        stats["bytes"] += num_bytes
+        if progress:
+            report_progress(stats["generated"], len(pending), name, start_time, stats["bytes"])
+
+    if workers == 1:
+        for job in pending:
+            finished(generate_job(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(generate_job, *job) for job in pending]
+            for future in as_completed(futures):
+                finished(future.result())
+
+    stats["seconds"] = time.perf_counter() - start_time
+    return stats
+
+'''Generate the whole manifest once per worker count into a temporary directory and print the throughput of each run.'''
+def benchmark(jobs, file_format, worker_counts):
+    print(f"{'workers':>7} {'seconds':>9} {'creatures/s':>12} {'MB/s':>8} {'per worker':>11} {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as output_dir:
+            stats = run_batch(jobs, output_dir, file_format, workers, resume=False, progress=False)
+        rate = stats["generated"] / stats["seconds"]
+        baseline = baseline or rate
+        megabytes = stats["bytes"] / (1024 * 1024) / stats["seconds"]
+        print(f"{workers:>7} {stats['seconds']:>9.2f} {rate:>12.2f} {megabytes:>8.1f} {rate / workers:>11.2f} "
+              f"{rate / baseline:>7.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a library of creatures from a JSON or CSV manifest.")
+    parser.add_argument("manifest", help="JSON or CSV file with one parameter set per creature")
+    parser.add_argument("output_dir", nargs="?", default="creatures", help="directory for the generated files")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="glb", help="output file format")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--no-resume", action="store_true", help="regenerate creatures whose file already exists")
+    parser.add_argument("--benchmark", metavar="COUNTS",
+                        help="comma separated worker counts to measure throughput for, e.g. 1,2,4,8")
+    args = parser.parse_args(argv)
+
+    jobs = load_manifest(args.manifest)
+
+    if args.benchmark:
+        benchmark(jobs, args.format, [int(count) for count in args.benchmark.split(",")])
+        return
+
+    stats = run_batch(jobs, args.output_dir, args.format, args.workers, resume=not args.no_resume)
+    rate = stats["generated"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    megabytes = stats["bytes"] / (1024 * 1024)
+    print(f"Generated {stats['generated']} creatures ({stats['skipped']} already written) with {stats['workers']} "
+          f"workers in {stats['seconds']:.2f} s: {rate:.2f} creatures/s, "
+          f"{stats['verts']} vertices, {stats['faces']} faces, {megabytes:.1f} MB "
+          f"({megabytes / stats['seconds'] if stats['seconds'] > 0 else 0.0:.1f} MB/s).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import blender_standin
+
+'''Benchmark of the Blender generator. Every create_* function and the whole Generate Creature operator are run over a
+sweep of num_verts, body length, num_legs and num_wings, recording the wall time, the peak memory and the number of
+vertices and faces made. Outside Blender the add-on runs against the stand-in of blender_standin.py, inside Blender
+against the real bpy:
+
+    python creature_benchmark.py --output baseline.json
+    blender --background --python creature_benchmark.py -- --output baseline.json
+    python creature_benchmark.py --compare baseline.json
+
+Results are written as JSON; --compare runs the benchmark again and prints the change against a saved run, exiting
+with status 1 if any case got slower than --threshold times its baseline.'''
+
+BPY, STANDIN = blender_standin.install()
+
+import procedural_content_generation as pcg
+from creature_cache import PART_CACHE
+
+SWEEPS = {
+    "num_verts": (50, 100, 200, 400),
+    "length": (5.0, 10.0, 20.0),
+    "num_legs": (2, 4, 8),
+    "num_wings": (2, 4, 8),
+}
+
+QUICK_SWEEPS = {
+    "num_verts": (50, 100),
+    "length": (10.0,),
+    "num_legs": (4,),
+    "num_wings": (2,),
+}
+
+def run_body(num_verts=100, length=10.0):
+    pcg.create_body(length, 0.5, 1.5, 0.3, 50, num_verts)
+
+def run_neck(num_verts=100, length=3.5):
+    body = pcg.create_body(10.0, 0.5, 1.5, 0.3, 50)[0]
+    pcg.create_neck(body, (10.0, 0, 0), 0.5, length, 0.2, 'x', 0.1, 60, num_verts)
+
+def run_tail(num_verts=100, length=5.0):
+    body = pcg.create_body(10.0, 0.5, 1.5, 0.3, 50)[0]
+    pcg.create_tail(body, (0, 0, 0), 0.5, length, 0.01, 0.2, 50, num_verts)
+
+def run_head(num_verts=100):
+    body = pcg.create_body(10.0, 0.5, 1.5, 0.3, 50)[0]
+    pcg.create_and_attach_head(body, 3.5, (1.0, 1.0, 1.0), 2 * num_verts, num_verts)
+
+def run_legs(num_legs=4):
+    body = pcg.create_body(10.0, 0.5, 1.5, 0.3, 50)[0]
+    pcg.visualize_leg_points(body, num_legs, 0.0, 0.0, 1.5, 5.0, 0.5, 0.2, 0.2, 0.1)
+
+def run_wings(num_wings=2):
+    body = pcg.create_body(10.0, 0.5, 1.5, 0.3, 50)[0]
+    pcg.visualize_wing_points(body, num_wings, 0.1, 1.0, 10.0, 0.1, 2.0, 1.0)
+
+'''The Generate Creature button with every part, through the operator in Blender and its execute method outside.'''
+def run_generate(num_verts=100, length=10.0, num_legs=4, num_wings=2):
+    props = BPY.context.scene.creature_properties
+    for field, value in (("body_num_verts", num_verts), ("neck_num_verts", num_verts), ("tail_num_verts", num_verts),
+                         ("body_length", length), ("num_legs", num_legs), ("num_wings", num_wings),
+                         ("generate_legs", True), ("generate_wings", True), ("live_preview", False),
+                         ("incremental_regenerate", False)):
+        setattr(props, field, value)
+    if STANDIN:
+        pcg.OBJECT_OT_GenerateCreature.execute(None, BPY.context)
+    else:
+        BPY.ops.object.generate_creature()
+
+'''(case name, function, keyword arguments) for every case of the benchmark.'''
+def benchmark_cases(sweeps):
+    cases = []
+    for name, function in (("body", run_body), ("neck", run_neck), ("tail", run_tail)):
+        cases += [(f"{name} num_verts={n}", function, {"num_verts": n}) for n in sweeps["num_verts"]]
+    cases += [(f"body length={length}", run_body, {"length": length}) for length in sweeps["length"]]
+    cases += [(f"head num_rings={n}", run_head, {"num_verts": n}) for n in sweeps["num_verts"]]
+    cases += [(f"legs num_legs={n}", run_legs, {"num_legs": n}) for n in sweeps["num_legs"]]
+    cases += [(f"wings num_wings={n}", run_wings, {"num_wings": n}) for n in sweeps["num_wings"]]
+    cases += [(f"generate num_verts={n}", run_generate, {"num_verts": n}) for n in sweeps["num_verts"]]
+    cases += [(f"generate length={length}", run_generate, {"length": length}) for length in sweeps["length"]]
+    cases += [(f"generate num_legs={n}", run_generate, {"num_legs": n}) for n in sweeps["num_legs"]]
+    cases += [(f"generate num_wings={n}", run_generate, {"num_wings": n}) for n in sweeps["num_wings"]]
+    return cases
+
+'''Remove every object, collection, mesh and material that is not in keep, so every run starts from the same scene.'''
+def reset_scene(keep):
+    for obj in list(BPY.data.objects):
+        if obj not in keep:
+            BPY.data.objects.remove(obj, do_unlink=True)
+    for collection in list(BPY.data.collections):
+        if collection not in keep:
+            BPY.data.collections.remove(collection)
+    for collection in (BPY.data.meshes, BPY.data.materials, BPY.data.images):
+        for block in list(collection):
+            if block not in keep and block.users == 0:
+                collection.remove(block)
+
+'''Vertices and faces of every mesh object in the scene, counted once per object.'''
+def scene_counts():
+    objects = [obj for obj in BPY.data.objects if obj.type == 'MESH' and obj.data is not None]
+    return sum(len(obj.data.vertices) for obj in objects), sum(len(obj.data.polygons) for obj in objects)
+
+'''Run one case repeat times from an empty scene and a cold part cache. The memory peak is traced on an extra run, as
+tracing slows the code down.'''
+def run_case(function, kwargs, repeat):
+    keep = (set(BPY.data.objects) | set(BPY.data.collections) | set(BPY.data.meshes) | set(BPY.data.materials)
+            | set(BPY.data.images))
+    times = []
+    # One run that is not timed, so that lazy imports and allocations of a first call are not counted
+    for run in range(repeat + 1):
+        reset_scene(keep)
+        PART_CACHE.clear()
+        # The generator prints when no material file is set, which would flood the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function(**kwargs)
+            if run:
+                times.append(time.perf_counter() - start)
+    num_verts, num_faces = scene_counts()
+
+    reset_scene(keep)
+    PART_CACHE.clear()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(**kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    reset_scene(keep)
+
+    return {"params": kwargs, "seconds": statistics.median(times), "min_seconds": min(times),
+            "peak_mb": peak / (1024 * 1024), "verts": num_verts, "faces": num_faces}
+
+def run_benchmark(sweeps, repeat=5, progress=True):
+    if STANDIN:
+        pcg.register()
+    PART_CACHE.configure(directory=None)
+    results = {}
+    for name, function, kwargs in benchmark_cases(sweeps):
+        results[name] = run_case(function, kwargs, repeat)
+        if progress:
+            result = results[name]
+            sys.stderr.write(f"{name:<28} {result['seconds'] * 1000:>9.1f} ms {result['peak_mb']:>8.1f} MB "
+                             f"{result['verts']:>9} verts {result['faces']:>9} faces\n")
+    return {
+        "backend": "standin" if STANDIN else "blender",
+        "blender_version": list(BPY.app.version),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+'''Print the change of every case against a baseline run and return the names of the cases slower than threshold
+times their baseline.'''
+def compare(baseline, current, threshold=1.2):
+    if baseline.get("backend") != current["backend"]:
+        print(f"Warning: comparing a {current['backend']} run against a {baseline.get('backend')} baseline")
+    print(f"{'case':<28} {'baseline ms':>12} {'current ms':>11} {'ratio':>7} {'peak MB':>15} {'verts':>19}")
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<28} {'-':>12} {result['seconds'] * 1000:>11.1f}   (new case)")
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+        flag = "  SLOWER" if ratio > threshold else ""
+        if ratio > threshold:
+            regressions.append(name)
+        print(f"{name:<28} {old['seconds'] * 1000:>12.1f} {result['seconds'] * 1000:>11.1f} {ratio:>6.2f}x "
+              f"{old['peak_mb']:>7.1f}>{result['peak_mb']:<7.1f} {old['verts']:>9}>{result['verts']:<9}{flag}")
+    return regressions
+
+def main(argv=None):
+    # Blender passes its own arguments first, the benchmark's come after "--"
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Benchmark the creature generator.")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare the results against a saved JSON run")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="ratio to the baseline time above which a case counts as a regression")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case, the median time is kept")
+    parser.add_argument("--quick", action="store_true", help="run a small sweep")
+    args = parser.parse_args(argv)
+
+    current = run_benchmark(QUICK_SWEEPS if args.quick else SWEEPS, args.repeat)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than {args.threshold}x the baseline")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+'''Content-addressed cache for part geometry. A part is keyed by a hash of the geometry function and exactly the
+arguments it is called with, so a part is only recomputed when one of its own parameters changes. Entries are kept in
+an in-memory LRU bounded by size in bytes and can also be stored on disk to survive restarts.'''
+
+_source_hashes = {}
+
+'''Hash of the source file of a module, so that cached geometry is invalidated when the generator code changes.'''
+def module_source_hash(module_name):
+    if module_name not in _source_hashes:
+        digest = hashlib.sha1()
+        path = getattr(sys.modules.get(module_name), "__file__", None)
+        if path and os.path.exists(path):
+            with open(path, "rb") as file:
+                digest.update(file.read())
+        _source_hashes[module_name] = digest.hexdigest()
+    return _source_hashes[module_name]
+
+'''Convert NumPy scalars and arrays to plain Python values so equal parameters always give the same key.'''
+def normalize(value):
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.shape, value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize(item)) for key, item in value.items()))
+    return value
+
+'''Size in bytes of the arrays of a cached value.'''
+def value_size(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(value_size(item) for item in value)
+    return 0
+
+'''Make the arrays of a cached value read-only, as they are shared by every caller that gets a hit.'''
+def freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            freeze(item)
+    return value
+
+class PartCache:
+    '''LRU cache of part geometry with an optional on-disk store.'''
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, directory=None, enabled=True):
+        self.entries = OrderedDict()
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.enabled = enabled
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    '''Change the settings of the cache, evicting entries if the size bound got smaller.'''
+    def configure(self, max_bytes=None, directory=None, enabled=True):
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self.directory = directory or None
+        self.enabled = enabled
+        self.evict()
+
+    '''Key of a call to func with args: a hash of the function, its source and the normalized arguments.'''
+    def key(self, func, args):
+        text = repr((func.__module__, func.__qualname__, module_source_hash(func.__module__), normalize(args)))
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    '''Return func(*args), served from memory or disk when the same call was made before.'''
+    def get(self, func, *args):
+        if not self.enabled:
+            return func(*args)
+
+        key = self.key(func, args)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+        value = self.load(key)
+        if value is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            value = freeze(func(*args))
+            self.store(key, value)
+
+        self.entries[key] = (value, value_size(value))
+        self.size += self.entries[key][1]
+        self.evict()
+        return value
+
+    '''Value of a key from memory or disk without computing it, or None if it is not cached.'''
+    def cached(self, key):
+        if not self.enabled:
+            return None
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+        value = self.load(key)
+        if value is not None:
+            self.disk_hits += 1
+            self.entries[key] = (value, value_size(value))
+            self.size += self.entries[key][1]
+            self.evict()
+        return value
+
+    '''Add a value computed elsewhere, e.g. in a worker process, under its key.'''
+    def add(self, key, value):
+        if not self.enabled or key in self.entries:
+            return
+        value = freeze(value)
+        self.misses += 1
+        self.store(key, value)
+        self.entries[key] = (value, value_size(value))
+        self.size += self.entries[key][1]
+        self.evict()
+
+    '''Drop the least recently used entries until the cache fits in max_bytes.'''
+    def evict(self):
+        while self.entries and self.size > self.max_bytes:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.size -= size
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    '''Read an entry from the on-disk store, returning None if there is no store or no entry.'''
+    def load(self, key):
+        if not self.directory or not os.path.exists(self.path(key)):
+            return None
+        try:
+            with open(self.path(key), "rb") as file:
+                return freeze(pickle.load(file))
+        except (OSError, pickle.UnpicklingError, EOFError):
+            print("Failed to load cached part:", self.path(key))
+            return None
+
+    '''Write an entry to the on-disk store. The file is written under a temporary name first so that other processes
+    never read a partial entry.'''
+    def store(self, key, value):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = self.path(key) + ".tmp"
+            with open(temp_path, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path(key))
+        except OSError:
+            print("Failed to store cached part:", self.path(key))
+
+    '''Remove every in-memory entry and reset the statistics. The on-disk store is left untouched.'''
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    '''One line summary of the cache statistics for the UI.'''
+    def summary(self):
+        return (f"Hits {self.hits}  Disk {self.disk_hits}  Misses {self.misses}  "
+                f"{len(self.entries)} parts, {self.size / (1024 * 1024):.1f} MB")
+
+'''Cache shared by the Blender operator.'''
+PART_CACHE = PartCache()
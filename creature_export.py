@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+from creature_geometry import triangulate
+
+'''Writers for creature geometry to OBJ, binary PLY and binary glTF (.glb) files without Blender. Every writer takes an
+iterable of (object name, vertices, faces) with the vertices already in world space, as produced by creature_objects
+or iter_creature_objects in creature_geometry.py. Objects are consumed one at a time and never all held at once: PLY
+and glTF need their element counts and buffer layout before the data, so the binary data is spooled to temporary files
+next to the output and copied behind the header at the end. Memory stays bounded by the largest object however many
+objects or creatures are written.'''
+
+EXPORT_FORMATS = ("obj", "ply", "glb")
+
+'''Block size used to copy the spooled data into the output file.'''
+SPOOL_BLOCK = 1024 * 1024
+
+'''Temporary file in the directory of path. Spools are kept next to the output rather than in the temporary directory,
+which may be held in memory.'''
+def spool_file(path):
+    return tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+
+'''Append the content of spools to file in blocks.'''
+def copy_spools(file, *spools):
+    for spool in spools:
+        spool.seek(0)
+        shutil.copyfileobj(spool, file, SPOOL_BLOCK)
+
+'''Write the objects to a Wavefront OBJ file, one "o" group per object.'''
+def write_obj(path, objects):
+    with open(path, "w") as file:
+        offset = 1
+        for name, verts, faces in objects:
+            file.write(f"o {name}\n")
+            # One formatting call per block is much faster than np.savetxt's row by row formatting
+            file.write(("v %.6f %.6f %.6f\n" * len(verts)) % tuple(verts.ravel().tolist()))
+            face_format = "f" + " %d" * faces.shape[1] + "\n"
+            file.write((face_format * len(faces)) % tuple((faces + offset).ravel().tolist()))
+            offset += len(verts)
+
+'''Write the objects to a single binary little-endian PLY file. The objects are merged into one vertex and one face
+element as PLY has no notion of separate objects.'''
+def write_ply(path, objects):
+    num_verts = 0
+    num_faces = 0
+    with spool_file(path) as vertex_spool, spool_file(path) as face_spool:
+        for _, verts, faces in objects:
+            vertex_spool.write(np.ascontiguousarray(verts, dtype="<f4"))
+            corners = faces.shape[1]
+            records = np.empty(len(faces), dtype=[("count", "u1"), ("indices", "<i4", (corners,))])
+            records["count"] = corners
+            records["indices"] = faces + num_verts
+            face_spool.write(records)
+            num_verts += len(verts)
+            num_faces += len(faces)
+
+        header = ("ply\n"
+                  "format binary_little_endian 1.0\n"
+                  f"element vertex {num_verts}\n"
+                  "property float x\n"
+                  "property float y\n"
+                  "property float z\n"
+                  f"element face {num_faces}\n"
+                  "property list uchar int vertex_indices\n"
+                  "end_header\n")
+        with open(path, "wb") as file:
+            file.write(header.encode("ascii"))
+            copy_spools(file, vertex_spool, face_spool)
+
+'''Write the objects to a binary glTF 2.0 file with one mesh and node per object. Blender is Z-up and glTF is Y-up, so
+the vertices are converted the same way as Blender's glTF exporter does.'''
+def write_glb(path, objects):
+    buffer_views = []
+    accessors = []
+    meshes = []
+    nodes = []
+    offset = 0
+    with spool_file(path) as spool:
+        for name, verts, faces in objects:
+            positions = np.ascontiguousarray(verts[:, [0, 2, 1]] * (1, 1, -1), dtype="<f4")
+            indices = np.ascontiguousarray(triangulate(faces), dtype="<u4")
+
+            for data, target in ((positions, 34962), (indices, 34963)):
+                buffer_views.append({"buffer": 0, "byteOffset": offset, "byteLength": data.nbytes, "target": target})
+                spool.write(data)
+                offset += data.nbytes
+
+            accessors.append({"bufferView": len(buffer_views) - 2, "componentType": 5126, "count": len(positions),
+                              "type": "VEC3", "min": positions.min(axis=0).tolist(),
+                              "max": positions.max(axis=0).tolist()})
+            accessors.append({"bufferView": len(buffer_views) - 1, "componentType": 5125, "count": indices.size,
+                              "type": "SCALAR"})
+            meshes.append({"name": name, "primitives": [{"attributes": {"POSITION": len(accessors) - 2},
+                                                         "indices": len(accessors) - 1}]})
+            nodes.append({"name": name, "mesh": len(meshes) - 1})
+
+        document = {
+            "asset": {"version": "2.0", "generator": "Procedural-Creature-Generation"},
+            "scene": 0,
+            "scenes": [{"nodes": list(range(len(nodes)))}],
+            "nodes": nodes,
+            "meshes": meshes,
+            "accessors": accessors,
+            "bufferViews": buffer_views,
+            "buffers": [{"byteLength": offset}],
+        }
+        json_chunk = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        json_chunk += b" " * (-len(json_chunk) % 4)
+
+        with open(path, "wb") as file:
+            file.write(struct.pack("<III", 0x46546C67, 2, 12 + 8 + len(json_chunk) + 8 + offset))
+            file.write(struct.pack("<II", len(json_chunk), 0x4E4F534A))
+            file.write(json_chunk)
+            file.write(struct.pack("<II", offset, 0x004E4942))
+            copy_spools(file, spool)
+
+WRITERS = {"obj": write_obj, "ply": write_ply, "glb": write_glb}
+
+'''Write the objects to path in one of EXPORT_FORMATS.'''
+def write_creature(path, objects, file_format):
+    WRITERS[file_format](path, objects)
@@ -0,0 +1,1411 @@
+import math
+import threading
+from collections import OrderedDict
+from math import pi
+
+import numpy as np
+
+from creature_spatial import SpatialHash
+
+'''Geometry core of the creature generator. Every part is computed as plain NumPy arrays (vertex positions of shape
+(N, 3) and face indices of shape (F, corners)) so the geometry can be generated and tested with plain CPython, without
+bpy or bmesh. procedural_content_generation.py loads these arrays into Blender meshes.'''
+
+'''Default values of every parameter of a creature. The names and defaults are the same as the fields of
+CreatureProperties in procedural_content_generation.py.'''
+DEFAULT_PARAMS = {
+    # Body Properties
+    "body_length": 10.0,
+    "body_start_radius": 0.5,
+    "body_max_radius": 1.5,
+    "body_wave_amplitude": 0.3,
+    "body_wave_frequency": 50.0,
+    "body_num_verts": 100,
+
+    # Neck Properties
+    "neck_length": 3.5,
+    "neck_end_radius": 0.2,
+    "neck_wave_amplitude": 0.1,
+    "neck_wave_frequency": 60.0,
+    "neck_num_verts": 100,
+
+    # Tail Properties
+    "tail_length": 5.0,
+    "tail_tip_radius": 0.01,
+    "tail_wave_amplitude": 0.2,
+    "tail_wave_frequency": 50.0,
+    "tail_num_verts": 100,
+
+    # Leg Properties
+    "num_legs": 4,
+    "thigh_height": 1.5,
+    "shin_height": 5.0,
+    "foot_height": 0.5,
+    "thigh_radius": 0.2,
+    "shin_radius": 0.2,
+    "foot_radius": 0.1,
+    "leg_distance": 0.0,
+    "leg_height": 0.0,
+    "generate_legs": False,
+
+    # Head Properties
+    "head_num_segments": 200,
+    "head_num_rings": 100,
+    "head_radii_x": 1.0,
+    "head_radii_y": 1.0,
+    "head_radii_z": 1.0,
+    "head_vertex_budget": 0,
+
+    #Wing Properties
+    "num_wings": 2,
+    "wing_distance": 0.1,
+    "wing_length": 10.0,
+    "wing_thickness": 0.1,
+    "wing_start_width": 2.0,
+    "wing_end_width": 1.0,
+    "wing_num_verts": 20,
+    "wing_num_verts_w": 10,
+    "generate_wings": False,
+
+    #Material Property
+    "material_path": "",
+
+    #Level of Detail Properties
+    "generate_lods": False,
+    "num_lods": 3,
+    "lod_ratio": 0.5,
+
+    #Adaptive Ring Properties
+    "adaptive_rings": False,
+    "ring_tolerance": 0.01,
+
+    #Triangle Budget Properties
+    "use_triangle_budget": False,
+    "triangle_budget": 50000,
+
+    #Single Mesh Properties
+    "single_mesh": False,
+    "weld_distance": 0.001,
+    "cull_hidden": True,
+
+    #Armature Properties
+    "generate_armature": False,
+    "bones_per_part": 4,
+
+    #Attachment Properties
+    "snap_attachments": False,
+    "attach_depth": 0.05,
+}
+
+'''Rings along a leg and vertices around each of them. The legs have no resolution fields of their own.'''
+LEG_SEGMENTS = 100
+LEG_NUM_VERTS = 100
+
+'''Generate a series of rings for the triangles to connect. The main anchor for the mesh generation.
+All the rings of a part are computed in one pass as an array of shape (num_rings * num_verts, 3).'''
+def create_rings(centers, radii, num_verts=100):
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=np.float64).reshape(-1, 1)
+    angles = 2 * pi * np.arange(num_verts) / num_verts
+    verts = np.repeat(centers[:, np.newaxis, :], num_verts, axis=1)
+    #Location where the rings are generated
+    verts[:, :, 1] += radii * np.cos(angles)
+    verts[:, :, 2] += radii * np.sin(angles)
+    return verts.reshape(-1, 3)
+
+''' Generate a series for rings for the legs as it requires different set of parameters for the leg generation'''
+def create_leg_rings(centers, radii, num_verts=100):
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=np.float64).reshape(-1, 1)
+    angles = 2 * pi * np.arange(num_verts) / num_verts
+    verts = np.repeat(centers[:, np.newaxis, :], num_verts, axis=1)
+    verts[:, :, 0] += radii * np.cos(angles)
+    verts[:, :, 1] += radii * np.sin(angles)
+    return verts.reshape(-1, 3)
+
+'''Generate the triangle and its faces with the rings to generate a shape. Returns the vertex indices of every triangle
+connecting num_rings consecutive rings of num_verts vertices each, facing outwards when the rings follow each other
+along the axis the vertices turn around, and with reverse on when they go the other way (the tail and the head).'''
+def bridge_rings(num_rings, num_verts, reverse=False):
+    if num_rings < 2:
+        return np.zeros((0, 3), dtype=np.int32)
+    ring_start = (np.arange(num_rings - 1) * num_verts)[:, np.newaxis]
+    i = np.arange(num_verts)[np.newaxis, :]
+    v1 = ring_start + i
+    v2 = ring_start + (i + 1) % num_verts
+    v3 = v1 + num_verts
+    v4 = v2 + num_verts
+    '''The process of triangulation and generates a series of triangles( i.e. three vertices for triangles, change this for
+    different polygons. Both triangles of a quad are wound the same way, so they face the same side'''
+    faces = np.stack((np.stack((v1, v2, v3), axis=-1), np.stack((v2, v4, v3), axis=-1)), axis=2).reshape(-1, 3)
+    return (faces[:, ::-1] if reverse else faces).astype(np.int32)
+
+'''Generate rings for the head. A seperate function for the head as the logic behind creating a head requires more consideration
+due to different mathematical factors. The head is an ellipsoid made of num_rings - 1 rings of num_segments vertices
+between two single pole vertices, ordered top pole, rings from the top down, bottom pole, so no vertex is duplicated.'''
+def create_head_rings(center, radii, num_segments, num_rings, roundness=1.2):
+    z_angle = pi * np.arange(1, num_rings) / num_rings
+    angle = 2 * pi * np.arange(num_segments) / num_segments
+    ring_radius = np.sin(z_angle)[:, np.newaxis]
+    verts = np.empty((num_rings - 1, num_segments, 3))
+    verts[:, :, 0] = center[0] + radii[0] * ring_radius * np.cos(angle)
+    verts[:, :, 1] = center[1] + radii[1] * ring_radius * np.sin(angle) * roundness
+    verts[:, :, 2] = center[2] + radii[2] * np.cos(z_angle)[:, np.newaxis]
+    poles = np.array([[center[0], center[1], center[2] + radii[2]], [center[0], center[1], center[2] - radii[2]]])
+    return np.concatenate((poles[:1], verts.reshape(-1, 3), poles[1:]))
+
+'''Triangles of a head from create_head_rings: a fan around each pole and two triangles between every pair of
+neighboring vertices of consecutive rings.'''
+def head_bridge_rings(num_segments, num_rings):
+    i = np.arange(num_segments)
+    next_i = (i + 1) % num_segments
+    bottom_pole = (num_rings - 1) * num_segments + 1
+    last_ring = bottom_pole - num_segments
+    top = np.stack((np.zeros(num_segments, dtype=np.int64), 1 + i, 1 + next_i), axis=-1)
+    bottom = np.stack((np.full(num_segments, bottom_pole), last_ring + next_i, last_ring + i), axis=-1)
+    # The rings go down the head, against the direction the vertices turn around it
+    return np.concatenate((top, bridge_rings(num_rings - 1, num_segments, reverse=True) + 1, bottom)).astype(np.int32)
+
+class TopologyTemplates:
+    '''Face index arrays shared by every part with the same connectivity. The faces of a tube only depend on its ring
+    count and ring size, and those of a head on its segments and rings, not on the shape. So every topology is built
+    once, stored as a compact read-only uint32 array and returned as is to every part and creature that uses it, and
+    the generators only compute vertex positions. The least recently used templates are dropped beyond max_bytes.
+    Parts may be generated in a worker thread while Blender generates others, so the templates are guarded by a lock.'''
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.entries = OrderedDict()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    '''Faces of build(*shape), built on the first request.'''
+    def get(self, build, *shape):
+        key = (build.__name__,) + shape
+        with self.lock:
+            faces = self.entries.get(key)
+            if faces is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return faces
+
+            self.misses += 1
+            faces = np.ascontiguousarray(build(*shape), dtype=np.uint32)
+            # Shared by every caller, so it must never be changed in place
+            faces.flags.writeable = False
+            self.entries[key] = faces
+            self.size += faces.nbytes
+            while len(self.entries) > 1 and self.size > self.max_bytes:
+                _, dropped = self.entries.popitem(last=False)
+                self.size -= dropped.nbytes
+            return faces
+
+    '''Faces of a tube of num_rings rings of num_verts vertices, see bridge_rings.'''
+    def tube(self, num_rings, num_verts, reverse=False):
+        return self.get(bridge_rings, num_rings, num_verts, reverse)
+
+    '''Faces of a head of num_segments segments and num_rings rings, see head_bridge_rings.'''
+    def head(self, num_segments, num_rings):
+        return self.get(head_bridge_rings, num_segments, num_rings)
+
+    '''Faces of a wing of num_rows x num_columns vertices per side, a closed membrane or an open sheet.'''
+    def wing(self, num_rows, num_columns, closed=True):
+        return self.get(wing_membrane_faces if closed else wing_grid_faces, num_rows, num_columns)
+
+'''Topology templates shared by all generators.'''
+TOPOLOGY = TopologyTemplates()
+
+'''Segments and rings of a head within a budget of vertices. The head has (num_rings - 1) * num_segments + 2 vertices and
+twice as many triangles, less 4. Without a budget (0) the resolution is kept as is, otherwise both are scaled down by the
+same factor, keeping their ratio, until the head fits.'''
+def head_resolution(num_segments, num_rings, max_verts=0):
+    num_segments, num_rings = max(3, int(num_segments)), max(2, int(num_rings))
+    if max_verts <= 0 or (num_rings - 1) * num_segments + 2 <= max_verts:
+        return num_segments, num_rings
+    scale = math.sqrt(max(max_verts - 2, 0) / (num_segments * num_rings))
+    while True:
+        segments, rings = max(3, int(num_segments * scale)), max(2, int(num_rings * scale))
+        if (rings - 1) * segments + 2 <= max_verts or (segments, rings) == (3, 2):
+            return segments, rings
+        scale *= 0.98
+
+'''Ring samples for a spine of steps segments at a reduced detail, for previews and levels of detail. Returns None
+(the original rings) at full detail, otherwise fewer rings spread evenly over the same spine so the silhouette is kept.
+A sample is a possibly fractional ring index of the full resolution spine.'''
+def detail_samples(steps, detail):
+    if detail >= 1:
+        return None
+    return np.linspace(0, steps, max(2, int(round(steps * detail))) + 1)
+
+'''Number of vertices per ring at a reduced detail.'''
+def detail_verts(num_verts, detail):
+    if detail >= 1:
+        return num_verts
+    return max(3, int(round(num_verts * detail)))
+
+'''Number of segments of the body spine, one every step_size along the X axis.'''
+def body_steps(length, step_size=0.1):
+    return int(length / step_size)
+
+'''Center and radius of every ring of the body. Rings are placed every step_size along the X axis and the body also
+returns its attachment points for the neck and the tail. samples are the ring indices to evaluate, by default every
+ring from 0 to the number of steps.'''
+def body_spine(length, start_radius, max_radius, wave_amplitude, wave_frequency, samples=None):
+    step_size = 0.1
+    steps = body_steps(length, step_size)
+
+    i = np.arange(steps + 1) if samples is None else np.asarray(samples, dtype=np.float64)
+    radii = start_radius + (max_radius - start_radius) * np.abs(np.sin(pi * i / steps))
+    wave_y = wave_amplitude * np.sin(i / wave_frequency * 2 * pi)
+    centers = np.stack((i * step_size, wave_y, np.zeros(len(i))), axis=-1)
+    return centers, radii
+
+'''Generate the body geometry based on the parameters. Returns the vertices and faces together with the top and bottom
+centers used to attach the neck and the tail, and the center and radius of the last ring.'''
+def body_geometry(length, start_radius, max_radius, wave_amplitude, wave_frequency, num_verts=100, samples=None):
+    centers, radii = body_spine(length, start_radius, max_radius, wave_amplitude, wave_frequency, samples)
+    top_center = (length, 0, 0)
+    bottom_center = (0, 0, 0)
+    last_center = tuple(float(c) for c in centers[-1])
+    last_radius = float(radii[-1])
+
+    verts = create_rings(centers, radii, num_verts)
+    faces = TOPOLOGY.tube(len(centers), num_verts)
+    return verts, faces, top_center, bottom_center, last_center, last_radius
+
+'''Center and radius of every ring of the tail. The tail tapers from start_radius to tip_radius over num_verts
+segments; samples are the ring indices to evaluate, by default 0 to num_verts.'''
+def tail_spine(start_center, start_radius, length, tip_radius, wave_amplitude, wave_frequency, num_verts=100,
+               samples=None):
+    step_size = length / num_verts
+    steps = num_verts
+
+    i = np.arange(steps + 1) if samples is None else np.asarray(samples, dtype=np.float64)
+    radii = start_radius - (start_radius - tip_radius) * (i / steps)
+    wave_x = wave_amplitude * np.sin(i / wave_frequency * 2 * pi)
+    centers = np.stack((start_center[0] - i * step_size,
+                        start_center[1] + wave_x,
+                        np.full(len(i), float(start_center[2]))), axis=-1)
+    return centers, radii
+
+'''Generate the tail geometry for the creature based on the parameters provided. ring_verts sets the vertices per
+ring when it should differ from num_verts, which also sets the shape of the spine.'''
+def tail_geometry(start_center, start_radius, length, tip_radius, wave_amplitude, wave_frequency, num_verts=100,
+                  samples=None, ring_verts=None):
+    centers, radii = tail_spine(start_center, start_radius, length, tip_radius, wave_amplitude, wave_frequency, num_verts,
+                                samples)
+    ring_verts = ring_verts or num_verts
+    verts = create_rings(centers, radii, ring_verts)
+    # The tail runs towards -X
+    faces = TOPOLOGY.tube(len(centers), ring_verts, reverse=True)
+    return verts, faces
+
+'''Center and radius of every ring of the neck. The neck goes from start_radius to end_radius over num_verts
+segments; samples are the ring indices to evaluate, by default 0 to num_verts.'''
+def neck_spine(start_center, start_radius, length, end_radius, wave_amplitude=0.3, wave_frequency=30, num_verts=100,
+               samples=None):
+    step_size = length / num_verts
+    steps = num_verts
+
+    i = np.arange(steps + 1) if samples is None else np.asarray(samples, dtype=np.float64)
+    radii = start_radius + (end_radius - start_radius) * (i / steps)
+    wave_offset = wave_amplitude * np.sin(i / steps * math.pi * 2)
+    centers = np.stack((start_center[0] + i * step_size,
+                        np.full(len(i), float(start_center[1])),
+                        start_center[2] + wave_offset), axis=-1)
+    return centers, radii
+
+'''Generate the neck geometry for the creature based on the parameters provided. ring_verts sets the vertices per
+ring when it should differ from num_verts, which also sets the shape of the spine.'''
+def neck_geometry(start_center, start_radius, length, end_radius, wave_amplitude=0.3, wave_frequency=30, num_verts=100,
+                  samples=None, ring_verts=None):
+    centers, radii = neck_spine(start_center, start_radius, length, end_radius, wave_amplitude, wave_frequency, num_verts,
+                                samples)
+    ring_verts = ring_verts or num_verts
+    verts = create_rings(centers, radii, ring_verts)
+    faces = TOPOLOGY.tube(len(centers), ring_verts)
+    return verts, faces
+
+'''Center and radius of every ring of a leg. The leg is made of a thigh, a shin and a foot, each bent by a different
+amount. samples are the ring indices to evaluate, by default 0 to segments - 1.'''
+def leg_spine(thigh_height, shin_height, foot_height, thigh_radius, shin_radius, foot_radius, segments=LEG_SEGMENTS,
+              samples=None):
+    # New bending parameters
+    thigh_bend = -0.5
+    shin_bend = -0.1
+    foot_bend = 0.5
+
+    # Calculate the radius and center for every segment with bending
+    i = np.arange(segments) if samples is None else np.asarray(samples, dtype=np.float64)
+    thigh = i < segments / 3
+    shin = ~thigh & (i < 2 * segments / 3)
+    radii = np.where(thigh, thigh_radius - (i / segments) * (thigh_radius - shin_radius),
+                     np.where(shin, shin_radius - ((i - segments / 3) / segments) * (shin_radius - foot_radius),
+                              foot_radius))
+    heights = np.where(thigh, (i / segments) * thigh_height,
+                       np.where(shin, thigh_height + ((i - segments / 3) / segments) * shin_height,
+                                thigh_height + shin_height + ((i - 2 * segments / 3) / segments) * foot_height))
+    center_offsets = np.where(thigh, thigh_bend, np.where(shin, shin_bend, foot_bend))
+
+    # Apply bending to the center offset based on the segment's height
+    centers = np.stack((center_offsets * heights, np.zeros(len(i)), heights), axis=-1)
+    return centers, radii
+
+'''Generate the leg geometry. Legs have additional parameters due to the nature of the leg as it has more elements'''
+def leg_geometry(thigh_height, shin_height, foot_height, thigh_radius, shin_radius, foot_radius, segments=LEG_SEGMENTS,
+                 num_verts=LEG_NUM_VERTS, samples=None):
+    centers, radii = leg_spine(thigh_height, shin_height, foot_height, thigh_radius, shin_radius, foot_radius, segments,
+                               samples)
+    verts = create_leg_rings(centers, radii, num_verts)
+    faces = TOPOLOGY.tube(len(centers), num_verts)
+    return verts, faces
+
+'''Logical algorithm for the generation of head after the triangles are generated.
+The head usually is an ellipsoid shape so the generation of head at the start generates a simple ellipsoid shape but changes with
+parameters provided by the user to give a more organic head. max_verts caps the vertex count, see head_resolution.'''
+def head_geometry(center, radii, num_segments=200, num_rings=100, max_verts=0):
+    num_segments, num_rings = head_resolution(num_segments, num_rings, max_verts)
+    verts = create_head_rings(center, radii, num_segments, num_rings)
+    faces = TOPOLOGY.head(num_segments, num_rings)
+    return verts, faces
+
+'''Quads of a wing sheet of num_rows x num_columns vertices, row by row.'''
+def wing_grid_faces(num_rows, num_columns):
+    index = np.arange(num_rows * num_columns).reshape(num_rows, num_columns)
+    return np.stack((index[:-1, :-1], index[:-1, 1:], index[1:, 1:], index[1:, :-1]), axis=-1).reshape(-1, 4)
+
+'''Quads of a closed wing membrane whose first num_rows x num_columns vertices are one side and the next as many the
+other: the grid of each side, wound to face outwards, and a wall of quads joining the outlines of the two sides.'''
+def wing_membrane_faces(num_rows, num_columns):
+    grid = wing_grid_faces(num_rows, num_columns)
+    side = num_rows * num_columns
+    index = np.arange(side).reshape(num_rows, num_columns)
+    # The outline of the grid as one loop: first row, last column, last row and first column
+    outline = np.concatenate((index[0, :-1], index[:-1, -1], index[-1, :0:-1], index[:0:-1, 0]))
+    following = np.roll(outline, -1)
+    walls = np.stack((outline, following, following + side, outline + side), axis=-1)
+    return np.concatenate((grid[:, ::-1], grid + side, walls))
+
+'''Generate the wing geometry: a membrane of num_verts rows along the wing and num_verts_w columns across it, narrowing
+from start_width at the root to end_width at the tip and bulging in the middle. With a thickness above 0 the membrane is
+closed: the sheet is offset by half the thickness to either side along its normals and the outlines of both sides are
+joined, all in array operations, so dense wings need no Solidify modifier. With thickness 0 it is a single open sheet.'''
+def wing_geometry(wing_length, start_width, end_width, num_verts=20, num_verts_w=10, thickness=0.0):
+    num_verts, num_verts_w = max(2, int(num_verts)), max(2, int(num_verts_w))
+    i = np.arange(num_verts)[:, np.newaxis]
+    j = np.arange(num_verts_w)[np.newaxis, :]
+
+    # Calculate the width of the wing at this position based on the start and end widths
+    width = start_width + (end_width - start_width) * (i / num_verts)
+
+    # Calculate the position of each vertex relative to the origin, the columns span the wing from edge to edge
+    x = (wing_length / num_verts) * i
+    z = width * (2 * j / (num_verts_w - 1) - 1)
+
+    # Apply a sine function to the y-coordinate to create irregularities
+    y_offset = (width / 2) * np.sin((i / num_verts) * math.pi) * np.cos((j / num_verts_w) * math.pi)
+    sheet = np.stack(np.broadcast_arrays(x, y_offset, z), axis=-1)
+    if thickness <= 0:
+        return sheet.reshape(-1, 3), TOPOLOGY.wing(num_verts, num_verts_w, closed=False)
+
+    normals = np.cross(np.gradient(sheet, axis=0), np.gradient(sheet, axis=1))
+    normals /= np.maximum(np.linalg.norm(normals, axis=-1, keepdims=True), 1e-12)
+    offset = (normals * (thickness / 2)).reshape(-1, 3)
+    sheet = sheet.reshape(-1, 3)
+    return np.concatenate((sheet + offset, sheet - offset)), TOPOLOGY.wing(num_verts, num_verts_w)
+
+'''Fields of CreatureProperties that each part's geometry is built from. The neck and the tail are attached to the last
+ring of the body, so they also depend on the body fields that set its radius. Fields that only move parts around
+(body_length and neck_length for the head, num_legs, num_wings, wing_distance) are handled by parts_layout.'''
+PART_FIELDS = {
+    "Body": ("body_length", "body_start_radius", "body_max_radius", "body_wave_amplitude", "body_wave_frequency",
+             "body_num_verts", "adaptive_rings", "ring_tolerance"),
+    "Neck": ("body_length", "body_start_radius", "body_max_radius", "neck_length", "neck_end_radius",
+             "neck_wave_amplitude", "neck_wave_frequency", "neck_num_verts", "adaptive_rings", "ring_tolerance"),
+    "Tail": ("body_length", "body_start_radius", "body_max_radius", "tail_length", "tail_tip_radius",
+             "tail_wave_amplitude", "tail_wave_frequency", "tail_num_verts", "adaptive_rings", "ring_tolerance"),
+    "Head": ("head_num_segments", "head_num_rings", "head_radii_x", "head_radii_y", "head_radii_z",
+             "head_vertex_budget"),
+    "Leg": ("thigh_height", "shin_height", "foot_height", "thigh_radius", "shin_radius", "foot_radius",
+            "adaptive_rings", "ring_tolerance"),
+    "Wing": ("wing_length", "wing_start_width", "wing_end_width", "wing_thickness", "wing_num_verts",
+             "wing_num_verts_w"),
+}
+
+'''The single mesh of a creature depends on the shape and the placement of every part.'''
+PART_FIELDS["Creature"] = tuple(field for field in DEFAULT_PARAMS
+                                if field not in ("material_path", "generate_lods", "num_lods", "lod_ratio",
+                                                 "single_mesh", "generate_armature", "bones_per_part"))
+
+'''The subset of params that the geometry of part depends on, see PART_FIELDS. With use_triangle_budget on, the
+resolution the part gets from triangle_allocation is added, as it depends on every part of the creature. An allocation
+computed before can be passed to avoid computing it for every part.'''
+def part_params(part, params, allocation=None):
+    params = dict(DEFAULT_PARAMS, **params)
+    fields = {field: params[field] for field in PART_FIELDS[part]}
+    if params["use_triangle_budget"] and part != "Creature":
+        allocation = allocation or triangle_allocation(params)
+        fields["resolution"] = allocation[part]["resolution"] if part in allocation else None
+    return fields
+
+'''Names of the parts a creature is made of. Legs and wings are a single part each, as every leg and every wing shares
+the same shape and only differs in placement.'''
+def creature_part_names(params):
+    params = dict(DEFAULT_PARAMS, **params)
+    parts = ["Body", "Neck", "Tail", "Head"]
+    if params["generate_legs"]:
+        parts.append("Leg")
+    if params["generate_wings"]:
+        parts.append("Wing")
+    return parts
+
+'''Parts built from rings along a spine.'''
+TUBE_PARTS = ("Body", "Neck", "Tail", "Leg")
+
+'''Spine of a tube part as (spine, steps, ring_verts): spine(samples) gives the centers and radii of the rings at the
+given ring indices, steps is the index of the last ring at full resolution and ring_verts the vertices per ring.'''
+def part_spine(part, params):
+    params = dict(DEFAULT_PARAMS, **params)
+    body_args = (params["body_length"], params["body_start_radius"], params["body_max_radius"])
+
+    if part == "Body":
+        def spine(samples):
+            return body_spine(*body_args, params["body_wave_amplitude"], params["body_wave_frequency"], samples)
+        return spine, body_steps(params["body_length"]), params["body_num_verts"]
+
+    # The neck and the tail start with the radius of the last ring of the body
+    top_radius = float(body_spine(*body_args, 0.0, 1.0)[1][-1])
+
+    if part == "Neck":
+        def spine(samples):
+            return neck_spine((params["body_length"], 0, 0), top_radius, params["neck_length"],
+                              params["neck_end_radius"], params["neck_wave_amplitude"], params["neck_wave_frequency"],
+                              params["neck_num_verts"], samples)
+        return spine, params["neck_num_verts"], params["neck_num_verts"]
+
+    if part == "Tail":
+        def spine(samples):
+            return tail_spine((0, 0, 0), top_radius, params["tail_length"], params["tail_tip_radius"],
+                              params["tail_wave_amplitude"], params["tail_wave_frequency"], params["tail_num_verts"],
+                              samples)
+        return spine, params["tail_num_verts"], params["tail_num_verts"]
+
+    if part == "Leg":
+        def spine(samples):
+            return leg_spine(params["thigh_height"], params["shin_height"], params["foot_height"],
+                             params["thigh_radius"], params["shin_radius"], params["foot_radius"], LEG_SEGMENTS,
+                             samples)
+        return spine, LEG_SEGMENTS - 1, LEG_NUM_VERTS
+
+    raise ValueError(f"'{part}' is not a tube part")
+
+'''Largest distance between the full resolution rings of a spine and the rings linearly interpolated from the ring
+samples kept, measured as the offset of the ring center plus the change in radius.'''
+def spine_deviation(spine, steps, samples):
+    dense = np.arange(steps + 1, dtype=np.float64)
+    centers, radii = spine(dense)
+    kept_centers, kept_radii = spine(samples)
+    interpolated = np.stack([np.interp(dense, samples, kept_centers[:, axis]) for axis in range(3)], axis=-1)
+    errors = np.linalg.norm(centers - interpolated, axis=1) + np.abs(radii - np.interp(dense, samples, kept_radii))
+    return float(errors.max())
+
+'''Fewest evenly spaced ring samples of a spine that deviate by at most tolerance (see spine_deviation).'''
+def uniform_samples(spine, steps, tolerance):
+    low, high = 2, steps + 1
+    while low < high:
+        middle = (low + high) // 2
+        if spine_deviation(spine, steps, np.linspace(0, steps, middle)) <= tolerance:
+            high = middle
+        else:
+            low = middle + 1
+    return np.linspace(0, steps, low)
+
+'''Ring samples placed according to the curvature and the radius change of a spine. Starting from the two end rings,
+the full resolution ring that deviates most from the rings kept so far is added until no ring deviates by more than
+tolerance (see spine_deviation), so straight stretches of constant radius get few rings and tight bends many. On a
+steady wave this greedy placement needs a few more rings than even spacing, so the evenly spaced samples of
+uniform_samples are used instead whenever they are fewer.'''
+def adaptive_samples(spine, steps, tolerance):
+    samples = np.arange(steps + 1, dtype=np.float64)
+    centers, radii = spine(samples)
+    keep = np.zeros(len(samples), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    spans = [(0, len(samples) - 1)]
+    while spans:
+        a, b = spans.pop()
+        if b - a < 2:
+            continue
+        t = ((samples[a + 1:b] - samples[a]) / (samples[b] - samples[a]))[:, np.newaxis]
+        interpolated = centers[a] + t * (centers[b] - centers[a])
+        errors = (np.linalg.norm(centers[a + 1:b] - interpolated, axis=1)
+                  + np.abs(radii[a + 1:b] - (radii[a] + t[:, 0] * (radii[b] - radii[a]))))
+        worst = int(np.argmax(errors))
+        if errors[worst] > tolerance:
+            middle = a + 1 + worst
+            keep[middle] = True
+            spans.extend(((a, middle), (middle, b)))
+    uniform = uniform_samples(spine, steps, tolerance)
+    return uniform if len(uniform) < np.count_nonzero(keep) else samples[keep]
+
+'''Vertex counts of the tube parts with adaptive rings compared to fixed steps. For every part, reports the rings and
+vertices of the fixed-step output, of the adaptive output at ring_tolerance, and of the fewest evenly spaced rings
+that stay within the same tolerance. The adaptive output may deviate less than the tolerance (not at all on the
+kinked spine of the legs), and even spacing is held to the tolerance, not to that deviation.'''
+def ring_savings(params):
+    params = dict(DEFAULT_PARAMS, **params)
+    report = {}
+    for part in TUBE_PARTS:
+        if part not in creature_part_names(params):
+            continue
+        spine, steps, ring_verts = part_spine(part, params)
+        adaptive = adaptive_samples(spine, steps, params["ring_tolerance"])
+        deviation = spine_deviation(spine, steps, adaptive)
+        low = len(uniform_samples(spine, steps, max(deviation, params["ring_tolerance"])))
+
+        report[part] = {
+            "max_deviation": deviation,
+            "fixed_rings": steps + 1,
+            "uniform_rings": low,
+            "adaptive_rings": len(adaptive),
+            "fixed_verts": (steps + 1) * ring_verts,
+            "uniform_verts": low * ring_verts,
+            "adaptive_verts": len(adaptive) * ring_verts,
+        }
+    return report
+
+'''Resolution of a part from the panel settings as (rows, columns): rings and vertices per ring for the tubes, rings
+and segments for the head, and the grid size of the wing.'''
+def default_resolution(part, params):
+    params = dict(DEFAULT_PARAMS, **params)
+    if part in TUBE_PARTS:
+        _, steps, ring_verts = part_spine(part, params)
+        return steps + 1, ring_verts
+    if part == "Head":
+        return head_resolution(params["head_num_segments"], params["head_num_rings"], params["head_vertex_budget"])[::-1]
+    if part == "Wing":
+        return params["wing_num_verts"], params["wing_num_verts_w"]
+    raise ValueError(f"Unknown creature part '{part}'")
+
+'''Triangles of one instance of a part at a resolution of (rows, columns), counting every quad as two triangles. Wings
+are counted as closed membranes: two sides and the wall around them.'''
+def resolution_triangles(part, rows, columns):
+    if part == "Wing":
+        return 4 * (rows - 1) * (columns - 1) + 4 * (rows - 1 + columns - 1)
+    # Tubes bridge every pair of consecutive rings, the head also closes both poles with a fan
+    return 2 * (rows - 1) * columns
+
+'''Surface of one instance of a part as (area elements, curvature of each element). Tubes are measured ring to ring
+along their full resolution spine, with the curvature around the ring (1 / radius) plus the bending of the spine. The
+head uses the curvature of a sphere of the same area, and the wing the sideways bend of its sheet over its outline.'''
+def part_surface(part, params):
+    params = dict(DEFAULT_PARAMS, **params)
+    if part in TUBE_PARTS:
+        centers, radii = part_spine(part, params)[0](None)
+        steps = np.diff(centers, axis=0)
+        lengths = np.linalg.norm(steps, axis=1)
+        slant = np.hypot(lengths, np.diff(radii))
+        mean_radii = np.maximum((radii[:-1] + radii[1:]) / 2, 1e-6)
+        # Bending: the angle between consecutive segments, shared by the two segments around every inner ring
+        directions = steps / np.maximum(lengths, 1e-12)[:, np.newaxis]
+        turning = np.arccos(np.clip(np.einsum("ij,ij->i", directions[:-1], directions[1:]), -1, 1))
+        bending = (np.concatenate(([0.0], turning)) + np.concatenate((turning, [0.0]))) / 2
+        return 2 * pi * mean_radii * slant, 1 / mean_radii + bending / np.maximum(slant, 1e-12)
+
+    if part == "Head":
+        verts, faces = head_geometry((0, 0, 0), (params["head_radii_x"], params["head_radii_y"],
+                                                 params["head_radii_z"]), 64, 32)
+        curvature = lambda area: np.full(len(area), math.sqrt(4 * pi / max(area.sum(), 1e-12)))
+    elif part == "Wing":
+        # The wing is measured over its outline, a membrane twice the wing width across. Both sides of the membrane
+        # share one resolution, so one side is counted.
+        rows = np.arange(20) / 20
+        widths = np.maximum(params["wing_start_width"] + (params["wing_end_width"] - params["wing_start_width"]) * rows,
+                            1e-6)
+        return 2 * params["wing_length"] / 20 * widths, pi / widths
+    else:
+        raise ValueError(f"Unknown creature part '{part}'")
+    faces = triangulate(faces)
+    area = np.linalg.norm(np.cross(verts[faces[:, 1]] - verts[faces[:, 0]], verts[faces[:, 2]] - verts[faces[:, 0]]),
+                          axis=1) / 2
+    return area, curvature(area)
+
+'''Share triangle_budget between the parts of a creature, counting every leg and wing. To stay within a given distance
+of a smooth surface with curvature k, triangles need to be about 1 / sqrt(k) wide across the bend, so a part gets a
+share of the integral of sqrt(k) over its area (see part_surface): large and strongly curved parts get more. Each part
+keeps the ratio of rows to columns of its panel resolution and is scaled to its share; the shares are then lowered
+together until the rounded resolutions fit the budget. Returns, for every part, the number of instances, area, mean
+curvature, share of the budget, resolution and triangles per instance and in total.'''
+def triangle_allocation(params):
+    params = dict(DEFAULT_PARAMS, **params)
+    budget = params["triangle_budget"]
+    instances = {"Leg": params["num_legs"], "Wing": params["num_wings"]}
+    parts = creature_part_names(params)
+    surfaces = {part: part_surface(part, params) for part in parts}
+    weights = {part: float(np.sum(np.sqrt(curvature) * area)) for part, (area, curvature) in surfaces.items()}
+    total_weight = sum(weights[part] * instances.get(part, 1) for part in parts) or 1.0
+
+    scale = 1.0
+    while True:
+        allocation = {}
+        for part in parts:
+            share = weights[part] / total_weight
+            rows, columns = default_resolution(part, params)
+            factor = math.sqrt(budget * share * scale / resolution_triangles(part, rows, columns))
+            rows = max(2, int(round(rows * factor)))
+            columns = max(2 if part == "Wing" else 3, int(round(columns * factor)))
+            triangles = resolution_triangles(part, rows, columns)
+            area, curvature = surfaces[part]
+            allocation[part] = {"instances": instances.get(part, 1), "area": float(area.sum()),
+                                "curvature": float(np.sum(curvature * area) / max(area.sum(), 1e-12)),
+                                "share": share * instances.get(part, 1),
+                                "resolution": (rows, columns), "triangles": triangles,
+                                "total_triangles": triangles * instances.get(part, 1)}
+        total = sum(entry["total_triangles"] for entry in allocation.values())
+        # Stop once within the budget, or when only the smallest resolutions are left
+        if total <= budget or scale < 1e-3:
+            return allocation
+        scale *= min(0.98, budget / total)
+
+'''Resolution of a part as (rows, columns) when it is set by the triangle budget, otherwise None.'''
+def part_resolution(part, params):
+    if params.get("resolution") is not None:
+        return tuple(params["resolution"])
+    if params.get("use_triangle_budget"):
+        entry = triangle_allocation(params).get(part)
+        return entry["resolution"] if entry else None
+    return None
+
+'''Spine, ring samples and vertices per ring of a tube part at a detail, see part_geometry.'''
+def tube_sampling(part, params, detail=1.0):
+    spine, steps, ring_verts = part_spine(part, params)
+    resolution = part_resolution(part, params)
+    if resolution is not None:
+        rings, ring_verts = resolution
+        samples = np.linspace(0, steps, max(2, int(round(rings * min(detail, 1.0)))))
+    elif params["adaptive_rings"]:
+        samples = adaptive_samples(spine, steps, params["ring_tolerance"] / detail)
+    else:
+        samples = detail_samples(steps, detail)
+    return spine, samples, detail_verts(ring_verts, detail)
+
+'''Generate the vertices and faces of one part from a dictionary with the same fields as CreatureProperties. Missing
+fields take their values from DEFAULT_PARAMS. detail below 1 scales down both the number of rings and the vertices per
+ring of the part while following the same spine, for previews and levels of detail. With adaptive_rings on, the rings
+of tube parts are placed by adaptive_samples instead, with the tolerance growing as the detail drops. With
+use_triangle_budget on, the resolution of every part comes from triangle_allocation, which takes precedence.'''
+def part_geometry(part, params, detail=1.0):
+    params = dict(DEFAULT_PARAMS, **params)
+
+    if part in TUBE_PARTS:
+        spine, samples, ring_verts = tube_sampling(part, params, detail)
+        centers, radii = spine(samples)
+        # Leg rings lie in the XY plane, the other tubes run along X, the tail towards -X
+        create = create_leg_rings if part == "Leg" else create_rings
+        return create(centers, radii, ring_verts), TOPOLOGY.tube(len(centers), ring_verts, reverse=part == "Tail")
+
+    if part == "Head":
+        num_rings, num_segments = part_resolution(part, params) or default_resolution(part, params)
+        return head_geometry((0, 0, 0), (params["head_radii_x"], params["head_radii_y"], params["head_radii_z"]),
+                             detail_verts(num_segments, detail), detail_verts(num_rings, detail))
+
+    if part == "Wing":
+        num_rows, num_columns = part_resolution(part, params) or default_resolution(part, params)
+        return wing_geometry(params["wing_length"], params["wing_start_width"], params["wing_end_width"],
+                             detail_verts(num_rows, detail), detail_verts(num_columns, detail),
+                             params["wing_thickness"])
+
+    if part == "Creature":
+        return single_mesh_geometry(params, detail)
+
+    raise ValueError(f"Unknown creature part '{part}'")
+
+'''Generate the geometry of every part of a creature from a dictionary with the same fields as CreatureProperties.
+Missing fields take their values from DEFAULT_PARAMS.'''
+def creature_geometry(params):
+    return {part: part_geometry(part, params) for part in creature_part_names(params)}
+
+'''Unit normals of a surface sampled as a grid of shape (rows, columns, 3) whose columns wrap around, like the rings of
+a tube: the cross product of the steps along the rows and around the columns, turned away from center (one point per
+row). Normals of rings of radius 0 are 0, which Blender reads as "keep the computed normal".'''
+def grid_normals(grid, center):
+    along = np.gradient(grid, axis=0) if len(grid) > 1 else np.zeros_like(grid)
+    around = np.roll(grid, -1, axis=1) - np.roll(grid, 1, axis=1)
+    normals = np.cross(along, around).reshape(-1, 3)
+    radial = (grid - center[:, np.newaxis, :]).reshape(-1, 3)
+    # Sums over the three components are much faster written out than reduced over the last axis
+    x, y, z = normals.T
+    outwards = x * radial[:, 0] + y * radial[:, 1] + z * radial[:, 2]
+    scale = np.where(outwards < 0, -1.0, 1.0) / np.maximum(np.sqrt(x * x + y * y + z * z), 1e-12)
+    return normals * scale[:, np.newaxis]
+
+'''Area weighted unit normals of the vertices of any mesh.'''
+def vertex_normals(verts, faces):
+    triangles = verts[triangulate(faces)]
+    face_normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    corners = triangulate(faces).ravel()
+    normals = np.stack([np.bincount(corners, np.repeat(face_normals[:, axis], 3), len(verts)) for axis in range(3)],
+                       axis=1)
+    return normals / np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+
+'''Texture coordinates and smooth normals of the vertices of a part from part_geometry, as (uvs, normals, periodic).
+They follow from the layout the generator gives the vertices, so no unwrapping is needed. Tubes are mapped around
+their rings in u and along their spine by arc length in v. The head is mapped around in u and from the bottom pole to
+the top one in v, with u left NaN at the poles where it has no value. Both wrap around in u, which periodic tells. The
+wing is mapped as its grid, u along the wing and v across it, the same on both sides. Tube and head normals are those
+of the surface their rings sample, wing normals are averaged over the faces. The shape of every grid is read back from
+its topology template: the first triangle of a tube joins 0, 1 and ring_verts, every triangle of the top fan of the head
+starts at vertex 0, and the first quad of a wing side has the first vertex of its second row in its corners.'''
+def vertex_shading(part, verts, faces):
+    if part in TUBE_PARTS:
+        ring_verts = int(faces[0].max()) if len(faces) else max(len(verts), 1)
+        grid = verts.reshape(-1, ring_verts, 3)
+        centers = grid.mean(axis=1)
+        lengths = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(centers, axis=0), axis=1))))
+        u = np.tile(np.arange(ring_verts) / ring_verts, len(grid))
+        v = np.repeat(lengths / max(lengths[-1], 1e-12), ring_verts)
+        return np.stack((u, v), axis=1), grid_normals(grid, centers), True
+
+    if part == "Head":
+        num_segments = int(np.count_nonzero(faces[:, 0] == 0))
+        num_rings = (len(verts) - 2) // num_segments + 1
+        grid = verts[1:-1].reshape(num_rings - 1, num_segments, 3)
+        center = (verts[0] + verts[-1]) / 2
+        normals = grid_normals(grid, np.repeat(center[np.newaxis], len(grid), axis=0))
+        poles = (verts[[0, -1]] - center) / np.maximum(np.linalg.norm(verts[[0, -1]] - center, axis=1), 1e-12)[:, None]
+        u = np.tile(np.arange(num_segments) / num_segments, num_rings - 1)
+        v = np.repeat(1 - np.arange(1, num_rings) / num_rings, num_segments)
+        uvs = np.concatenate(([[np.nan, 1.0]], np.stack((u, v), axis=1), [[np.nan, 0.0]]))
+        return uvs, np.concatenate((poles[:1], normals, poles[1:])), True
+
+    if part == "Wing":
+        # The quads of an open sheet start (0, 1, ...), those of the top side of a closed membrane are reversed
+        closed = faces[0, 0] != 0
+        num_columns = int(faces[0, 0] if closed else faces[0, 3])
+        num_rows = len(verts) // (2 if closed else 1) // num_columns
+        i, j = np.meshgrid(np.arange(num_rows) / max(num_rows - 1, 1), np.arange(num_columns) / max(num_columns - 1, 1),
+                           indexing="ij")
+        uvs = np.stack((i.ravel(), j.ravel()), axis=1)
+        return np.tile(uvs, (2 if closed else 1, 1)), vertex_normals(verts, faces), False
+
+    raise ValueError(f"No texture coordinates for creature part '{part}'")
+
+'''Texture coordinates of every face corner, in the order of the faces, from the coordinates of their vertices. Where
+u wraps around (periodic, for all vertices or per vertex), faces across the seam from u near 1 back to 0 get u + 1 on
+that side, so the texture does not run backwards over them. Corners with a NaN u, the poles of the head, take the
+middle u of the other corners of their face.'''
+def corner_uvs(uvs, faces, periodic=True):
+    faces = faces.astype(np.intp)
+    corners = np.take(np.asarray(uvs, dtype=np.float32), faces, axis=0)
+    u = corners[..., 0]
+    # Reductions across the few corners of a face are much faster column by column. fmin and fmax skip the NaN of the
+    # poles, and only the few faces on the seam or at a pole are changed.
+    low, high, total = u[:, 0].copy(), u[:, 0].copy(), u[:, 0].copy()
+    for corner in range(1, u.shape[1]):
+        np.fmin(low, u[:, corner], out=low)
+        np.fmax(high, u[:, corner], out=high)
+        total += u[:, corner]
+    seam = high - low > 0.5
+    if np.ndim(periodic):
+        wraps = np.take(periodic, faces)
+        seam &= wraps.all(axis=1) if len(wraps) else seam
+    elif not periodic:
+        seam[:] = False
+    rows = np.flatnonzero(seam)
+    u[rows] += u[rows] < 0.5
+    rows = np.flatnonzero(np.isnan(total))
+    if len(rows):
+        pole = np.isnan(u[rows])
+        middle = np.where(pole, 0.0, u[rows]).sum(axis=1) / np.maximum((~pole).sum(axis=1), 1)
+        u[rows] = np.where(pole, middle[:, np.newaxis], u[rows])
+    return corners.reshape(-1, 2)
+
+'''Texture coordinates of every face corner and smooth normals of every vertex of a part, as (uvs, normals) in float32,
+ready to be written to a mesh in bulk, see vertex_shading.'''
+def part_shading(part, verts, faces):
+    uvs, normals, periodic = vertex_shading(part, verts, faces)
+    return corner_uvs(uvs, faces, periodic), normals.astype(np.float32)
+
+'''Geometry of one part ready to be loaded into a mesh: (verts, faces, uvs, normals), the geometry of part_geometry with
+the texture coordinates and normals of part_shading. A single mesh gets the coordinates of the parts it is merged from,
+in the same pass.'''
+def part_mesh(part, params, detail=1.0):
+    if part == "Creature":
+        return single_mesh_geometry(params, detail, shading=True)
+    verts, faces = part_geometry(part, params, detail)
+    return (verts, faces) + part_shading(part, verts, faces)
+
+'''Translation as a 4x4 matrix.'''
+def translation_matrix(location):
+    matrix = np.identity(4)
+    matrix[:3, 3] = location
+    return matrix
+
+'''Rotation of Blender's XYZ Euler angles (in radians) as a 4x4 matrix.'''
+def euler_matrix(x, y, z):
+    cx, sx = math.cos(x), math.sin(x)
+    cy, sy = math.cos(y), math.sin(y)
+    cz, sz = math.cos(z), math.sin(z)
+    rot_x = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    rot_y = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    rot_z = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    matrix = np.identity(4)
+    matrix[:3, :3] = rot_z @ rot_y @ rot_x
+    return matrix
+
+'''Apply a 4x4 matrix to an array of points of shape (N, 3).'''
+def transform_points(matrix, verts):
+    return verts @ matrix[:3, :3].T + matrix[:3, 3]
+
+'''Placement of every part of a creature, the same as OBJECT_OT_GenerateCreature produces in Blender. Returns a list
+of (object name, part name, parent object name or None, matrix relative to the parent). Parents always come before
+their children.'''
+def parts_layout(params):
+    params = dict(DEFAULT_PARAMS, **params)
+    # The body rings lie in the YZ plane, so the length of the body is the extent of the ring centers along X.
+    body_xs = body_spine(params["body_length"], params["body_start_radius"], params["body_max_radius"], 0.0, 1.0)[0][:, 0]
+    body_length = float(body_xs.max() - body_xs.min())
+
+    # The neck, tail, head and wings are children of the body, which is rotated around X.
+    layout = [
+        ("Body", "Body", None, euler_matrix(math.radians(-90), 0, 0)),
+        ("Neck", "Neck", "Body", euler_matrix(math.radians(90), 0, 0)),
+        ("Tail", "Tail", "Body", euler_matrix(math.radians(-180), 0, 0)),
+        ("Head", "Head", "Body", translation_matrix((params["body_length"] + params["neck_length"], 0, 0))
+                                 @ euler_matrix(0, 0, math.radians(90))),
+    ]
+
+    if params["generate_legs"]:
+        # Legs are not parented, pairs of legs share the same x-offset along the body.
+        num_legs = params["num_legs"]
+        leg_z = 0.55
+        x_offset_step = body_length / ((num_legs // 2) + 1)
+        x_offset = x_offset_step
+        if num_legs % 2 != 0:
+            x_offset = body_length / (num_legs + 1)
+        for i in range(num_legs):
+            side = -90 if (i + 1) % 2 == 0 else 90
+            rotation = euler_matrix(math.radians(side), math.radians(270), 0)
+            layout.append((f"Leg_{i+1}", "Leg", None, translation_matrix((x_offset, 0, leg_z)) @ rotation))
+            if (i + 1) % 2 == 0:
+                x_offset += x_offset_step
+
+    if params["generate_wings"]:
+        num_wings = params["num_wings"]
+        x_offset = body_length / 2
+        for i in range(num_wings):
+            if (i + 1) % 2 == 1:
+                rotation = euler_matrix(math.radians(90), math.radians(-90), math.radians(90))
+            else:
+                rotation = euler_matrix(math.radians(-90), math.radians(-270), math.radians(90))
+            # Front and back pairs are swept when there are more than two wings
+            if num_wings > 2:
+                if i == 0 or i == 1:
+                    rotation = rotation @ euler_matrix(0, math.radians(-40), 0)
+                elif i == num_wings - 2 or i == num_wings - 1:
+                    rotation = rotation @ euler_matrix(0, math.radians(40), 0)
+            layout.append((f"Wing_{i+1}", "Wing", "Body", translation_matrix((x_offset, 0.55, 0.55)) @ rotation))
+            x_offset += params["wing_distance"]
+
+    if params["snap_attachments"]:
+        layout = snap_attachments(layout, params)
+    return layout
+
+'''Last body surface built by body_surface, as {body fields: surface}. The layout is asked for several times per
+generation, and the index only has to be built again when the body changes. The layout is also asked for by the
+background worker thread while Blender generates, so the cache is only read and written under BODY_SURFACE_LOCK.'''
+BODY_SURFACE = {}
+BODY_SURFACE_LOCK = threading.Lock()
+
+'''Surface of the body in world space for attaching parts, as (SpatialHash over the vertices, vertices, outward
+normals, ring centers, ring radii), at the full resolution of the body whatever its level of detail. Every ring of the
+body is a circle around the spine, so the normal of a vertex points from its ring center to it.'''
+def body_surface(params):
+    key = tuple(params[field] for field in PART_FIELDS["Body"])
+    with BODY_SURFACE_LOCK:
+        surface = BODY_SURFACE.get(key)
+    if surface is not None:
+        return surface
+    # Built outside the lock; two threads asking for a new body at once both build it and store equal surfaces
+    spine, steps, ring_verts = part_spine("Body", params)
+    centers, radii = spine(None)
+    verts = create_rings(centers, radii, ring_verts)
+    normals = verts - np.repeat(centers, ring_verts, axis=0)
+    normals /= np.maximum(np.repeat(radii, ring_verts), 1e-12)[:, np.newaxis]
+    matrix = parts_layout(dict(params, snap_attachments=False))[0][3]
+    # Cells as large as the spacing of the vertices along and around the body hold a few vertices each
+    spacing = max(params["body_length"] / max(steps, 1), 2 * pi * float(radii.max()) / ring_verts, 1e-3)
+    verts = transform_points(matrix, verts)
+    surface = (SpatialHash(verts, spacing), verts, normals @ matrix[:3, :3].T, transform_points(matrix, centers), radii)
+    with BODY_SURFACE_LOCK:
+        BODY_SURFACE.clear()
+        BODY_SURFACE[key] = surface
+    return surface
+
+'''Rotation as a 4x4 matrix that turns the unit vector a onto the unit vector b the shortest way.'''
+def rotation_between(a, b):
+    axis = np.cross(a, b)
+    sine, cosine = np.linalg.norm(axis), float(np.dot(a, b))
+    matrix = np.identity(4)
+    if sine < 1e-12:
+        if cosine < 0:
+            # Opposite vectors: half a turn around any axis perpendicular to a
+            perpendicular = np.cross(a, (1.0, 0.0, 0.0) if abs(a[0]) < 0.9 else (0.0, 1.0, 0.0))
+            perpendicular /= np.linalg.norm(perpendicular)
+            matrix[:3, :3] = 2 * np.outer(perpendicular, perpendicular) - np.identity(3)
+        return matrix
+    axis /= sine
+    cross = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    matrix[:3, :3] = np.identity(3) + sine * cross + (1 - cosine) * cross @ cross
+    return matrix
+
+'''Root and direction of the root of the attached parts, in the space of the part: legs start along their thigh and
+wings along their local X axis.'''
+def attachment_axis(part, params):
+    if part == "Leg":
+        spine, steps, _ = part_spine(part, params)
+        centers = spine(np.array([0.0, steps / 10]))[0]
+        direction = centers[1] - centers[0]
+        return centers[0], direction / max(np.linalg.norm(direction), 1e-12)
+    return np.zeros(3), np.array([1.0, 0.0, 0.0])
+
+'''Move the legs and wings of a layout onto the surface of the body instead of their fixed offsets. The body vertices
+are indexed in a SpatialHash once per body. Each root is pushed out along the axis of its part to the ring of the body
+closest to it, which lands next to the surface on the side the part points to, and the nearest surface vertex to that
+point is looked up for all parts in one query. Being next to the surface, the query only visits the cells around it
+however fine the body is. The root is put on that vertex, attach_depth below the surface, and the part is turned so
+its axis follows the surface normal there. Returns the layout with the new matrices.'''
+def snap_attachments(layout, params):
+    params = dict(DEFAULT_PARAMS, **params)
+    attached = [index for index, (_, part, *_) in enumerate(layout) if part in ("Leg", "Wing")]
+    if not attached:
+        return layout
+    surface, verts, normals, centers, radii = body_surface(params)
+
+    matrices = world_matrices(layout)
+    axes = {part: attachment_axis(part, params) for part in ("Leg", "Wing")}
+    roots, directions = [], []
+    for index in attached:
+        name, part = layout[index][:2]
+        root, direction = axes[part]
+        roots.append(transform_points(matrices[name], root[np.newaxis])[0])
+        directions.append(matrices[name][:3, :3] @ direction)
+    roots, directions = np.array(roots), np.array(directions)
+    # Where the axis leaves the sphere of the closest ring: root + t * direction at the ring radius from its center
+    ring = np.argmin(np.linalg.norm(roots[:, np.newaxis] - centers, axis=2), axis=1)
+    offsets = roots - centers[ring]
+    along = np.einsum("ij,ij->i", offsets, directions)
+    reach = -along + np.sqrt(np.maximum(along ** 2 - np.einsum("ij,ij->i", offsets, offsets) + radii[ring] ** 2, 0))
+    nearest = surface.nearest(roots + directions * reach[:, np.newaxis])[0]
+
+    layout = list(layout)
+    for index, root, direction, vertex in zip(attached, roots, directions, nearest):
+        name, part, parent, _ = layout[index]
+        target = verts[vertex] - normals[vertex] * params["attach_depth"]
+        world = (translation_matrix(target) @ rotation_between(direction, normals[vertex]) @ translation_matrix(-root)
+                 @ matrices[name])
+        local = np.linalg.inv(matrices[parent]) @ world if parent else world
+        layout[index] = (name, part, parent, local)
+    return layout
+
+'''Placement of every object of a creature: the parts of parts_layout, or with single_mesh on a single "Creature"
+object in world space that holds all of them merged.'''
+def creature_layout(params):
+    params = dict(DEFAULT_PARAMS, **params)
+    if params["single_mesh"]:
+        return [("Creature", "Creature", None, np.identity(4))]
+    return parts_layout(params)
+
+'''Parts that get levels of detail of their own. The single mesh is not one of them, see creature_lod_layout.'''
+LOD_PARTS = ("Body", "Neck", "Tail", "Head", "Leg", "Wing")
+
+'''Extend a creature_layout with levels of detail. Returns (object name, part name, parent, matrix, detail) entries:
+every object of the layout is its own LOD0 with detail 1, and LOD1 to LOD(num_lods - 1) are children named
+<object>_LOD<level> at the same place with ratio ** level detail. As the ratio applies to both the ring count and the
+vertices per ring, every level has about ratio ** 2 the vertices of the previous one.'''
+def lod_layout(layout, num_lods=1, ratio=0.5):
+    entries = [(name, part, parent, matrix, 1.0) for name, part, parent, matrix in layout]
+    for name, part, _, _ in layout:
+        if part in LOD_PARTS:
+            for level in range(1, num_lods):
+                entries.append((f"{name}_LOD{level}", part, name, np.identity(4), ratio ** level))
+    return entries
+
+'''The layout of a creature with its levels of detail when generate_lods is on, see lod_layout. With single_mesh on
+only LOD0 is welded into one "Creature" object; every lower level is made of the separate parts, named
+<part object>_LOD<level> and placed in world space under "Creature", so that no weld or culling runs at low detail.'''
+def creature_lod_layout(params):
+    params = dict(DEFAULT_PARAMS, **params)
+    num_lods = params["num_lods"] if params["generate_lods"] else 1
+    if not params["single_mesh"]:
+        return lod_layout(creature_layout(params), num_lods, params["lod_ratio"])
+    parts = parts_layout(params)
+    matrices = world_matrices(parts)
+    entries = [(name, part, parent, matrix, 1.0) for name, part, parent, matrix in creature_layout(params)]
+    for level in range(1, num_lods):
+        entries += [(f"{name}_LOD{level}", part, "Creature", matrices[name], params["lod_ratio"] ** level)
+                    for name, part, _, _ in parts]
+    return entries
+
+'''World matrix of every object of a layout, by object name.'''
+def world_matrices(layout):
+    matrices = {}
+    for name, _, parent, matrix, *_ in layout:
+        matrices[name] = matrices[parent] @ matrix if parent else matrix
+    return matrices
+
+'''Blend weights of the rings of a tube part to a chain of num_bones bones along its spine, from the ring index alone.
+samples are the ring indices used by part_geometry and steps the index of the last ring (see part_spine). The bones
+split the spine into equal stretches; a ring in the middle of a bone follows that bone only, and towards the ends of
+the bone it is blended linearly with the neighbouring bone. Returns (bones, weights), both of shape (rings, 2), with
+the weights of every ring summing to 1.'''
+def ring_weights(samples, steps, num_bones):
+    position = np.asarray(samples, dtype=np.float64) / max(steps, 1) * num_bones - 0.5
+    first = np.clip(np.floor(position), 0, num_bones - 1).astype(np.int32)
+    second = np.minimum(first + 1, num_bones - 1)
+    blend = np.where(first == second, 0.0, np.clip(position - first, 0.0, 1.0))
+    return np.stack((first, second), axis=1), np.stack((1.0 - blend, blend), axis=1)
+
+'''Skin weights of one part of a rigged creature as (ring_verts, bones, weights), where vertex v lies on ring
+v // ring_verts and bones and weights are the ring_weights of the rings part_geometry builds at detail, indexed within
+the chain of bones_per_part bones of the part. The head and the wings follow a single bone and get None.'''
+def part_skin(part, params, detail=1.0):
+    params = dict(DEFAULT_PARAMS, **params)
+    if part not in TUBE_PARTS:
+        return None
+    _, samples, ring_verts = tube_sampling(part, params, detail)
+    steps = part_spine(part, params)[1]
+    # None stands for every ring of the full resolution spine, see detail_samples
+    samples = np.arange(steps + 1) if samples is None else samples
+    bones, weights = ring_weights(samples, steps, params["bones_per_part"])
+    return ring_verts, bones, weights
+
+'''Bones of the chain along the spine of every tube part object of a layout, by object name: (heads, tails) in the
+space of the object, with the joints placed at evenly spaced ring indices like ring_weights assumes.'''
+def spine_bones(layout, params):
+    params = dict(DEFAULT_PARAMS, **params)
+    num_bones = params["bones_per_part"]
+    chains = {}
+    for name, part, *_ in layout:
+        if part in TUBE_PARTS:
+            if part not in chains:
+                spine, steps, _ = part_spine(part, params)
+                joints = spine(np.linspace(0, steps, num_bones + 1))[0]
+                chains[part] = (joints[:-1], joints[1:])
+            chains[name] = chains[part]
+    return {name: chains[name] for name, *_ in layout if name in chains}
+
+'''Index of the bone among candidates (indices into heads and tails) that lies closest to point.'''
+def nearest_bone(point, heads, tails, candidates):
+    starts, ends = heads[candidates], tails[candidates]
+    direction = ends - starts
+    t = np.clip(np.einsum("ij,ij->i", point - starts, direction) / np.maximum(np.einsum("ij,ij->i", direction,
+                                                                                         direction), 1e-12), 0, 1)
+    distances = np.linalg.norm(starts + t[:, np.newaxis] * direction - point, axis=1)
+    return candidates[int(np.argmin(distances))]
+
+'''Armature of a creature in world space, as (names, parents, heads, tails). The body, the neck, the tail and every
+leg get a chain of bones_per_part bones along their spine named <object>.<index>, the head one bone named "Head" and
+every wing one bone named after it. parents holds the index of the parent bone, or -1 for the root: the first bone of
+the body. The chains of the neck, the tail and the legs and the wing bones hang from the body bone nearest to where
+they start, and the head from the nearest neck bone.'''
+def creature_bones(params):
+    params = dict(DEFAULT_PARAMS, **params)
+    layout = parts_layout(params)
+    matrices = world_matrices(layout)
+    chains = spine_bones(layout, params)
+
+    names, parents, heads, tails = [], [], [], []
+    chain_bones = {}
+    for name, part, *_ in layout:
+        matrix = matrices[name]
+        if name in chains:
+            starts, ends = (transform_points(matrix, joints) for joints in chains[name])
+        elif part == "Head":
+            # The head bone carries on in the direction of the last neck bone, as long as the head is deep
+            center = matrix[:3, 3]
+            neck_start, neck_end = (transform_points(matrices["Neck"], joints[-1:])[0] for joints in chains["Neck"])
+            direction = neck_end - neck_start
+            direction /= max(np.linalg.norm(direction), 1e-12)
+            starts, ends = center[np.newaxis], (center + direction * params["head_radii_x"])[np.newaxis]
+        else:
+            # Wings extend along their local X axis from the root
+            starts = transform_points(matrix, np.zeros((1, 3)))
+            ends = transform_points(matrix, np.array([[params["wing_length"], 0.0, 0.0]]))
+
+        first = len(names)
+        chain_bones[name] = np.arange(first, first + len(starts))
+        if name == "Body":
+            root_parent = -1
+        else:
+            candidates = chain_bones["Neck" if part == "Head" else "Body"]
+            root_parent = nearest_bone(starts[0], np.asarray(heads), np.asarray(tails), candidates)
+        for index in range(len(starts)):
+            names.append(f"{name}.{index}" if name in chains else name)
+            parents.append(root_parent if index == 0 else first + index - 1)
+        heads.extend(starts)
+        tails.extend(ends)
+
+    heads, tails = np.array(heads), np.array(tails)
+    # Blender deletes bones of zero length, e.g. at a tail tip of zero length
+    short = np.linalg.norm(tails - heads, axis=1) < 1e-4
+    tails[short] = heads[short] + (0.0, 0.0, 1e-3)
+    return tuple(names), tuple(int(parent) for parent in parents), heads, tails
+
+'''Split every polygon of a face array into triangles as a fan around its first corner.'''
+def triangulate(faces):
+    corners = faces.shape[1]
+    if corners == 3:
+        return faces
+    fans = [faces[:, [0, k, k + 1]] for k in range(1, corners - 1)]
+    return np.stack(fans, axis=1).reshape(-1, 3)
+
+'''Largest distance between the volume of part_volume and the surface it stands for.'''
+VOLUME_TOLERANCE = 0.01
+
+'''Solid volume of a part as rings along a spine, (centers, radii) in the space of the part, used to find geometry
+hidden inside it. Tube spines are reduced to the rings of adaptive_samples within VOLUME_TOLERANCE, as culling needs
+far fewer rings than the surface. The head is approximated by the largest circle inside each of a few of its rings.
+The wing membrane is too thin to hide anything and has no volume.'''
+def part_volume(part, params):
+    params = dict(DEFAULT_PARAMS, **params)
+    if part in TUBE_PARTS:
+        spine, steps, _ = part_spine(part, params)
+        return spine(adaptive_samples(spine, steps, VOLUME_TOLERANCE))
+    if part == "Head":
+        num_rings = 16
+        z_angle = pi * np.arange(num_rings + 1) / num_rings
+        centers = np.zeros((num_rings + 1, 3))
+        centers[:, 2] = np.cos(z_angle) * params["head_radii_z"]
+        radii = np.sin(z_angle) * min(params["head_radii_x"], params["head_radii_y"] * 1.2)
+        return centers, radii
+    return None
+
+'''Mask of the points strictly inside the volume of a spine: between the planes of two consecutive rings and closer to
+the axis than the radius interpolated between them, less margin. Candidate segments are found with a SpatialHash over
+the segment midpoints.'''
+def inside_volume(points, centers, radii, margin=0.0):
+    inside = np.zeros(len(points), dtype=bool)
+    if len(centers) < 2:
+        return inside
+    starts, ends = centers[:-1], centers[1:]
+    axes = ends - starts
+    lengths_sq = np.einsum("ij,ij->i", axes, axes)
+    valid = lengths_sq > 0
+    starts, axes, lengths_sq = starts[valid], axes[valid], lengths_sq[valid]
+    start_radii, end_radii = radii[:-1][valid], radii[1:][valid]
+    if len(starts) == 0:
+        return inside
+    reach = float(np.sqrt(lengths_sq).max() / 2 + max(start_radii.max(), end_radii.max()))
+
+    # Only points in the bounding box of the volume can be inside it
+    low = centers.min(axis=0) - reach
+    high = centers.max(axis=0) + reach
+    nearby = np.nonzero(np.all((points > low) & (points < high), axis=1))[0]
+    if len(nearby) == 0 or reach <= 0:
+        return inside
+
+    index = SpatialHash(starts + axes / 2, reach)
+    point_index, segment = index.within(points[nearby], reach)
+    offsets = points[nearby[point_index]] - starts[segment]
+    t = np.einsum("ij,ij->i", offsets, axes[segment]) / lengths_sq[segment]
+    radial = np.linalg.norm(offsets - t[:, np.newaxis] * axes[segment], axis=1)
+    radius = start_radii[segment] + t * (end_radii[segment] - start_radii[segment])
+    hits = (t >= 0) & (t <= 1) & (radial < radius - margin)
+    inside[nearby[point_index[hits]]] = True
+    return inside
+
+'''Close the gap between two boundary rings that meet at a junction but whose vertices do not coincide, e.g. a neck
+with fewer vertices per ring than the body. The vertices of both rings are ordered by angle around the junction and
+zipped together with a strip of triangles.'''
+def bridge_junction(verts, ring_a, ring_b):
+    center = verts[ring_a].mean(axis=0)
+    # The first two principal directions of the ring span its plane
+    _, _, basis = np.linalg.svd(verts[ring_a] - center)
+    angles = []
+    for ring in (ring_a, ring_b):
+        offsets = verts[ring] - center
+        angles.append(np.mod(np.arctan2(offsets @ basis[1], offsets @ basis[0]), 2 * pi))
+    order_a, order_b = np.argsort(angles[0]), np.argsort(angles[1])
+    ring_a, ring_b = ring_a[order_a], ring_b[order_b]
+    angle_a, angle_b = angles[0][order_a], angles[1][order_b]
+    n, m = len(ring_a), len(ring_b)
+
+    # Every step advances along the ring whose next vertex comes first and adds one triangle
+    next_angles = np.concatenate((angle_a[1:], [angle_a[0] + 2 * pi], angle_b[1:], [angle_b[0] + 2 * pi]))
+    from_a = np.concatenate((np.ones(n, dtype=bool), np.zeros(m, dtype=bool)))[np.argsort(next_angles, kind="stable")]
+    i = np.cumsum(from_a) - from_a
+    j = np.cumsum(~from_a) - ~from_a
+    a_now, a_next = ring_a[i % n], ring_a[(i + 1) % n]
+    b_now, b_next = ring_b[j % m], ring_b[(j + 1) % m]
+    return np.where(from_a[:, np.newaxis], np.stack((a_now, a_next, b_now), axis=-1),
+                    np.stack((a_now, b_next, b_now), axis=-1)).astype(np.int32)
+
+'''Merge vertices of different groups closer than distance, found with a SpatialHash, keeping the lowest index of
+every cluster. Returns the faces pointing to the kept vertices. A distance of 0 welds nothing.'''
+def weld_vertices(verts, faces, groups, distance):
+    if distance <= 0:
+        return faces
+    index = SpatialHash(verts, distance)
+    a, b = index.within(verts, distance)
+    cross = groups[a] != groups[b]
+    a, b = a[cross], b[cross]
+    target = np.arange(len(verts))
+    while True:
+        merged = target.copy()
+        np.minimum.at(merged, a, target[b])
+        merged = merged[merged]
+        if np.array_equal(merged, target):
+            break
+        target = merged
+    return target[faces]
+
+'''Boundary rings where the parts of a creature meet: the first ring of the neck sits on the last ring of the body and
+the first ring of the tail on the first ring of the body.'''
+JUNCTIONS = (("Neck", 0, "Body", -1), ("Tail", 0, "Body", 0))
+
+'''All the parts of a creature merged into one indexed triangle mesh in world space. Junction rings are welded when
+their vertices coincide within weld_distance and bridged with a strip of triangles otherwise. With cull_hidden on,
+faces whose corners are all inside another part (e.g. the top of the legs and the root of the wings inside the body)
+are removed. Vertices no longer used by any face are dropped. With shading on, the texture coordinates and normals of
+the parts (see part_shading) are carried along and returned as (verts, faces, uvs, normals).'''
+def single_mesh_geometry(params, detail=1.0, shading=False):
+    params = dict(DEFAULT_PARAMS, **params)
+    layout = parts_layout(params)
+    matrices = world_matrices(layout)
+
+    parts = {}
+    all_verts = []
+    all_faces = []
+    groups = []
+    rings = {}
+    shades = {}
+    all_shades = []
+    offset = 0
+    for group, (name, part, _, _) in enumerate(layout):
+        if part not in parts:
+            parts[part] = part_geometry(part, params, detail)
+            if shading:
+                shades[part] = vertex_shading(part, *parts[part])
+        verts, faces = parts[part]
+        all_verts.append(transform_points(matrices[name], verts))
+        if shading:
+            uvs, normals, periodic = shades[part]
+            all_shades.append((uvs, normals @ matrices[name][:3, :3].T, np.full(len(verts), periodic)))
+        all_faces.append(triangulate(faces) + offset)
+        groups.append(np.full(len(verts), group))
+        if part in TUBE_PARTS:
+            ring_verts = tube_sampling(part, params, detail)[2]
+            rings[name] = (offset + np.arange(ring_verts), offset + len(verts) - ring_verts + np.arange(ring_verts))
+        offset += len(verts)
+    verts = np.concatenate(all_verts)
+    faces = np.concatenate(all_faces)
+    groups = np.concatenate(groups)
+    distance = params["weld_distance"]
+
+    # Bridge the junction rings that the weld below cannot close. A ring has at most a few hundred vertices, so the
+    # distances between two rings are compared directly; a grid with cells the size of the weld distance would have to
+    # search ever wider for rings that are far apart.
+    bridges = []
+    for part_a, end_a, part_b, end_b in JUNCTIONS:
+        ring_a, ring_b = rings[part_a][end_a], rings[part_b][end_b]
+        gap = np.linalg.norm(verts[ring_a][:, np.newaxis, :] - verts[ring_b][np.newaxis, :, :], axis=-1).min(axis=1)
+        if len(ring_a) != len(ring_b) or gap.max() >= distance:
+            bridges.append(bridge_junction(verts, ring_a, ring_b))
+    faces = np.concatenate([faces] + bridges)
+
+    if params["cull_hidden"]:
+        hidden = np.zeros(len(verts), dtype=bool)
+        for group, (name, part, _, _) in enumerate(layout):
+            volume = part_volume(part, params)
+            if volume is None:
+                continue
+            centers = transform_points(matrices[name], volume[0])
+            hidden |= inside_volume(verts, centers, volume[1], distance + VOLUME_TOLERANCE) & (groups != group)
+        faces = faces[~hidden[faces].all(axis=1)]
+
+    faces = weld_vertices(verts, faces, groups, distance)
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+
+    used, faces = np.unique(faces, return_inverse=True)
+    faces = faces.reshape(-1, 3).astype(np.int32)
+    if shading:
+        uvs, normals, periodic = (np.concatenate(arrays)[used] for arrays in zip(*all_shades))
+        return verts[used], faces, corner_uvs(uvs, faces, periodic), normals.astype(np.float32)
+    return verts[used], faces
+
+'''Parts that are attached to another by design, as {part: part it is attached to}. Their root is meant to be
+inside the other part, so only vertices away from the root count as interpenetration.'''
+JOINTS = {"Neck": "Body", "Tail": "Body", "Head": "Neck", "Leg": "Body", "Wing": "Body"}
+
+'''Parts of a creature that go through each other, as a list of (object, other object, number of vertices of the
+object deeper than VOLUME_TOLERANCE inside the volume of the other), largest first. The vertices of every object at
+detail are tested against the part_volume of every other object whose bounding box they overlap. For the pairs of
+JOINTS, vertices closer to the root of the attached part than its radius there plus the largest radius of the other
+part and attach_depth belong to the joint and are left out. The wing has no volume, so only wings going through other
+parts are found, not the other way round.'''
+def part_collisions(params, detail=1.0):
+    params = dict(DEFAULT_PARAMS, **params)
+    layout = parts_layout(params)
+    matrices = world_matrices(layout)
+
+    parts = {}
+    volumes = {}
+    objects = []
+    for name, part, _, _ in layout:
+        if part not in parts:
+            parts[part] = part_geometry(part, params, detail)[0]
+            volumes[part] = part_volume(part, params)
+        verts = transform_points(matrices[name], parts[part])
+        volume = volumes[part]
+        if volume is not None:
+            volume = (transform_points(matrices[name], volume[0]), volume[1])
+        # The root of tubes is their first ring, the head and the wings grow from their origin
+        if part in TUBE_PARTS:
+            root = (volume[0][0], volume[1][0])
+        else:
+            root = (matrices[name][:3, 3], max(params["head_radii_x"], params["head_radii_y"], params["head_radii_z"])
+                    if part == "Head" else 0.0)
+        objects.append((name, part, verts, verts.min(axis=0), verts.max(axis=0), volume, root))
+
+    collisions = []
+    for name, part, verts, low, high, _, root in objects:
+        for other, other_part, _, other_low, other_high, volume, other_root in objects:
+            if other == name or volume is None or np.any(low > other_high) or np.any(high < other_low):
+                continue
+            candidates = verts
+            joint = root if JOINTS.get(part) == other_part else other_root if JOINTS.get(other_part) == part else None
+            if joint is not None:
+                (center, radius), host = joint, volumes[other_part if joint is root else part]
+                reach = radius + (host[1].max() if host is not None else 0.0) + params["attach_depth"]
+                candidates = verts[np.linalg.norm(verts - center, axis=1) > reach]
+            count = int(np.count_nonzero(inside_volume(candidates, volume[0], volume[1], VOLUME_TOLERANCE)))
+            if count:
+                collisions.append((name, other, count))
+    return sorted(collisions, key=lambda collision: -collision[2])
+
+'''Every object of a creature, including its levels of detail, as (object name, world-space vertices, faces), ready to
+be written to a file. Legs and wings are generated once per level of detail and placed for every object.'''
+def creature_objects(params):
+    return list(iter_creature_objects(params))
+
+'''The objects of creature_objects one at a time, for writers that stream them to a file. The geometry of a part is
+only kept until the last object using it has been yielded, so without levels of detail at most one part is held in
+memory.'''
+def iter_creature_objects(params):
+    layout = creature_lod_layout(params)
+    matrices = world_matrices(layout)
+    remaining = {}
+    for _, part, _, _, detail in layout:
+        remaining[part, detail] = remaining.get((part, detail), 0) + 1
+    parts = {}
+    for name, part, _, _, detail in layout:
+        if (part, detail) not in parts:
+            parts[part, detail] = part_geometry(part, params, detail)
+        verts, faces = parts[part, detail]
+        remaining[part, detail] -= 1
+        if remaining[part, detail] == 0:
+            del parts[part, detail]
+        yield name, transform_points(matrices[name], verts), faces
@@ -0,0 +1,120 @@
+import math
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from creature_geometry import DEFAULT_PARAMS, creature_lod_layout, part_mesh, part_params, triangle_allocation
+
+'''Herds of related creatures, planned and computed without Blender. Every member is the base parameter set with some
+numeric fields drawn from ranges by a seeded generator. The parts of the whole herd are keyed like regenerate_creature
+keys them, so members (and parts) that come out the same share one geometry, and the distinct parts are computed once
+each over a pool of worker processes. procedural_content_generation.py then loads the result into Blender in one pass.'''
+
+'''Parse variation ranges written as "field=low:high, field=low:high" into {field: (low, high)}. Only numeric
+CreatureProperties fields can vary.'''
+def parse_variations(text):
+    variations = {}
+    for item in text.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        field, _, bounds = item.partition("=")
+        field = field.strip()
+        default = DEFAULT_PARAMS.get(field)
+        if isinstance(default, bool) or not isinstance(default, (int, float)):
+            raise ValueError(f"'{field}' is not a numeric creature field")
+        low, _, high = bounds.partition(":")
+        try:
+            low = float(low)
+            high = float(high) if high.strip() else low
+        except ValueError:
+            raise ValueError(f"invalid range '{bounds.strip()}' for '{field}', expected low:high")
+        variations[field] = (min(low, high), max(low, high))
+    return variations
+
+'''Parameters of every member of a herd of count creatures. Every varied field is drawn from its own generator, seeded
+by the herd seed and the field name, so adding a field to the variations does not change the values of the others.
+With steps above 1 float fields take one of steps evenly spaced values in their range, which lets members share parts;
+with steps 0 they vary continuously. Integer fields take every integer in their range.'''
+def herd_params(base, count, seed, variations, steps=0):
+    members = [dict(base) for _ in range(count)]
+    for field, (low, high) in variations.items():
+        rng = np.random.default_rng([seed, zlib.crc32(field.encode("utf-8"))])
+        if isinstance(DEFAULT_PARAMS[field], int):
+            values = rng.integers(int(round(low)), int(round(high)) + 1, count)
+        elif steps > 1:
+            values = np.linspace(low, high, steps)[rng.integers(0, steps, count)]
+        else:
+            values = rng.uniform(low, high, count)
+        for member, value in zip(members, values.tolist()):
+            member[field] = value
+    return members
+
+'''Offset of every member of a herd, in a square grid on the ground with spacing between members.'''
+def herd_offsets(count, spacing):
+    columns = max(1, math.ceil(math.sqrt(count)))
+    index = np.arange(count)
+    return np.stack([(index % columns) * spacing, (index // columns) * spacing, np.zeros(count)], axis=1)
+
+'''Plan a herd: the objects of every member and the distinct parts they need. Returns a list with one list of
+(object name, part, parent, matrix, detail, key) per member, and {key: (part, fields, detail)} of every distinct part,
+where key is the part cache key of part_mesh for those arguments.'''
+def herd_plan(members, cache):
+    plans = []
+    tasks = {}
+    # Members with the same parameters get the same plan, and equal parts the same key, without hashing them again
+    member_plans = {}
+    part_keys = {}
+    for params in members:
+        params = dict(DEFAULT_PARAMS, **params)
+        signature = tuple(sorted(params.items()))
+        if signature not in member_plans:
+            allocation = None
+            if params["use_triangle_budget"]:
+                allocation = cache.get(triangle_allocation, part_params("Creature", params))
+            entries = []
+            for name, part, parent, matrix, detail in creature_lod_layout(params):
+                fields = part_params(part, params, allocation)
+                part_signature = (part, tuple(fields.items()), detail)
+                if part_signature not in part_keys:
+                    part_keys[part_signature] = cache.key(part_mesh, (part, fields, detail))
+                    tasks.setdefault(part_keys[part_signature], (part, fields, detail))
+                entries.append((name, part, parent, matrix, detail, part_keys[part_signature]))
+            member_plans[signature] = entries
+        plans.append(member_plans[signature])
+    return plans, tasks
+
+'''Geometry of every planned part, by key. Parts already in the cache are taken from it, the others are computed over
+workers processes (all cores for None) and added to the cache. When worker processes cannot be started, e.g. inside an
+application whose main module cannot be imported again, the parts are computed in this process.'''
+def herd_geometry(tasks, cache, workers=None):
+    parts = {}
+    missing = []
+    for key in tasks:
+        value = cache.cached(key)
+        if value is None:
+            missing.append(key)
+        else:
+            parts[key] = value
+
+    workers = min(workers or os.cpu_count() or 1, len(missing))
+    results = None
+    if workers > 1:
+        part_names, fields, details = zip(*(tasks[key] for key in missing))
+        try:
+            # Workers are spawned rather than forked, so they do not inherit the state of the host application
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results = list(executor.map(part_mesh, part_names, fields, details,
+                                            chunksize=max(1, len(missing) // (4 * workers))))
+        except (OSError, RuntimeError) as error:
+            print("Computing the herd in this process, worker processes failed:", error)
+    if results is None:
+        results = [part_mesh(*tasks[key]) for key in missing]
+
+    for key, value in zip(missing, results):
+        cache.add(key, value)
+        parts[key] = value
+    return parts
@@ -0,0 +1,66 @@
+'''History of creature generations kept as parameter snapshots instead of mesh copies. Every generation records the
+creature collection and the CreatureProperties values it was made with; undo and redo step through the snapshots and
+the creature is generated again from them, with its parts served by the part cache. A step costs the size of one
+parameter dictionary, whatever the vertex count of the creature.'''
+
+class CreatureHistory:
+    '''Snapshots of the generations, oldest first, and the position of the current one.'''
+
+    def __init__(self, max_steps=100):
+        self.steps = []
+        self.position = -1
+        self.max_steps = max_steps
+
+    '''Change the number of steps kept, dropping the oldest ones beyond it.'''
+    def configure(self, max_steps=100):
+        self.max_steps = max(1, max_steps)
+        self.trim()
+
+    '''Record a generation of the creature in collection with params. Steps that were undone are dropped, like in any
+    undo history, and a generation with the same snapshot as the current step is not recorded again.'''
+    def push(self, collection, params):
+        snapshot = (collection, dict(params))
+        if self.position >= 0 and self.steps[self.position] == snapshot:
+            return
+        del self.steps[self.position + 1:]
+        self.steps.append(snapshot)
+        self.position = len(self.steps) - 1
+        self.trim()
+
+    def trim(self):
+        dropped = max(0, len(self.steps) - self.max_steps)
+        del self.steps[:dropped]
+        self.position = max(-1, self.position - dropped) if self.steps else -1
+
+    def can_undo(self):
+        return self.position > 0
+
+    def can_redo(self):
+        return self.position < len(self.steps) - 1
+
+    '''Step back and return the (collection, params) snapshot to generate, or None at the oldest step.'''
+    def undo(self):
+        if not self.can_undo():
+            return None
+        self.position -= 1
+        return self.steps[self.position]
+
+    '''Step forward and return the (collection, params) snapshot to generate, or None at the newest step.'''
+    def redo(self):
+        if not self.can_redo():
+            return None
+        self.position += 1
+        return self.steps[self.position]
+
+    def clear(self):
+        self.steps = []
+        self.position = -1
+
+    '''One line about the history for the panel.'''
+    def summary(self):
+        if not self.steps:
+            return "No generations yet"
+        return f"Step {self.position + 1} of {len(self.steps)}"
+
+'''History of the Generate Creature operator.'''
+HISTORY = CreatureHistory()
@@ -0,0 +1,138 @@
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+'''Per-stage instrumentation of a creature generation. Every stage records its wall time, the vertices and faces loaded
+into meshes while it ran and, when memory tracing is on, the bytes it allocated and kept plus its peak allocation.
+Stages nest, so a part rebuilt inside regenerate_creature shows up under it. The stages of the last run can be listed
+in the panel and appended as one JSON line per run to a log file, to follow hot paths across versions.'''
+
+class StageProfiler:
+    '''Stages of the current or last profiled run.'''
+
+    def __init__(self, enabled=False, trace_memory=False, log_path=None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.log_path = log_path
+        self.label = None
+        self.running = False
+        self.stages = []
+        self.open = []
+        self.started_tracing = False
+        self.start = 0.0
+        self.total_seconds = 0.0
+
+    '''Change the settings used by the next run.'''
+    def configure(self, enabled=False, trace_memory=False, log_path=None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.log_path = log_path or None
+
+    '''Start a new run, discarding the stages of the previous one.'''
+    def begin(self, label):
+        self.label = label
+        self.stages = []
+        self.open = []
+        self.total_seconds = 0.0
+        if not self.enabled:
+            return
+        self.running = True
+        # Tracing is only stopped again at the end of the run if it was started here
+        self.started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        self.start = time.perf_counter()
+
+    '''Finish the run and append it to the log. extra is stored with the run, e.g. the parameters it was made with.'''
+    def end(self, extra=None):
+        if not self.running:
+            return
+        self.running = False
+        self.total_seconds = time.perf_counter() - self.start
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        if self.log_path:
+            self.write_log(extra)
+
+    '''Record the stage run inside the with block. Yields the record of the stage, or None when profiling is off.'''
+    @contextmanager
+    def stage(self, name):
+        if not self.running:
+            yield None
+            return
+        record = {"stage": name, "depth": len(self.open), "seconds": 0.0, "verts": 0, "faces": 0}
+        self.stages.append(record)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is reset for this stage, so the enclosing stage keeps the peak it reached so far
+            if self.open:
+                self.open[-1]["running_peak"] = max(self.open[-1]["running_peak"], peak)
+            tracemalloc.reset_peak()
+            record["running_peak"] = current
+        self.open.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            self.open.pop()
+            if tracing and tracemalloc.is_tracing():
+                after, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, record.pop("running_peak"))
+                record["alloc_bytes"] = after - current
+                record["peak_bytes"] = peak - current
+                if self.open:
+                    self.open[-1]["running_peak"] = max(self.open[-1]["running_peak"], peak)
+            else:
+                record.pop("running_peak", None)
+
+    '''Add the vertices and faces of a mesh to every open stage.'''
+    def count(self, num_verts, num_faces):
+        for record in self.open:
+            record["verts"] += int(num_verts)
+            record["faces"] += int(num_faces)
+
+    '''Decorator recording every call of a function as a stage named after it.'''
+    def profiled(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.stage(function.__name__):
+                return function(*args, **kwargs)
+        return wrapper
+
+    '''One line per stage of the last run, indented by nesting, for the panel.'''
+    def summary_lines(self):
+        lines = []
+        for record in self.stages:
+            line = f"{'  ' * record['depth']}{record['stage']}: {record['seconds'] * 1000:.1f} ms"
+            if record["verts"]:
+                line += f", {record['verts']} verts, {record['faces']} faces"
+            if "alloc_bytes" in record:
+                line += f", {record['peak_bytes'] / (1024 * 1024):.1f} MB peak"
+            lines.append(line)
+        if self.stages:
+            lines.append(f"Total: {self.total_seconds * 1000:.1f} ms")
+        return lines
+
+    '''Append the last run to the JSON-lines log.'''
+    def write_log(self, extra=None):
+        entry = {"label": self.label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "total_seconds": self.total_seconds, "stages": self.stages}
+        if extra:
+            entry.update(extra)
+        try:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.log_path, "a") as file:
+                file.write(json.dumps(entry) + "\n")
+        except OSError as error:
+            print("Failed to write the profile log:", error)
+
+'''Profiler of the Blender operator.'''
+PROFILER = StageProfiler()
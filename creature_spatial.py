@@ -0,0 +1,116 @@
+import numpy as np
+
+'''Spatial index over points for the geometry core, in plain NumPy. Points are bucketed in a uniform grid so that a query
+only looks at the points in the cells around it, which keeps the cost of welding, culling and surface queries close to
+linear in the number of vertices.'''
+
+'''Number of query to point distances computed at once by the direct search of SpatialHash.nearest.'''
+DIRECT_SEARCH_SIZE = 1 << 20
+
+class SpatialHash:
+    '''Uniform grid over a set of points with vectorized neighbor queries.'''
+
+    def __init__(self, points, cell_size):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+        self.origin = self.points.min(axis=0) if len(self.points) else np.zeros(3)
+        # Largest side of the bounding box, the widest a nearest point search ever has to go
+        self.extent = float(np.ptp(self.points, axis=0).max()) if len(self.points) else 0.0
+        keys = self.cell_keys(self.cell_coords(self.points))
+        self.order = np.argsort(keys, kind="stable")
+        # Occupied cells with the range of their points in self.order
+        self.cells, self.cell_starts, self.cell_counts = np.unique(keys[self.order], return_index=True,
+                                                                   return_counts=True)
+
+    def cell_coords(self, points):
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    '''One integer per cell. Cells are wrapped in a large box so that the key fits in 64 bits; points far away from
+    each other may share a key, which only adds candidates that the distance checks then reject.'''
+    def cell_keys(self, coords):
+        coords = coords & 0x1FFFFF
+        return (coords[..., 0] << 42) | (coords[..., 1] << 21) | coords[..., 2]
+
+    '''Pairs (query index, point index) of every point in the (2 * reach + 1) ** 3 cells around each query.'''
+    def candidate_pairs(self, queries, reach=1):
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        if len(self.cells) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1).reshape(-1, 3)
+
+        # Neighbor cells are looked up once per distinct query cell, as nearby queries share them
+        coords = self.cell_coords(queries)
+        _, first, inverse = np.unique(self.cell_keys(coords), return_index=True, return_inverse=True)
+        keys = self.cell_keys(coords[first][:, np.newaxis, :] + offsets)
+        found = np.minimum(np.searchsorted(self.cells, keys), len(self.cells) - 1)
+        hit = self.cells[found] == keys
+        starts = self.cell_starts[found][inverse.ravel()].ravel()
+        counts = np.where(hit, self.cell_counts[found], 0)[inverse.ravel()].ravel()
+
+        query_index = np.repeat(np.repeat(np.arange(len(queries)), len(offsets)), counts)
+        first = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        point_index = self.order[first + np.arange(counts.sum())]
+        return query_index, point_index
+
+    '''Pairs (query index, point index) of the points closer than radius to each query. Queries are processed in
+    chunks to bound the memory of the candidate pairs. No point is closer than a radius of 0.'''
+    def within(self, queries, radius, chunk=20000):
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        if radius <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        reach = max(1, int(np.ceil(radius / self.cell_size)))
+        found_queries = []
+        found_points = []
+        for begin in range(0, len(queries), chunk):
+            query_index, point_index = self.candidate_pairs(queries[begin:begin + chunk], reach)
+            distances = np.linalg.norm(queries[begin + query_index] - self.points[point_index], axis=1)
+            close = distances < radius
+            found_queries.append(begin + query_index[close])
+            found_points.append(point_index[close])
+        if not found_queries:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(found_queries), np.concatenate(found_points)
+
+    '''Index of and distance to the nearest point for every query. The search widens cell by cell for queries that have
+    no point in the cells around them.'''
+    def nearest(self, queries, chunk=20000):
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        best_index = np.full(len(queries), -1, dtype=np.int64)
+        best_distance = np.full(len(queries), np.inf)
+        if len(self.points) == 0:
+            return best_index, best_distance
+
+        pending = np.arange(len(queries))
+        reach = 1
+        while len(pending):
+            for begin in range(0, len(pending), chunk):
+                batch = pending[begin:begin + chunk]
+                query_index, point_index = self.candidate_pairs(queries[batch], reach)
+                if len(query_index) == 0:
+                    continue
+                distances = np.linalg.norm(queries[batch[query_index]] - self.points[point_index], axis=1)
+                # Keep the closest candidate of every query
+                order = np.lexsort((distances, query_index))
+                first = np.ones(len(order), dtype=bool)
+                first[1:] = query_index[order][1:] != query_index[order][:-1]
+                winners = order[first]
+                best_index[batch[query_index[winners]]] = point_index[winners]
+                best_distance[batch[query_index[winners]]] = distances[winners]
+
+            # A point found within `reach` cells is only guaranteed to be the nearest when it is closer than the
+            # distance covered by those cells in every direction, otherwise search wider.
+            pending = pending[~(best_distance[pending] <= reach * self.cell_size)]
+            reach *= 2
+            if (2 * reach + 1) ** 3 > len(self.points) or reach * self.cell_size > 2 * self.extent + 2 * self.cell_size:
+                # Too far from every point for the grid to help, as the cells to look at would outnumber the points:
+                # fall back to a direct search, in blocks of queries that bound the memory of the distances
+                block = max(1, DIRECT_SEARCH_SIZE // len(self.points))
+                for begin in range(0, len(pending), block):
+                    batch = pending[begin:begin + block]
+                    distances = np.linalg.norm(queries[batch][:, np.newaxis, :] - self.points[np.newaxis, :, :],
+                                               axis=-1)
+                    best_index[batch] = np.argmin(distances, axis=1)
+                    best_distance[batch] = distances[np.arange(len(batch)), best_index[batch]]
+                break
+        return best_index, best_distance
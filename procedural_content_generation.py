@@ -1,139 +1,91 @@
 import bpy
-import bmesh
-from math import cos, sin, pi, radians, sqrt, acos, atan2
 import math
+import numpy as np
 from mathutils import Matrix, Vector, Euler
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+#Make the sibling modules importable when the script is run from Blender's text editor.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from creature_geometry import (DEFAULT_PARAMS, body_geometry, neck_geometry, tail_geometry, head_geometry,
+                               leg_geometry, wing_geometry, part_mesh, part_params, part_shading, creature_layout,
+                               PART_FIELDS, creature_lod_layout, ring_savings, triangle_allocation, creature_bones,
+                               part_skin, part_collisions, TUBE_PARTS)
+from creature_cache import PART_CACHE
+from creature_profile import PROFILER
+from creature_history import HISTORY
+from creature_herd import parse_variations, herd_params, herd_offsets, herd_plan, herd_geometry
+
+'''Name of the UV map the generator writes and the material reads.'''
+UV_LAYER_NAME = "UVMap"
+
+'''Load vertex and face arrays into an empty mesh in bulk with foreach_set instead of building it through bmesh.
+Every row of faces is one polygon, so all polygons of a mesh have the same number of corners. uvs (one per face corner)
+and normals (one per vertex) from part_shading are written the same way when given, and the mesh is then shaded smooth
+with those normals, so it needs neither an unwrap nor a normal recalculation.'''
+def fill_mesh(mesh, verts, faces, uvs=None, normals=None):
+    num_faces, num_corners = faces.shape
+
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(verts, dtype=np.float32).ravel())
+
+    mesh.loops.add(faces.size)
+    # Shared topology templates are uint32; they are passed as int32 without a copy, as their indices always fit
+    indices = np.ascontiguousarray(faces)
+    indices = indices.view(np.int32) if indices.dtype == np.uint32 else indices.astype(np.int32, copy=False)
+    mesh.loops.foreach_set("vertex_index", indices.ravel())
+
+    mesh.polygons.add(num_faces)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, num_corners, dtype=np.int32))
+    # loop_total is derived from loop_start since Blender 4.0 and is read-only there
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", np.full(num_faces, num_corners, dtype=np.int32))
+
+    if uvs is not None:
+        # The loops are laid out face after face, in the same order as the texture coordinates
+        layer = mesh.uv_layers.get(UV_LAYER_NAME) or mesh.uv_layers.new(name=UV_LAYER_NAME)
+        layer.data.foreach_set("uv", np.ascontiguousarray(uvs, dtype=np.float32).ravel())
+    if normals is not None:
+        mesh.polygons.foreach_set("use_smooth", np.ones(num_faces, dtype=bool))
+
+    mesh.update(calc_edges=True)
+    if normals is not None:
+        # Custom normals are only used with auto smooth on before Blender 4.1, which removed the setting
+        if bpy.app.version < (4, 1, 0):
+            mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set_from_vertices(np.ascontiguousarray(normals, dtype=np.float32))
+    PROFILER.count(len(verts), num_faces)
+    return mesh
 
-'''Generate a series of rings for the triangles to connect. The main anchor for the mesh generation.'''
-
-def create_ring(bm, center, radius, num_verts=100):
-    verts = []
-    #Loop to generate a series of connection points for the triangles.
-    for i in range(num_verts):
-        angle = 2 * pi * i / num_verts
-        #Location where the rings are generated
-        y = center[1] + radius * cos(angle)
-        z = center[2] + radius * sin(angle)
-        x = center[0]
-        vert = bm.verts.new((x, y, z))
-        verts.append(vert)
-    return verts
-
-''' Generate a series for rings for the legs as it requires different set of parameters for the leg generation'''
-def create_leg_ring(bm, center, radius, num_verts=100):
-    verts = []
-    #Loop to generate a series of connection points for the triangles.
-    for i in range(num_verts):
-        angle = 2 * pi * i / num_verts
-        x = center[0] + radius * cos(angle)
-        y = center[1] + radius * sin(angle)
-        z = center[2]
-        vert = bm.verts.new((x, y, z))
-        verts.append(vert)
-    return verts
-
-'''Generate the triangle and its faces with the rings to generate a shape'''
-def bridge_rings(bm, verts_a, verts_b):
-    #Checks if the vertices are of equal weight.
-    if len(verts_a) != len(verts_b):
-        return
-    '''Loops to connect the triangles based on the weight of each vertices and takes into consideration and swaps the vertices
-    if the weight do not match.'''
-    for i in range(len(verts_a)):
-        v1 = verts_a[i]
-        v2 = verts_a[(i + 1) % len(verts_a)]
-        v3 = verts_b[i]
-        v4 = verts_b[(i + 1) % len(verts_b)]
-        
-        '''The process of triangulation and generates a series of triangles( i.e. three vertices for triangles, change this for
-        different polygons'''
-        bm.faces.new([v1, v2, v3])
-        bm.faces.new([v2, v3, v4])
-    
-'''Generate rings for the head. A seperate function for the head as the logic behind creating a head requires more consideration
-due to different mathematical factors '''
-
-def create_head_ring(bm, center, ring_radius, ellipsoid_radius, num_verts):
-    verts = []
-    #Similar to create_ring function but with two additional parameter to consider due to the hade shape being slighlty different.
-    for i in range(num_verts):
-        angle = 2 * pi * i / num_verts
-        x = center[0] + ellipsoid_radius * cos(angle)
-        y = center[1] + ring_radius * sin(angle)
-        z = center[2]
-        vert = bm.verts.new((x, y, z))
-        verts.append(vert)
-    return verts
-
-'''Generate a series of triangles to connect each of the triangles generated based on the parameters'''
-def head_bridge_rings(bm, verts_a, verts_b):
-    for i in range(len(verts_a)):
-        v1 = verts_a[i]
-        v2 = verts_a[(i + 1) % len(verts_a)]
-        v3 = verts_b[i]
-        v4 = verts_b[(i + 1) % len(verts_b)]
-        face_verts = [v1, v2, v4, v3]
-        bm.faces.new(face_verts)
-
-'''Logical algorithm for the generation of head after the triangles are generated. 
-The head usually is an ellipsoid shape so the generation of head at the start generates a simple ellipsoid shape but changes with
-parameters provided by the user to give a more organic head.'''
-def create_head(bm, center, radii, num_segments=200, num_rings=100):
-    # Create vertex rings for the ellipsoid
-    for i in range(num_rings + 1):
-        z_angle = pi * i / num_rings
-        z = center[2] + cos(z_angle) * radii[2]
-        ring_radius = sin(z_angle) * radii[1]
-
-        # A logical statement that provides a smooth curve by adjusting the num_segments at the top.
-        if i < num_rings * 0.25:
-            num_segments_top = num_segments
-        else:
-            num_segments_top = int(num_segments * 1.5)
-
-        verts = []
-        # Loops over to generate the head by adjusting the shape and othedr factors of the head.
-        for j in range(num_segments_top):
-            angle = 2 * pi * j / num_segments
-            x = center[0] + radii[0] * cos(angle)
-
-            # Adjust the y-coordinate for the top vertices to create a rounded shape
-            y = center[1] + ring_radius * sin(angle) * 1.2  # Adjust this factor for desired roundness
-
-            vert = bm.verts.new((x, y, z))
-            verts.append(vert)
-        #Checks to see if the num_rings is not 0. If it is, the generation of triangles fails.
-        if i > 0:
-            head_bridge_rings(bm, prev_verts, verts)
-        prev_verts = verts
-
-'''Properties and parameters for the head shape and assigning an empty mesh to the head.'''
-def create_head_mesh(head_radii):
-    # Create a new mesh
-    mesh = bpy.data.meshes.new("HeadMesh")
-    bm = bmesh.new()
+'''Create a new mesh from vertex and face arrays, and optionally texture coordinates and normals, see fill_mesh.'''
+def mesh_from_arrays(name, verts, faces, uvs=None, normals=None):
+    return fill_mesh(bpy.data.meshes.new(name), verts, faces, uvs, normals)
 
+'''Properties and parameters for the head shape and assigning an empty mesh to the head. max_verts caps the vertex
+count of the head, 0 for no limit.'''
+@PROFILER.profiled
+def create_head_mesh(head_radii, num_segments=200, num_rings=100, max_verts=0):
     # Define the center and radii of the head
     center = (0, 0, 0)
 
     # Create the head mesh using the defined parameters
-    create_head(bm, center, head_radii)
+    verts, faces = PART_CACHE.get(head_geometry, center, head_radii, num_segments, num_rings, max_verts)
 
-    # Assign the mesh data to the bmesh
-    bm.to_mesh(mesh)
-    bm.free()
-
-    return mesh
+    # Load the arrays into a new mesh
+    return mesh_from_arrays("HeadMesh", verts, faces, *part_shading("Head", verts, faces))
 
 '''Attach the head mesh to the body'''
-def create_and_attach_head(body_obj, neck_length, head_radii):
+@PROFILER.profiled
+def create_and_attach_head(body_obj, neck_length, head_radii, num_segments=200, num_rings=100, max_verts=0):
     # Check if the 'Head' object already exists in the scene collection
     head_obj = bpy.data.objects.get("Head")
 
     if head_obj is None:
         # Create the head mesh only if it doesn't exist
-        head_mesh = create_head_mesh(head_radii)
+        head_mesh = create_head_mesh(head_radii, num_segments, num_rings, max_verts)
         head_obj = bpy.data.objects.new("Head", head_mesh)
         bpy.context.collection.objects.link(head_obj)
 
@@ -147,37 +99,11 @@ def create_and_attach_head(body_obj, neck_length, head_radii):
     return head_obj
 
 '''Generate the body mesh based on the parameters'''
+@PROFILER.profiled
 def create_body(length, start_radius, max_radius, wave_amplitude, wave_frequency, num_verts=100):
-    # Create a new mesh
-    mesh = bpy.data.meshes.new("BodyMesh")
-    bm = bmesh.new()
-
-    step_size = 0.1
-    steps = int(length / step_size)
-
-    prev_ring_verts = None
-    last_center = (0, 0, 0)
-    last_radius = start_radius
-    top_center = (length, 0, 0)
-    bottom_center = (0, 0, 0)
-    #Loop to generate the body mesh after the parameters are provided by the user.
-    for i in range(steps + 1):
-        radius = start_radius + (max_radius - start_radius) * abs(sin(pi * i / steps))
-        wave_y = wave_amplitude * sin(i / wave_frequency * 2 * pi)
-        
-        center = (i * step_size, wave_y, 0)
-        last_center = center
-        last_radius = radius
-        ring_verts = create_ring(bm, center, radius, num_verts)
-        
-        if prev_ring_verts:
-            bridge_rings(bm, prev_ring_verts, ring_verts)
-
-        prev_ring_verts = ring_verts
-    
-    # Assign the mesh data to the bmesh
-    bm.to_mesh(mesh)
-    bm.free()
+    verts, faces, top_center, bottom_center, last_center, last_radius = PART_CACHE.get(
+        body_geometry, length, start_radius, max_radius, wave_amplitude, wave_frequency, num_verts)
+    mesh = mesh_from_arrays("BodyMesh", verts, faces, *part_shading("Body", verts, faces))
 
     # Create a new body object and link it to the scene
     obj = bpy.data.objects.new("Body", mesh)
@@ -187,31 +113,11 @@ def create_body(length, start_radius, max_radius, wave_amplitude, wave_frequency
     return obj, top_center, bottom_center, last_center, last_radius
 
 '''Generate the tail for the creature based on the parameters provided'''
+@PROFILER.profiled
 def create_tail(body_obj, start_center, start_radius, length, tip_radius, wave_amplitude, wave_frequency, num_verts=100):
-    # Create a new mesh
-    mesh = bpy.data.meshes.new("TailMesh")
-    bm = bmesh.new()
-
-    step_size = length / num_verts
-    steps = num_verts
-
-    prev_ring_verts = None
-    #Loop to generate the tail mesh after the parameters are provided by the user.
-    for i in range(steps + 1):
-        radius = start_radius - (start_radius - tip_radius) * (i / steps)
-        wave_x = wave_amplitude * sin(i / wave_frequency * 2 * pi)
-        
-        center = (start_center[0] - i * step_size, start_center[1] + wave_x, start_center[2])
-        ring_verts = create_ring(bm, center, radius, num_verts)
-        
-        if prev_ring_verts:
-            bridge_rings(bm, prev_ring_verts, ring_verts)
-
-        prev_ring_verts = ring_verts
-
-    # Assign the mesh data to the bmesh
-    bm.to_mesh(mesh)
-    bm.free()
+    verts, faces = PART_CACHE.get(tail_geometry, start_center, start_radius, length, tip_radius, wave_amplitude,
+                                  wave_frequency, num_verts)
+    mesh = mesh_from_arrays("TailMesh", verts, faces, *part_shading("Tail", verts, faces))
 
     # Create a new tail object and link it to the scene
     obj = bpy.data.objects.new("Tail", mesh)
@@ -222,31 +128,11 @@ def create_tail(body_obj, start_center, start_radius, length, tip_radius, wave_a
     return obj
 
 '''Generate the neck for the creature based on the parameters provided'''
+@PROFILER.profiled
 def create_neck(body_obj, start_center, start_radius, length, end_radius, orientation='x', wave_amplitude=0.3, wave_frequency=30, num_verts=100):
-    # Create a new mesh
-    mesh = bpy.data.meshes.new("NeckMesh")
-    bm = bmesh.new()
-
-    step_size = length / num_verts
-    steps = num_verts
-
-    prev_ring_verts = None
-    #Loop to generate the tail mesh after the parameters are provided by the user.
-    for i in range(steps + 1):
-        radius = start_radius + (end_radius - start_radius) * (i / steps)
-        wave_offset = wave_amplitude * math.sin(i / steps * math.pi * 2)
-        
-        center = (start_center[0] + i * step_size, start_center[1], start_center[2] + wave_offset)
-        ring_verts = create_ring(bm, center, radius, num_verts)
-        
-        if prev_ring_verts:
-            bridge_rings(bm, prev_ring_verts, ring_verts)
-
-        prev_ring_verts = ring_verts
-
-    # Assign the mesh data to the bmesh
-    bm.to_mesh(mesh)
-    bm.free()
+    verts, faces = PART_CACHE.get(neck_geometry, start_center, start_radius, length, end_radius, wave_amplitude,
+                                  wave_frequency, num_verts)
+    mesh = mesh_from_arrays("NeckMesh", verts, faces, *part_shading("Neck", verts, faces))
 
     # Create a new object and link it to the scene
     obj = bpy.data.objects.new("Neck", mesh)
@@ -261,10 +147,16 @@ def create_neck(body_obj, start_center, start_radius, length, end_radius, orient
     return obj
 
 '''Generate the neck for the creature based on the parameters provided. Legs have additional parameters due to the 
-nature of the leg as it has more elements'''
-def create_leg(start_point, end_point, radius, position, thigh_height, shin_height, foot_height, thigh_radius, shin_radius, foot_radius, num_segments=20):
-    # Create a new mesh and object
-    mesh = bpy.data.meshes.new("AnimalLeg")
+nature of the leg as it has more elements. A mesh made by an earlier call can be passed to link it instead of
+building a new one.'''
+@PROFILER.profiled
+def create_leg(start_point, end_point, radius, position, thigh_height, shin_height, foot_height, thigh_radius, shin_radius, foot_radius, num_segments=20, mesh=None):
+    if mesh is None:
+        verts, faces = PART_CACHE.get(leg_geometry, thigh_height, shin_height, foot_height, thigh_radius, shin_radius,
+                                      foot_radius)
+        mesh = mesh_from_arrays("AnimalLeg", verts, faces, *part_shading("Leg", verts, faces))
+
+    # Create a new object
     obj = bpy.data.objects.new("AnimalLeg", mesh)
 
     # Link the object to the scene
@@ -275,51 +167,9 @@ def create_leg(start_point, end_point, radius, position, thigh_height, shin_heig
     # Set the position of the leg object
     obj.location = position
 
-    # Initialize a bmesh object and start with the thigh
-    bm = bmesh.new()
-
-    # Parameters for the leg parts
-    segments = 100  # Number of segments per part of the leg
-
-    prev_verts = None
-
-    # New bending parameters
-    thigh_bend = -0.5
-    shin_bend = -0.1
-    foot_bend = 0.5
-
-    for i in range(segments):
-        # Calculate the radius and center for this segment with bending
-        if i < segments / 3:
-            # Thigh with bend
-            radius = thigh_radius - (i / segments) * (thigh_radius - shin_radius)
-            height = (i / segments) * thigh_height
-            center_offset = thigh_bend  # bend for thigh
-        elif i < 2 * segments / 3:
-            # Shin with bend
-            radius = shin_radius - ((i - segments / 3) / segments) * (shin_radius - foot_radius)
-            height = thigh_height + ((i - segments / 3) / segments) * shin_height
-            center_offset = shin_bend  # bend for shin
-        else:
-            # Foot with bend
-            radius = foot_radius
-            height = thigh_height + shin_height + ((i - 2 * segments / 3) / segments) * foot_height
-            center_offset = foot_bend  # bend for foot
-
-        # Apply bending to the center offset based on the segment's height
-        center = (center_offset * height, 0, height)
-        new_verts = create_leg_ring(bm, center, radius)
-
-        if prev_verts:
-            bridge_rings(bm, prev_verts, new_verts)
-        prev_verts = new_verts
-
-    # Assign the mesh data to the bmesh
-    bm.to_mesh(mesh)
-    bm.free()
-
     return obj
 
+@PROFILER.profiled
 def visualize_leg_points(body_obj, num_legs=8, leg_distance=0.5, leg_height=0.5, thigh_height=1.5, shin_height=1.0, foot_height=0.5, thigh_radius=0.2, shin_radius=0.2, foot_radius=0.1):
     
     attachment_points = []
@@ -345,12 +195,16 @@ def visualize_leg_points(body_obj, num_legs=8, leg_distance=0.5, leg_height=0.5,
     if num_legs % 2 != 0:
         x_offset = body_length  / (num_legs + 1)
 
+    # Every leg has the same shape, so the mesh is built once and linked by all of them
+    leg_mesh = None
+
     # Visualize attachment points and create legs
     for i in range(num_legs):
 
         # Create leg object with a unique name based on its position
         leg_name = f"Leg_{i+1}" 
-        leg_obj = create_leg(Vector((x_offset, 0, leg_z)), Vector((x_offset, 0, leg_z - leg_height)), radius=0.1, position=Vector((x_offset, 0, leg_z)), thigh_height=thigh_height, shin_height=shin_height, foot_height=foot_height, thigh_radius=thigh_radius, shin_radius=shin_radius, foot_radius=foot_radius)
+        leg_obj = create_leg(Vector((x_offset, 0, leg_z)), Vector((x_offset, 0, leg_z - leg_height)), radius=0.1, position=Vector((x_offset, 0, leg_z)), thigh_height=thigh_height, shin_height=shin_height, foot_height=foot_height, thigh_radius=thigh_radius, shin_radius=shin_radius, foot_radius=foot_radius, mesh=leg_mesh)
+        leg_mesh = leg_obj.data
         leg_obj.name = leg_name  # Assign unique name to the leg object
 
         # Set rotation for the leg
@@ -377,41 +231,14 @@ def visualize_leg_points(body_obj, num_legs=8, leg_distance=0.5, leg_height=0.5,
 
 '''Generate the wings for the creature based on the parameters provided by the user.'''
 
-def create_wing(body_obj, position, wing_length, wing_thickness, start_width, end_width, num_verts=20, num_verts_w=10):
-    bm = bmesh.new()
-    verts = []
-
-    for i in range(num_verts):
-        for j in range(num_verts_w):
-            # Calculate the width of the wing at this position based on the start and end widths
-            width = start_width + (end_width - start_width) * (i / num_verts)
-
-            # Calculate the position of each vertex relative to the origin
-            x = (wing_length / num_verts) * i
-            z = (width / num_verts_w) * j * (-1 if j % 2 == 0 else 1)  # Zigzag pattern
-
-            # Apply a sine function to the y-coordinate to create irregularities
-            y_offset = (width / 2) * math.sin((i / num_verts) * math.pi) * math.cos((j / num_verts_w) * math.pi)
-
-            # Create the vertex
-            vert = bm.verts.new((x, y_offset, z))
-            verts.append(vert)
-
-    # Bridge vertices to create faces
-    for i in range(num_verts - 1):
-        for j in range(num_verts_w - 1):
-            v1 = verts[i * num_verts_w + j]
-            v2 = verts[i * num_verts_w + (j + 1)]
-            v3 = verts[(i + 1) * num_verts_w + (j + 1)]
-            v4 = verts[(i + 1) * num_verts_w + j]
-            face_verts = [v1, v2, v3, v4]
-            bm.faces.new(face_verts)
-
-    # Create a new mesh
-    mesh = bpy.data.meshes.new("WingMesh")
-    # Assign the mesh data to the bmesh
-    bm.to_mesh(mesh)
-    bm.free()
+@PROFILER.profiled
+def create_wing(body_obj, position, wing_length, wing_thickness, start_width, end_width, num_verts=20, num_verts_w=10,
+                mesh=None):
+    # Create a new mesh, unless a mesh made by an earlier call is passed to be linked
+    if mesh is None:
+        verts, faces = PART_CACHE.get(wing_geometry, wing_length, start_width, end_width, num_verts, num_verts_w,
+                                      wing_thickness)
+        mesh = mesh_from_arrays("WingMesh", verts, faces, *part_shading("Wing", verts, faces))
 
     # Create a new object and link it to the scene
     obj = bpy.data.objects.new("Wing", mesh)
@@ -427,6 +254,7 @@ def create_wing(body_obj, position, wing_length, wing_thickness, start_width, en
 '''Visualizae the points in the body where the wings will be placed. A simple logic has been applied to position the wings at the center
 of the body. '''
 
+@PROFILER.profiled
 def visualize_wing_points(body_obj, num_wings=2, wing_distance=0.1, wing_height=1.0, wing_length=20.0, wing_thickness=0.1, start_width=2.0, end_width=1.0):
     attachment_points = []
 
@@ -446,11 +274,15 @@ def visualize_wing_points(body_obj, num_wings=2, wing_distance=0.1, wing_height=
     # Use the same x-offset for both odd and even numbered wings
     x_offset = x_offset_step
 
+    # Every wing has the same shape, so the mesh is built once and linked by all of them
+    wing_mesh = None
+
     # Visualize attachment points and create wings
     for i in range(num_wings):
         # Create wing object with a unique name based on its position
         wing_name = f"Wing_{i+1}" 
-        wing_obj = create_wing(body_obj, Vector((x_offset, wing_y, wing_z)), wing_length, wing_thickness, start_width, end_width)
+        wing_obj = create_wing(body_obj, Vector((x_offset, wing_y, wing_z)), wing_length, wing_thickness, start_width, end_width, mesh=wing_mesh)
+        wing_mesh = wing_obj.data
         wing_obj.name = wing_name  # Assign unique name to the wing object
 
         # Apply rotation for odd and even numbered wings
@@ -478,11 +310,69 @@ def visualize_wing_points(body_obj, num_wings=2, wing_distance=0.1, wing_height=
     return attachment_points
 
 
-'''Applying texture to the mesh by the image provided by the user and adjust the size, shape, color and other factos based on the image nodes'''
+'''Key of a texture file: its resolved path, modification time and size. A cached image or material is reused while
+the key is unchanged, i.e. until the file is edited.'''
+def texture_file_key(image_path):
+    path = os.path.realpath(image_path) if image_path else ""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return f"{path}|missing"
+    return f"{path}|{stat.st_mtime_ns}|{stat.st_size}"
+
+'''Load a texture image once and reuse it while the file is unchanged. The image of an older version of the file is
+reloaded in place rather than loading a second copy.'''
+def load_texture_image(image_path):
+    path = os.path.realpath(image_path)
+    key = texture_file_key(image_path)
+    stale = None
+    for image in bpy.data.images:
+        if image.get("creature_texture_key") == key:
+            return image
+        if image.get("creature_texture_path") == path:
+            stale = image
+
+    if stale is not None and os.path.isfile(path):
+        stale.reload()
+        image = stale
+    else:
+        image = bpy.data.images.load(image_path)
+    image["creature_texture_path"] = path
+    image["creature_texture_key"] = key
+    return image
+
+'''Applying texture to the mesh by the image provided by the user and adjust the size, shape, color and other factos based on the image nodes.
+The material of a path is created once and tagged with a "creature_material" custom property; later calls return it
+and only load the image again when the file changed since (see texture_file_key).'''
+@PROFILER.profiled
 def create_painted_texture_material(image_path, tex_coord_location=(-600, 0),
                                     image_texture_location=(-400, 0),
                                     mapping_location=(-200, 0),
                                     output_location=(200, 0)):
+    source = repr((os.path.realpath(image_path) if image_path else "", tex_coord_location, image_texture_location,
+                   mapping_location, output_location, UV_LAYER_NAME))
+    material = next((material for material in bpy.data.materials
+                     if material.get("creature_material") == source and material.node_tree is not None), None)
+    if material is None:
+        material = build_painted_texture_material(tex_coord_location, image_texture_location, mapping_location,
+                                                  output_location)
+        material["creature_material"] = source
+
+    # The image is only looked up again when the file changed, or when it could not be loaded before
+    key = texture_file_key(image_path)
+    if material.get("creature_texture_key") != key:
+        image_texture_node = next(node for node in material.node_tree.nodes if node.bl_idname == 'ShaderNodeTexImage')
+        try:
+            with PROFILER.stage("image load"):
+                image_texture_node.image = load_texture_image(image_path)  # Load the image from file
+            material["creature_texture_key"] = key
+        except:
+            print("Failed to load image:", image_path)
+
+    return material
+
+'''Create the node tree of the painted texture material, with an empty image texture node.'''
+def build_painted_texture_material(tex_coord_location, image_texture_location, mapping_location, output_location):
     # Create a new material
     material = bpy.data.materials.new(name="PaintedTextureMaterial")
     material.use_nodes = True
@@ -498,18 +388,14 @@ def create_painted_texture_material(image_path, tex_coord_location=(-600, 0),
     # Create image texture node
     image_texture_node = nodes.new(type='ShaderNodeTexImage')
     image_texture_node.location = image_texture_location
-    try:
-        image_texture_node.image = bpy.data.images.load(image_path)  # Load the image from file
-    except:
-        print("Failed to load image:", image_path)
 
     # Create mapping node to adjust texture coordinates
     mapping_node = nodes.new(type='ShaderNodeMapping')
     mapping_node.location = mapping_location
-    mapping_node.inputs['Scale'].default_value = (0.1, 0.1, 0.1)  # Adjust scale as needed
+    mapping_node.inputs['Scale'].default_value = (1.0, 1.0, 1.0)  # The UVs of every part span the image once
 
-    # Create texture coordinate mapping
-    material.node_tree.links.new(tex_coord_node.outputs['Generated'], mapping_node.inputs['Vector'])
+    # Map the image through the UVs every part is generated with, see part_shading
+    material.node_tree.links.new(tex_coord_node.outputs['UV'], mapping_node.inputs['Vector'])
     material.node_tree.links.new(mapping_node.outputs['Vector'], image_texture_node.inputs['Vector'])
 
     # Create output node
@@ -519,6 +405,23 @@ def create_painted_texture_material(image_path, tex_coord_location=(-600, 0),
 
     return material
 
+'''Remove the painted texture materials and texture images that nothing uses any more, such as the material of a
+previous texture file, and the duplicates piled up by versions that created a new material on every click.'''
+def purge_texture_materials(keep=None):
+    for material in list(bpy.data.materials):
+        if material is keep or material.users > 0:
+            continue
+        if "creature_material" in material or material.name.startswith("PaintedTextureMaterial"):
+            bpy.data.materials.remove(material)
+
+    # Images lose their users with the materials above, so they are purged after them
+    texture_paths = {image.get("creature_texture_path") for image in bpy.data.images} - {None}
+    for image in list(bpy.data.images):
+        if image.users > 0:
+            continue
+        if "creature_texture_key" in image or os.path.realpath(bpy.path.abspath(image.filepath)) in texture_paths:
+            bpy.data.images.remove(image)
+
 '''Assigning the materail to the creature and checks if the materials has been assigned properly. Also replaces the materials
 if it is alread assigned with the new material'''
 def assign_material_to_objects(material):
@@ -531,63 +434,491 @@ def assign_material_to_objects(material):
                 # If the object has no materials assigned, append the new material to its material slots
                 obj.data.materials.append(material)
 
+'''Name of the mesh datablock of each part.'''
+PART_MESH_NAMES = {"Body": "BodyMesh", "Neck": "NeckMesh", "Tail": "TailMesh", "Head": "HeadMesh", "Leg": "AnimalLeg",
+                   "Wing": "WingMesh", "Creature": "CreatureMesh"}
+
+'''Read the creature properties into a dictionary of plain values, as used by creature_geometry.'''
+def params_from_properties(props):
+    return {field: getattr(props, field) for field in DEFAULT_PARAMS}
+
+'''Objects made by the generator in a collection, by creature object name. Every generated object is tagged with a
+"creature_object" custom property so that it can be found again even if Blender had to rename it. Only the objects of
+the creature's own collection are looked at, so finding them does not get slower with the number of creatures.'''
+def find_creature_objects(collection):
+    return {obj["creature_object"]: obj for obj in collection.objects if "creature_object" in obj}
+
+'''Whether a collection is a member of a herd. Herd members link meshes shared with the rest of the herd, so only
+Generate Herd may change or remove them. build_herd tags every member it creates, so this costs the same however many
+collections and herds the file holds.'''
+def herd_member(collection):
+    return "creature_herd_member" in collection
+
+'''Collection holding the creature with the given name, created and linked to the scene if it does not exist yet.
+Every creature lives in its own collection, so a scene can hold any number of them. None if the name is taken by a
+herd member, which would otherwise be pulled out of its herd and its shared meshes rebuilt.'''
+def creature_collection(scene, name):
+    collection = bpy.data.collections.get(name)
+    if collection is not None and herd_member(collection):
+        print(f"{name} is a herd member; use New Creature or pick another collection")
+        return None
+    if collection is None:
+        collection = bpy.data.collections.new(name)
+        collection["creature_collection"] = True
+    if scene.collection.children.get(collection.name) is None:
+        scene.collection.children.link(collection)
+    return collection
+
+'''Delete a creature: its collection, its objects, and the meshes and materials that only it used. Everything is
+removed through bpy.data in one batch, without operators, selection or context.'''
+def remove_creature(collection):
+    objects = list(collection.objects)
+    # The data of the objects is meshes, and the armature of a rigged creature
+    data = {obj.data for obj in objects if obj.data is not None}
+    materials = {material for obj in objects if obj.type == 'MESH' for material in obj.data.materials
+                 if material is not None}
+    bpy.data.batch_remove(objects)
+    bpy.data.batch_remove([block for block in data if block.users == 0])
+    bpy.data.batch_remove([material for material in materials if material.users == 0])
+    bpy.data.collections.remove(collection)
+
+'''Delete a generated object and its mesh or armature if nothing else uses it.'''
+def remove_creature_object(obj):
+    data = obj.data
+    bpy.data.objects.remove(obj, do_unlink=True)
+    if data is not None and data.users == 0:
+        bpy.data.batch_remove([data])
+
+'''Allocation of the triangle budget to the parts of the creature, see triangle_allocation. It only depends on the
+fields of the single mesh, which cover the shape and the number of every part.'''
+def creature_allocation(params):
+    return PART_CACHE.get(triangle_allocation, part_params("Creature", params))
+
+'''Bring the creature objects in line with params. Every object stores the key of the part parameters its mesh was
+built from, and only objects whose key changed get their mesh data rebuilt, in place. The placement of every object is
+always updated as it is cheap. Objects that are not part of the creature are never touched. With full=True every mesh
+is rebuilt, and detail below 1 builds a lower resolution proxy of every part (see part_geometry). Objects with the same
+part key share one mesh, so the cost of the legs and wings does not grow with num_legs and num_wings. With
+generate_armature on, the creature is rigged by rig_creature; the armature is not part of the returned objects. parts
+may hold geometry computed beforehand by part key, e.g. by a worker thread, which is used instead of the cache.'''
+def regenerate_creature(params, full=False, detail=1.0, collection=None, parts=None):
+    collection = collection or bpy.context.collection
+    existing = find_creature_objects(collection)
+    # Levels of detail are left out of previews
+    layout = creature_lod_layout(params) if detail >= 1 else creature_layout(params)
+    # A single mesh has no parts for the bones to deform separately
+    rigged = params["generate_armature"] and not params["single_mesh"]
+
+    # Remove the objects the creature no longer has, e.g. legs after lowering num_legs
+    wanted = {entry[0] for entry in layout} | ({ARMATURE_NAME} if rigged else set())
+    for name, obj in existing.items():
+        if name not in wanted:
+            remove_creature_object(obj)
+
+    # The triangle budget is shared between all the parts, so it is allocated once for the whole creature
+    allocation = creature_allocation(params) if params["use_triangle_budget"] else None
+
+    objects = {}
+    # Mesh of every part key built or checked in this pass. Objects of the same shape (every leg, every wing, and
+    # their levels of detail) link the same mesh datablock and only differ in transform.
+    meshes = {}
+    for name, part, parent, matrix, *lod in layout:
+        part_detail = detail * lod[0] if lod else detail
+        fields = part_params(part, params, allocation)
+        key = PART_CACHE.key(part_mesh, (part, fields, part_detail))
+
+        # Vertex groups are stored in the mesh, so on a rigged creature every leg and wing needs a mesh of its own to
+        # follow its own bones
+        share_key = (key, name) if rigged and part in ("Leg", "Wing") else key
+
+        obj = existing.get(name)
+        mesh = meshes.get(share_key)
+        if obj is None:
+            obj = bpy.data.objects.new(name, mesh or bpy.data.meshes.new(PART_MESH_NAMES[part]))
+            collection.objects.link(obj)
+            obj["creature_object"] = name
+        elif mesh is not None and obj.data != mesh:
+            old_mesh = obj.data
+            obj.data = mesh
+            obj.pop("creature_rig", None)
+            if old_mesh is not None and old_mesh.users == 0:
+                bpy.data.meshes.remove(old_mesh)
+        elif mesh is None and share_key != key and obj.data.users > 1:
+            obj.data = bpy.data.meshes.new(PART_MESH_NAMES[part])
+            obj.pop("creature_key", None)
+
+        if mesh is None:
+            if full or obj.get("creature_key") != key:
+                with PROFILER.stage(name):
+                    with PROFILER.stage("geometry"):
+                        if parts is not None and key in parts:
+                            verts, faces, uvs, normals = parts[key]
+                        else:
+                            verts, faces, uvs, normals = PART_CACHE.get(part_mesh, part, fields, part_detail)
+                    with PROFILER.stage("mesh"):
+                        obj.data.clear_geometry()
+                        fill_mesh(obj.data, verts, faces, uvs, normals)
+                # The weights went with the old geometry
+                obj.pop("creature_rig", None)
+            meshes[share_key] = obj.data
+        obj["creature_key"] = key
+
+        obj.parent = objects.get(parent)
+        obj.matrix_parent_inverse.identity()
+        obj.matrix_basis = Matrix(matrix.tolist())
+        # Lower levels of detail sit on top of LOD0 and are only there for export
+        obj.hide_viewport = obj.hide_render = part_detail < detail
+        objects[name] = obj
+
+    if rigged:
+        with PROFILER.stage("armature"):
+            rig_creature(params, layout, objects, existing.get(ARMATURE_NAME), collection, allocation, detail)
+    else:
+        unrig_creature(objects)
+    return objects
+
+'''Name of the armature object of a rigged creature.'''
+ARMATURE_NAME = "Armature"
+
+'''Replace the bones of an armature object with those of creature_bones. Bones can only be made in edit mode, so the
+armature is the active object in edit mode for as long as that takes.'''
+def build_armature(armature_obj, bones):
+    names, parents, heads, tails = bones
+    parents = np.array(parents)
+    # Every bone of a chain starts where the one before ends and is connected to it
+    connected = (parents >= 0) & np.all(np.isclose(heads, tails[parents]), axis=1)
+
+    view_layer = bpy.context.view_layer
+    active = view_layer.objects.active
+    view_layer.objects.active = armature_obj
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = armature_obj.data.edit_bones
+    for bone in list(edit_bones):
+        edit_bones.remove(bone)
+    created = []
+    for name, parent, head, tail, connect in zip(names, parents.tolist(), heads.tolist(), tails.tolist(),
+                                                 connected.tolist()):
+        bone = edit_bones.new(name)
+        bone.head = head
+        bone.tail = tail
+        if parent >= 0:
+            bone.parent = created[parent]
+            bone.use_connect = connect
+        created.append(bone)
+    bpy.ops.object.mode_set(mode='OBJECT')
+    view_layer.objects.active = active
+
+'''Give a part object one vertex group per bone of its part, weighted by part_skin (None for a single bone taking every
+vertex). All the vertices of a ring share their weights, so they are added a ring at a time.'''
+def skin_object(obj, bone_names, skin):
+    obj.vertex_groups.clear()
+    groups = [obj.vertex_groups.new(name=name) for name in bone_names]
+    if skin is None:
+        groups[0].add(range(len(obj.data.vertices)), 1.0, 'REPLACE')
+        return
+    ring_verts, bones, weights = skin
+    for ring, (pair, blend) in enumerate(zip(bones.tolist(), weights.tolist())):
+        indices = range(ring * ring_verts, (ring + 1) * ring_verts)
+        for bone, weight in zip(pair, blend):
+            if weight > 0:
+                groups[bone].add(indices, weight, 'REPLACE')
+
+'''Rig the objects of a creature: an "Armature" object with the bones of creature_bones, and on every part object the
+vertex groups of its bones and an Armature modifier. Levels of detail follow the bones of the object they stand for.
+Like the meshes, the bones are only rebuilt when their key changes, and the weights of an object only when its mesh was
+rebuilt, so regenerating a rigged creature costs little more than an unrigged one.'''
+def rig_creature(params, layout, objects, armature_obj, collection, allocation=None, detail=1.0):
+    num_bones = params["bones_per_part"]
+    bone_fields = dict(part_params("Creature", params), bones_per_part=num_bones)
+    key = PART_CACHE.key(creature_bones, (bone_fields,))
+    if armature_obj is None:
+        armature_obj = bpy.data.objects.new(ARMATURE_NAME, bpy.data.armatures.new(ARMATURE_NAME))
+        collection.objects.link(armature_obj)
+        armature_obj["creature_object"] = ARMATURE_NAME
+    if armature_obj.get("creature_key") != key:
+        build_armature(armature_obj, PART_CACHE.get(creature_bones, bone_fields))
+        armature_obj["creature_key"] = key
+
+    for name, part, parent, _, *lod in layout:
+        obj = objects[name]
+        bone_prefix = parent if lod and lod[0] < 1 else name
+        part_detail = detail * lod[0] if lod else detail
+        fields = dict(part_params(part, params, allocation), bones_per_part=num_bones)
+        rig_key = PART_CACHE.key(part_skin, (part, fields, part_detail))
+        if obj.get("creature_rig") != rig_key:
+            bone_names = [f"{bone_prefix}.{i}" for i in range(num_bones)] if part in TUBE_PARTS else [bone_prefix]
+            skin_object(obj, bone_names, PART_CACHE.get(part_skin, part, fields, part_detail))
+            obj["creature_rig"] = rig_key
+        modifier = obj.modifiers.get(ARMATURE_NAME) or obj.modifiers.new(ARMATURE_NAME, 'ARMATURE')
+        modifier.object = armature_obj
+    return armature_obj
+
+'''Take the vertex groups and the Armature modifier off the objects of a creature that is no longer rigged.'''
+def unrig_creature(objects):
+    for obj in objects.values():
+        if "creature_rig" in obj:
+            modifier = obj.modifiers.get(ARMATURE_NAME)
+            if modifier is not None:
+                obj.modifiers.remove(modifier)
+            obj.vertex_groups.clear()
+            obj.pop("creature_rig")
+
+'''Seconds to wait for more edits before building a preview, so a burst of edits (e.g. dragging a slider) is coalesced
+into one rebuild.'''
+PREVIEW_DEBOUNCE = 0.05
+
+'''Lowest detail of a preview proxy, however far over the frame budget it is. Every part, and the single mesh with its
+weld and culling, is generated and tested down to this detail.'''
+PREVIEW_MIN_DETAIL = 0.05
+
+class LivePreview:
+    '''State of the live preview, shared by the property update callbacks and the preview timer.'''
+
+    def __init__(self):
+        self.scene_name = None
+        self.last_edit = 0.0
+        self.needs_proxy = False
+        self.detail = None
+        # Set while a history snapshot is put back on the panel, so that its properties do not start a preview
+        self.restoring = False
+
+LIVE_PREVIEW = LivePreview()
+
+'''Update callback of the creature properties. With live preview on, it records the edit and starts the preview timer
+if it is not already running.'''
+def creature_property_updated(self, context):
+    if not self.live_preview or LIVE_PREVIEW.restoring:
+        return
+    LIVE_PREVIEW.scene_name = context.scene.name
+    LIVE_PREVIEW.last_edit = time.monotonic()
+    LIVE_PREVIEW.needs_proxy = True
+    if not bpy.app.timers.is_registered(live_preview_tick):
+        bpy.app.timers.register(live_preview_tick, first_interval=PREVIEW_DEBOUNCE)
+
+'''Give the objects without a material the material of the rest of the creature, for parts added by a preview.'''
+def share_creature_material(objects):
+    material = next((obj.data.materials[0] for obj in objects.values() if obj.data.materials), None)
+    if material is not None:
+        for obj in objects.values():
+            if not obj.data.materials:
+                obj.data.materials.append(material)
+
+'''Timer of the live preview. After a burst of edits it first shows a low resolution proxy; the proxy detail adapts so
+that building it stays within the frame budget. Once no edit happened for preview_refine_delay seconds the creature is
+refined to full resolution and the timer stops.'''
+def live_preview_tick():
+    scene = bpy.data.scenes.get(LIVE_PREVIEW.scene_name or "")
+    if scene is None or not scene.creature_properties.live_preview:
+        return None
+    props = scene.creature_properties
+    params = params_from_properties(props)
+    collection = creature_collection(scene, props.creature_collection)
+    if collection is None:
+        return None
+
+    if LIVE_PREVIEW.needs_proxy:
+        LIVE_PREVIEW.needs_proxy = False
+        detail = min(LIVE_PREVIEW.detail or props.preview_detail, props.preview_detail)
+        start = time.perf_counter()
+        share_creature_material(regenerate_creature(params, detail=detail, collection=collection))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        # Coarser proxies when over the frame budget, finer ones (up to preview_detail) when well under it
+        if elapsed_ms > props.preview_budget_ms:
+            detail = max(PREVIEW_MIN_DETAIL, detail * 0.7)
+        elif elapsed_ms < props.preview_budget_ms / 2:
+            detail = min(props.preview_detail, detail * 1.25)
+        LIVE_PREVIEW.detail = detail
+        return PREVIEW_DEBOUNCE
+
+    idle = time.monotonic() - LIVE_PREVIEW.last_edit
+    if idle < props.preview_refine_delay:
+        return max(PREVIEW_DEBOUNCE, props.preview_refine_delay - idle)
+
+    share_creature_material(regenerate_creature(params, collection=collection))
+    return None
+
+'''Load a planned herd into Blender in one pass (see creature_herd.herd_plan). Every distinct part gets one mesh, filled
+once and linked by every object of every member that uses it. Every member gets its own creature collection inside
+collection, placed at its offset; members are named HerdMember so they never take the name of the creature edited
+from the panel.'''
+def build_herd(plans, parts, offsets, collection, material=None):
+    meshes = {}
+    for entries in plans:
+        for _, part, _, _, _, key in entries:
+            if key not in meshes:
+                meshes[key] = mesh_from_arrays(PART_MESH_NAMES[part], *parts[key])
+                if material is not None:
+                    meshes[key].materials.append(material)
+
+    members = []
+    for entries, offset in zip(plans, offsets):
+        member = bpy.data.collections.new("HerdMember")
+        member["creature_collection"] = True
+        member["creature_herd_member"] = True
+        collection.children.link(member)
+        objects = {}
+        for name, part, parent, matrix, detail, key in entries:
+            obj = bpy.data.objects.new(name, meshes[key])
+            member.objects.link(obj)
+            obj["creature_object"] = name
+            obj["creature_key"] = key
+            obj.parent = objects.get(parent)
+            if parent is None:
+                matrix = matrix.copy()
+                matrix[:3, 3] += offset
+            obj.matrix_basis = Matrix(matrix.tolist())
+            obj.hide_viewport = obj.hide_render = detail < 1
+            objects[name] = obj
+        members.append(member)
+    return members
+
+'''Vertex savings of the adaptive rings of the last generated creature, from ring_savings, shown in the panel.'''
+RING_REPORT = {}
+RING_REPORT_FIELDS = sorted(set(PART_FIELDS["Body"] + PART_FIELDS["Neck"] + PART_FIELDS["Tail"] + PART_FIELDS["Leg"])
+                            | {"generate_legs"})
+
+'''Parts going through each other in the last generated creature, from part_collisions, shown in the panel. The check
+runs on the vertices of a half detail creature, which finds the same collisions at a fraction of the cost.'''
+COLLISION_REPORT = []
+COLLISION_DETAIL = 0.5
+
+'''Reports shown in the panel after a generation, as {profiler stage: (function, args)}: the ring savings with
+adaptive rings on and the interpenetration check when asked for. Both are computed through the part cache, or by the
+background worker along with the parts.'''
+def creature_reports(params, check_interpenetration):
+    reports = {}
+    if params["adaptive_rings"]:
+        reports["ring savings"] = (ring_savings, ({field: params[field] for field in RING_REPORT_FIELDS},))
+    if check_interpenetration:
+        reports["interpenetration"] = (part_collisions, (part_params("Creature", params), COLLISION_DETAIL))
+    return reports
+
 '''Class for different properties of the body and the default value and minimum values assigned.'''
 class CreatureProperties(bpy.types.PropertyGroup):
     # Body Properties
-    body_length: bpy.props.FloatProperty(name="Length", default=10.0, min=0.0)
-    body_start_radius: bpy.props.FloatProperty(name="Start Radius", default=0.5, min=0.0)
-    body_max_radius: bpy.props.FloatProperty(name="Max Radius", default=1.5, min=0.0)
-    body_wave_amplitude: bpy.props.FloatProperty(name="Wave Amplitude", default=0.3, min=0.0)
-    body_wave_frequency: bpy.props.FloatProperty(name="Wave Frequency", default=50, min=0.0)
-    body_num_verts: bpy.props.IntProperty(name="Number of Vertices", default=100, min=3)
+    body_length: bpy.props.FloatProperty(name="Length", default=10.0, min=0.0, update=creature_property_updated)
+    body_start_radius: bpy.props.FloatProperty(name="Start Radius", default=0.5, min=0.0, update=creature_property_updated)
+    body_max_radius: bpy.props.FloatProperty(name="Max Radius", default=1.5, min=0.0, update=creature_property_updated)
+    body_wave_amplitude: bpy.props.FloatProperty(name="Wave Amplitude", default=0.3, min=0.0, update=creature_property_updated)
+    body_wave_frequency: bpy.props.FloatProperty(name="Wave Frequency", default=50, min=0.0, update=creature_property_updated)
+    body_num_verts: bpy.props.IntProperty(name="Number of Vertices", default=100, min=3, update=creature_property_updated)
 
     # Neck Properties
-    neck_length: bpy.props.FloatProperty(name="Length", default=3.5, min=0.0)
-    neck_end_radius: bpy.props.FloatProperty(name="End Radius", default=0.2, min=0.0)
-    neck_wave_amplitude: bpy.props.FloatProperty(name="Wave Amplitude", default=0.1, min=0.0)
-    neck_wave_frequency: bpy.props.FloatProperty(name="Wave Frequency", default=60, min=0.0)
-    neck_num_verts: bpy.props.IntProperty(name="Number of Vertices", default=100, min=3)
+    neck_length: bpy.props.FloatProperty(name="Length", default=3.5, min=0.0, update=creature_property_updated)
+    neck_end_radius: bpy.props.FloatProperty(name="End Radius", default=0.2, min=0.0, update=creature_property_updated)
+    neck_wave_amplitude: bpy.props.FloatProperty(name="Wave Amplitude", default=0.1, min=0.0, update=creature_property_updated)
+    neck_wave_frequency: bpy.props.FloatProperty(name="Wave Frequency", default=60, min=0.0, update=creature_property_updated)
+    neck_num_verts: bpy.props.IntProperty(name="Number of Vertices", default=100, min=3, update=creature_property_updated)
 
     # Tail Properties
-    tail_length: bpy.props.FloatProperty(name="Length", default=5.0, min=0.0)
-    tail_tip_radius: bpy.props.FloatProperty(name="Tip Radius", default=0.01, min=0.0)
-    tail_wave_amplitude: bpy.props.FloatProperty(name="Wave Amplitude", default=0.2, min=0.0)
-    tail_wave_frequency: bpy.props.FloatProperty(name="Wave Frequency", default=50, min=0.0)
-    tail_num_verts: bpy.props.IntProperty(name="Number of Vertices", default=100, min=3)
+    tail_length: bpy.props.FloatProperty(name="Length", default=5.0, min=0.0, update=creature_property_updated)
+    tail_tip_radius: bpy.props.FloatProperty(name="Tip Radius", default=0.01, min=0.0, update=creature_property_updated)
+    tail_wave_amplitude: bpy.props.FloatProperty(name="Wave Amplitude", default=0.2, min=0.0, update=creature_property_updated)
+    tail_wave_frequency: bpy.props.FloatProperty(name="Wave Frequency", default=50, min=0.0, update=creature_property_updated)
+    tail_num_verts: bpy.props.IntProperty(name="Number of Vertices", default=100, min=3, update=creature_property_updated)
 
     # Leg Properties
-    num_legs: bpy.props.IntProperty(name = "Number of Legs", default=4, min=1)
-    thigh_height: bpy.props.FloatProperty(name="Thigh Height", default=1.5, min=0.0)
-    shin_height: bpy.props.FloatProperty(name="Shin Height", default=5.0, min=0.0)
-    foot_height: bpy.props.FloatProperty(name="Foot Height", default=0.5, min=0.0)
-    thigh_radius: bpy.props.FloatProperty(name="Thigh Radius", default=0.2, min=0.0)
-    shin_radius: bpy.props.FloatProperty(name="Shin Radius", default=0.2, min=0.0)
-    foot_radius: bpy.props.FloatProperty(name="Foot Radius", default=0.1, min=0.0)
+    num_legs: bpy.props.IntProperty(name = "Number of Legs", default=4, min=1, update=creature_property_updated)
+    thigh_height: bpy.props.FloatProperty(name="Thigh Height", default=1.5, min=0.0, update=creature_property_updated)
+    shin_height: bpy.props.FloatProperty(name="Shin Height", default=5.0, min=0.0, update=creature_property_updated)
+    foot_height: bpy.props.FloatProperty(name="Foot Height", default=0.5, min=0.0, update=creature_property_updated)
+    thigh_radius: bpy.props.FloatProperty(name="Thigh Radius", default=0.2, min=0.0, update=creature_property_updated)
+    shin_radius: bpy.props.FloatProperty(name="Shin Radius", default=0.2, min=0.0, update=creature_property_updated)
+    foot_radius: bpy.props.FloatProperty(name="Foot Radius", default=0.1, min=0.0, update=creature_property_updated)
     leg_distance: bpy.props.FloatProperty(name="Leg Distance", default=0.0, min=0.0)
     leg_height: bpy.props.FloatProperty(name="Leg Height", default=0.0, min=0.0)   
-    generate_legs: bpy.props.BoolProperty(name="Generate Legs", default=False)
+    generate_legs: bpy.props.BoolProperty(name="Generate Legs", default=False, update=creature_property_updated)
 
     # Head Properties
-    head_num_segments: bpy.props.IntProperty(name="Number of Segments", default=200, min=3)
-    head_num_rings: bpy.props.IntProperty(name="Number of Verts", default=100, min=3)
-    head_radii_x: bpy.props.FloatProperty(name="X Radius", default=1.0, min=0.0)
-    head_radii_y: bpy.props.FloatProperty(name="Y Radius", default=1.0, min=0.0)
-    head_radii_z: bpy.props.FloatProperty(name="Z Radius", default=1.0, min=0.0)
+    head_num_segments: bpy.props.IntProperty(name="Number of Segments", default=200, min=3, update=creature_property_updated)
+    head_num_rings: bpy.props.IntProperty(name="Number of Verts", default=100, min=3, update=creature_property_updated)
+    head_radii_x: bpy.props.FloatProperty(name="X Radius", default=1.0, min=0.0, update=creature_property_updated)
+    head_radii_y: bpy.props.FloatProperty(name="Y Radius", default=1.0, min=0.0, update=creature_property_updated)
+    head_radii_z: bpy.props.FloatProperty(name="Z Radius", default=1.0, min=0.0, update=creature_property_updated)
+    head_vertex_budget: bpy.props.IntProperty(name="Vertex Budget", default=0, min=0, update=creature_property_updated)
     
     #Wing Properties
-    num_wings: bpy.props.IntProperty(name="Number of Wings", default=2, min=1)
-    wing_distance: bpy.props.FloatProperty(name="Wing Distance", default=0.1, min=0.0)
-    wing_length: bpy.props.FloatProperty(name="Wing Length", default=10.0, min=0.0)
-    wing_thickness: bpy.props.FloatProperty(name="Wing Thickness", default=0.1, min=0.0)
-    wing_start_width: bpy.props.FloatProperty(name="Wing Start Width", default=2.0, min=0.0)
-    wing_end_width: bpy.props.FloatProperty(name="Wing End Width", default=1.0, min=0.0)
+    num_wings: bpy.props.IntProperty(name="Number of Wings", default=2, min=1, update=creature_property_updated)
+    wing_distance: bpy.props.FloatProperty(name="Wing Distance", default=0.1, min=0.0, update=creature_property_updated)
+    wing_length: bpy.props.FloatProperty(name="Wing Length", default=10.0, min=0.0, update=creature_property_updated)
+    wing_thickness: bpy.props.FloatProperty(name="Wing Thickness", default=0.1, min=0.0, update=creature_property_updated)
+    wing_start_width: bpy.props.FloatProperty(name="Wing Start Width", default=2.0, min=0.0, update=creature_property_updated)
+    wing_end_width: bpy.props.FloatProperty(name="Wing End Width", default=1.0, min=0.0, update=creature_property_updated)
+    wing_num_verts: bpy.props.IntProperty(name="Wing Rows", default=20, min=2, update=creature_property_updated)
+    wing_num_verts_w: bpy.props.IntProperty(name="Wing Columns", default=10, min=2, update=creature_property_updated)
     
     
-    generate_wings: bpy.props.BoolProperty(name="Generate Wings", default=False)
+    generate_wings: bpy.props.BoolProperty(name="Generate Wings", default=False, update=creature_property_updated)
     
+    #Collection Property
+    creature_collection: bpy.props.StringProperty(name="Collection", default="Creature")
+
+    #Herd Properties
+    herd_size: bpy.props.IntProperty(name="Herd Size", default=10, min=1)
+    herd_seed: bpy.props.IntProperty(name="Seed", default=0, min=0)
+    herd_variations: bpy.props.StringProperty(name="Variations", default="body_length=8:12, neck_length=2.5:4.5")
+    herd_steps: bpy.props.IntProperty(name="Variants per Field", default=4, min=0)
+    herd_spacing: bpy.props.FloatProperty(name="Spacing", default=20.0, min=0.0)
+    herd_workers: bpy.props.IntProperty(name="Workers", default=0, min=0)
+
     #Material Property
     material_path: bpy.props.StringProperty(name="Material Path", default="", subtype='FILE_PATH')
 
+    #Cache Properties
+    use_part_cache: bpy.props.BoolProperty(name="Cache Parts", default=True)
+    cache_size_mb: bpy.props.IntProperty(name="Cache Size (MB)", default=256, min=0)
+    cache_directory: bpy.props.StringProperty(name="Cache Directory", default="", subtype='DIR_PATH')
+
+    #Regenerate Property
+    incremental_regenerate: bpy.props.BoolProperty(name="Only Rebuild Changed Parts", default=True)
+
+    #History Property
+    history_steps: bpy.props.IntProperty(name="History Steps", default=100, min=1)
+
+    #Live Preview Properties
+    live_preview: bpy.props.BoolProperty(name="Live Preview", default=False, update=creature_property_updated)
+    preview_detail: bpy.props.FloatProperty(name="Preview Detail", default=0.25, min=PREVIEW_MIN_DETAIL, max=1.0)
+    preview_budget_ms: bpy.props.FloatProperty(name="Frame Budget (ms)", default=33.0, min=1.0)
+    preview_refine_delay: bpy.props.FloatProperty(name="Refine After (s)", default=0.5, min=0.0)
+
+    #Level of Detail Properties
+    generate_lods: bpy.props.BoolProperty(name="Generate LODs", default=False, update=creature_property_updated)
+    num_lods: bpy.props.IntProperty(name="Number of LODs", default=3, min=2, max=8, update=creature_property_updated)
+    lod_ratio: bpy.props.FloatProperty(name="LOD Ratio", default=0.5, min=0.05, max=0.95, update=creature_property_updated)
+
+    #Adaptive Ring Properties
+    adaptive_rings: bpy.props.BoolProperty(name="Adaptive Rings", default=False, update=creature_property_updated)
+    ring_tolerance: bpy.props.FloatProperty(name="Tolerance", default=0.01, min=0.0001, precision=4,
+                                            update=creature_property_updated)
+
+    #Triangle Budget Properties
+    use_triangle_budget: bpy.props.BoolProperty(name="Triangle Budget", default=False, update=creature_property_updated)
+    triangle_budget: bpy.props.IntProperty(name="Triangles", default=50000, min=100, update=creature_property_updated)
+
+    #Single Mesh Properties
+    single_mesh: bpy.props.BoolProperty(name="Single Mesh", default=False, update=creature_property_updated)
+    weld_distance: bpy.props.FloatProperty(name="Weld Distance", default=0.001, min=0.0, precision=4,
+                                           update=creature_property_updated)
+    cull_hidden: bpy.props.BoolProperty(name="Cull Hidden Faces", default=True, update=creature_property_updated)
+
+    #Armature Properties
+    generate_armature: bpy.props.BoolProperty(name="Generate Armature", default=False, update=creature_property_updated)
+    bones_per_part: bpy.props.IntProperty(name="Bones per Part", default=4, min=1, max=32,
+                                          update=creature_property_updated)
+
+    #Attachment Properties
+    snap_attachments: bpy.props.BoolProperty(name="Snap to Body", default=False, update=creature_property_updated)
+    attach_depth: bpy.props.FloatProperty(name="Attach Depth", default=0.05, min=0.0, precision=3,
+                                          update=creature_property_updated)
+    check_interpenetration: bpy.props.BoolProperty(name="Check Interpenetration", default=False)
+
+    #Profiling Properties
+    show_profile: bpy.props.BoolProperty(name="Profiling", default=False)
+    profile_stages: bpy.props.BoolProperty(name="Profile Stages", default=False)
+    profile_memory: bpy.props.BoolProperty(name="Trace Memory", default=False)
+    profile_log_path: bpy.props.StringProperty(name="Profile Log", default="", subtype='FILE_PATH')
+
 
 ''' Define the panel to display the creature properties. The panel is generated in the blender scene below the view tab.'''
 class CreaturePropertiesPanel(bpy.types.Panel):
@@ -601,6 +932,13 @@ class CreaturePropertiesPanel(bpy.types.Panel):
         layout = self.layout
         props = context.scene.creature_properties
 
+        # Creature Collection
+        layout.label(text="Creature:")
+        layout.prop(props, "creature_collection")
+        row = layout.row()
+        row.operator("object.new_creature", text="New Creature")
+        row.operator("object.delete_creature", text="Delete Creature")
+
         # Body Properties
         layout.label(text="Body Properties:")
         layout.prop(props, "body_length")
@@ -646,6 +984,7 @@ class CreaturePropertiesPanel(bpy.types.Panel):
         layout.prop(props, "head_radii_x")
         layout.prop(props, "head_radii_y")
         layout.prop(props, "head_radii_z")
+        layout.prop(props, "head_vertex_budget")
         
         #Wing Properties
         
@@ -657,114 +996,402 @@ class CreaturePropertiesPanel(bpy.types.Panel):
         layout.prop(props, "wing_thickness")
         layout.prop(props, "wing_start_width")
         layout.prop(props, "wing_end_width")
+        layout.prop(props, "wing_num_verts")
+        layout.prop(props, "wing_num_verts_w")
         
+        #Level of Detail Properties
+        layout.label(text="Level of Detail:")
+        layout.prop(props, "generate_lods")
+        layout.prop(props, "num_lods")
+        layout.prop(props, "lod_ratio")
+
+        #Adaptive Ring Properties
+        layout.label(text="Adaptive Rings:")
+        layout.prop(props, "adaptive_rings")
+        layout.prop(props, "ring_tolerance")
+        if props.adaptive_rings:
+            for part, savings in RING_REPORT.items():
+                layout.label(text=f"{part}: {savings['adaptive_verts']} verts, fixed step {savings['fixed_verts']}, "
+                                  f"even spacing at same tolerance {savings['uniform_verts']}")
+
+        #Triangle Budget Properties
+        layout.label(text="Triangle Budget:")
+        layout.prop(props, "use_triangle_budget")
+        layout.prop(props, "triangle_budget")
+        if props.use_triangle_budget:
+            # The allocation is shown before anything is generated, and follows every edit
+            allocation = creature_allocation(params_from_properties(props))
+            for part, entry in allocation.items():
+                rows, columns = entry["resolution"]
+                layout.label(text=f"{part} x{entry['instances']}: {rows} x {columns}, "
+                                  f"{entry['total_triangles']} tris ({entry['share']:.0%})")
+            layout.label(text=f"Total: {sum(entry['total_triangles'] for entry in allocation.values())} "
+                              f"of {props.triangle_budget} tris")
+
+        #Single Mesh Properties
+        layout.label(text="Single Mesh:")
+        layout.prop(props, "single_mesh")
+        layout.prop(props, "weld_distance")
+        layout.prop(props, "cull_hidden")
+
+        #Armature Properties
+        layout.label(text="Armature:")
+        layout.prop(props, "generate_armature")
+        layout.prop(props, "bones_per_part")
+
+        #Attachment Properties
+        layout.label(text="Attachment:")
+        layout.prop(props, "snap_attachments")
+        layout.prop(props, "attach_depth")
+        layout.prop(props, "check_interpenetration")
+        if props.check_interpenetration:
+            for name, other, count in COLLISION_REPORT:
+                layout.label(text=f"{name} goes through {other}: {count} verts")
+            if not COLLISION_REPORT:
+                layout.label(text="No parts go through each other")
+
+        #Herd Properties
+        layout.label(text="Herd:")
+        layout.prop(props, "herd_size")
+        layout.prop(props, "herd_seed")
+        layout.prop(props, "herd_variations")
+        layout.prop(props, "herd_steps")
+        layout.prop(props, "herd_spacing")
+        layout.prop(props, "herd_workers")
+        layout.operator("object.generate_herd", text="Generate Herd")
+
         #Material Properties
         layout.prop(props, "material_path", text="Material File")
 
+        #Cache Properties
+        layout.label(text="Cache:")
+        layout.prop(props, "use_part_cache")
+        layout.prop(props, "cache_size_mb")
+        layout.prop(props, "cache_directory")
+        layout.label(text=PART_CACHE.summary())
+        layout.operator("object.clear_part_cache", text="Clear Cache")
+
+        #Live Preview Properties
+        layout.label(text="Live Preview:")
+        layout.prop(props, "live_preview")
+        layout.prop(props, "preview_detail")
+        layout.prop(props, "preview_budget_ms")
+        layout.prop(props, "preview_refine_delay")
+
+        #Profiling Properties, collapsed by default
+        row = layout.row()
+        row.prop(props, "show_profile", icon='TRIA_DOWN' if props.show_profile else 'TRIA_RIGHT', emboss=False)
+        if props.show_profile:
+            layout.prop(props, "profile_stages")
+            layout.prop(props, "profile_memory")
+            layout.prop(props, "profile_log_path")
+            for line in PROFILER.summary_lines():
+                layout.label(text=line)
+
+        #History Properties
+        layout.label(text="History:")
+        row = layout.row()
+        row.operator("object.creature_undo", text="Undo")
+        row.operator("object.creature_redo", text="Redo")
+        layout.prop(props, "history_steps")
+        layout.label(text=HISTORY.summary())
+
+        layout.prop(props, "incremental_regenerate")
         layout.operator("object.generate_creature", text="Generate Creature")
+        layout.operator("object.generate_creature_background", text="Generate in Background")
+
+'''Apply the cache settings of the panel to the part cache.'''
+def configure_part_cache(props):
+    PART_CACHE.configure(max_bytes=props.cache_size_mb * 1024 * 1024,
+                         directory=bpy.path.abspath(props.cache_directory) if props.cache_directory else None,
+                         enabled=props.use_part_cache)
+
+'''Generate the creature of the panel settings, or of params, into its creature collection and give it its material.
+parts is passed on to regenerate_creature, and may also hold the creature_reports by key. With record on, the
+generation is added to HISTORY. Returns the objects of the creature.'''
+def generate_creature(context, params=None, parts=None, label="generate_creature", record=True):
+    # Get the creature properties
+    props = context.scene.creature_properties
+    collection = creature_collection(context.scene, props.creature_collection)
+    if collection is None:
+        return None
+
+    # Every stage of the generation is timed when profiling is on
+    PROFILER.configure(enabled=props.profile_stages, trace_memory=props.profile_memory,
+                       log_path=bpy.path.abspath(props.profile_log_path) if props.profile_log_path else None)
+    PROFILER.begin(label)
+
+    # Unchanged parts are loaded from the part cache instead of being recomputed
+    with PROFILER.stage("configure cache"):
+        configure_part_cache(props)
+
+    # Generate the body, neck, tail, head, legs and wings, rebuilding only the parts whose parameters changed.
+    # Other objects in the scene are left as they are.
+    params = params or params_from_properties(props)
+    if params["use_triangle_budget"]:
+        # Timed on its own; regenerate_creature then gets it from the part cache. The panel shows the allocation.
+        with PROFILER.stage("triangle allocation"):
+            creature_allocation(params)
+    with PROFILER.stage("regenerate creature"):
+        objects = regenerate_creature(params, full=not props.incremental_regenerate, collection=collection,
+                                      parts=parts)
+
+    # Reports computed by the background worker are taken from parts like the geometry
+    results = {}
+    for stage, (function, args) in creature_reports(params, props.check_interpenetration).items():
+        with PROFILER.stage(stage):
+            key = PART_CACHE.key(function, args)
+            results[function] = parts[key] if parts is not None and key in parts else PART_CACHE.get(function, *args)
+    RING_REPORT.clear()
+    RING_REPORT.update(results.get(ring_savings, {}))
+    COLLISION_REPORT.clear()
+    COLLISION_REPORT.extend(results.get(part_collisions, []))
+
+    with PROFILER.stage("material"):
+        material_path = bpy.path.abspath(params["material_path"])
+        material = create_painted_texture_material(material_path)
+        if material:
+            for obj in objects.values():
+                obj.data.materials.clear()
+                obj.data.materials.append(material)
+        else:
+            print("Material creation failed or material path is invalid.")
+        # Materials and images left without users by earlier clicks are removed so memory stays flat
+        purge_texture_materials(keep=material)
+
+    if record:
+        HISTORY.configure(props.history_steps)
+        HISTORY.push(props.creature_collection, params)
+    PROFILER.end({"params": params})
+    return objects
 
 '''Anchor to take in all the values provided by the user. Assigned to the generate creature button and onclick generates the creatures
-based on the values of the user.'''
+based on the values of the user. No global undo step is pushed, as it would hold a copy of every mesh; every generation
+is recorded in HISTORY instead and undone with OBJECT_OT_CreatureUndo.'''
 class OBJECT_OT_GenerateCreature(bpy.types.Operator):
     bl_idname = "object.generate_creature"
     bl_label = "Generate Creature"
-    bl_options = {'REGISTER', 'UNDO'}
+    bl_options = {'REGISTER'}
 
     def execute(self, context):
-        # Clear the scene and delete all existing objects
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.ops.object.select_by_type(type='MESH')
-        bpy.ops.object.delete()
+        if generate_creature(context) is None:
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+'''Seconds between two checks of the background generation for finished parts.'''
+BACKGROUND_POLL = 0.1
 
-        # Get the creature properties
+'''Generate Creature without blocking Blender. The geometry of the parts that are not cached yet, and the
+creature_reports, are computed in a worker thread while the operator runs modally, reporting every finished task in the
+status bar; Esc cancels. The worker only computes arrays and reports: the cache and bpy.data are only touched on the
+main thread, and the creature is loaded through generate_creature once every task is done. The parameters are taken
+when the operator starts, so edits made while it runs are picked up by the next generation.'''
+class OBJECT_OT_GenerateCreatureBackground(bpy.types.Operator):
+    bl_idname = "object.generate_creature_background"
+    bl_label = "Generate Creature in Background"
+    bl_options = {'REGISTER'}
+
+    def invoke(self, context, event):
         props = context.scene.creature_properties
+        configure_part_cache(props)
+        self.params = params_from_properties(props)
+
+        # The keys are those regenerate_creature uses, parts already cached are not computed again
+        tasks = herd_plan([self.params], PART_CACHE)[1]
+        self.parts = {}
+        for key in list(tasks):
+            value = PART_CACHE.cached(key)
+            if value is not None:
+                self.parts[key] = value
+                del tasks[key]
+
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = {self.executor.submit(part_mesh, *task): (key, task[0]) for key, task in tasks.items()}
+        for stage, (function, args) in creature_reports(self.params, props.check_interpenetration).items():
+            key = PART_CACHE.key(function, args)
+            value = PART_CACHE.cached(key)
+            if value is not None:
+                self.parts[key] = value
+            else:
+                self.pending[self.executor.submit(function, *args)] = (key, stage)
+        self.total = len(self.pending)
+        self.timer = context.window_manager.event_timer_add(BACKGROUND_POLL, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        context.window_manager.progress_begin(0, max(self.total, 1))
+        self.show_progress(context, None)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.finish(context)
+            self.report({'INFO'}, "Creature generation cancelled")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        for future in [future for future in self.pending if future.done()]:
+            key, part = self.pending.pop(future)
+            try:
+                self.parts[key] = future.result()
+            except Exception as error:
+                self.finish(context)
+                self.report({'ERROR'}, f"Generating the {part} failed: {error}")
+                return {'CANCELLED'}
+            PART_CACHE.add(key, self.parts[key])
+            self.show_progress(context, part)
+
+        if self.pending:
+            return {'PASS_THROUGH'}
+        self.finish(context)
+        if generate_creature(context, self.params, self.parts, label="generate_creature_background") is None:
+            return {'CANCELLED'}
+        return {'FINISHED'}
 
-        # Generate the body, neck, and tail
-        body_obj, top_center, bottom_center, last_center, top_radius = create_body(
-            length=props.body_length,
-            start_radius=props.body_start_radius,
-            max_radius=props.body_max_radius,
-            wave_amplitude=props.body_wave_amplitude,
-            wave_frequency=props.body_wave_frequency,
-            num_verts=props.body_num_verts
-        )
-        
-        neck_obj = create_neck(body_obj,
-            start_center=top_center,
-            start_radius=top_radius,
-            length=props.neck_length,
-            end_radius=props.neck_end_radius,
-            orientation='x',
-            wave_amplitude=props.neck_wave_amplitude,
-            wave_frequency=props.neck_wave_frequency,
-            num_verts=props.neck_num_verts
-        )
-
-        tail_obj = create_tail(body_obj,
-            start_center=bottom_center,
-            start_radius=top_radius,
-            length=props.tail_length,
-            tip_radius=props.tail_tip_radius,
-            wave_amplitude=props.tail_wave_amplitude,
-            wave_frequency=props.tail_wave_frequency,
-            num_verts=props.tail_num_verts
-        )
-        
-        if props.generate_legs:
-            thigh_height = props.thigh_height
-            shin_height = props.shin_height
-            foot_height = props.foot_height
-            thigh_radius = props.thigh_radius
-            shin_radius = props.shin_radius
-            foot_radius = props.foot_radius
-            leg_distance = 0.0  # Distance of the legs from the body's central axis along the Z-axis
-            leg_height = 0.0
-
-            attachment_points = visualize_leg_points(
-                body_obj,
-                num_legs=props.num_legs,
-                leg_distance=leg_distance,
-                leg_height=0.1,
-                thigh_height=thigh_height,
-                shin_height=shin_height,
-                foot_height=foot_height,
-                thigh_radius=thigh_radius,
-                shin_radius=shin_radius,
-                foot_radius=foot_radius,
-        )
-
-        # Attach head to the body
-        head_obj = create_and_attach_head(body_obj, props.body_length + props.neck_length, 
-                                           (props.head_radii_x, props.head_radii_y, props.head_radii_z))
-        
-        if props.generate_wings:
-            wing_attachment_points = visualize_wing_points(body_obj,
-                num_wings=props.num_wings, 
-                wing_distance= props.wing_distance, 
-                wing_length= props.wing_length, 
-                wing_thickness= props.wing_thickness, 
-                start_width = props.wing_start_width, 
-                end_width = props.wing_end_width
-            )
-
-        # Rotate objects as needed
-        body_obj.rotation_euler = (math.radians(-90), 0, 0)
-        neck_obj.rotation_euler = (math.radians(90), 0, 0)
-        tail_obj.rotation_euler = (math.radians(-180), 0, 0)
-        head_obj.rotation_euler = (0, 0, math.radians(90))
+    '''Report the number of parts ready in the status bar and on the cursor.'''
+    def show_progress(self, context, part):
+        done = self.total - len(self.pending)
+        text = f"Generating creature: {done} of {self.total} parts ready"
+        if part is not None:
+            text += f", last {part}"
+        context.workspace.status_text_set(text + " (Esc to cancel)")
+        context.window_manager.progress_update(done)
+
+    '''Stop the worker, dropping the parts it has not started, and clear the progress.'''
+    def finish(self, context):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        context.window_manager.event_timer_remove(self.timer)
+        context.window_manager.progress_end()
+        context.workspace.status_text_set(None)
+
+'''Generate a herd of herd_size creatures around the current settings, with the fields listed in herd_variations drawn
+from their ranges by a generator seeded with herd_seed. The geometry of the whole herd is computed over worker
+processes and loaded in one pass; members whose parts come out the same share meshes. The herd replaces the previous
+one in the "Herd" collection. Like Generate Creature it pushes no global undo step; a herd is made again from its seed.'''
+class OBJECT_OT_GenerateHerd(bpy.types.Operator):
+    bl_idname = "object.generate_herd"
+    bl_label = "Generate Herd"
+    bl_options = {'REGISTER'}
 
-        
-        
-        material_path = bpy.path.abspath(props.material_path)
-        material = create_painted_texture_material(material_path)
-        if material:
-            for obj in bpy.data.objects:
-                if obj.type == 'MESH':
-                    obj.data.materials.clear()
-                    obj.data.materials.append(material)
-        else:
-            print("Material creation failed or material path is invalid.")
+    def execute(self, context):
+        props = context.scene.creature_properties
+        try:
+            variations = parse_variations(props.herd_variations)
+        except ValueError as error:
+            print("Invalid herd variations:", error)
+            return {'CANCELLED'}
+
+        PROFILER.configure(enabled=props.profile_stages, trace_memory=props.profile_memory,
+                           log_path=bpy.path.abspath(props.profile_log_path) if props.profile_log_path else None)
+        PROFILER.begin("generate_herd")
+        configure_part_cache(props)
+
+        params = params_from_properties(props)
+        with PROFILER.stage("plan herd"):
+            members = herd_params(params, props.herd_size, props.herd_seed, variations, props.herd_steps)
+            plans, tasks = herd_plan(members, PART_CACHE)
+        with PROFILER.stage("herd geometry"):
+            parts = herd_geometry(tasks, PART_CACHE, props.herd_workers or None)
+
+        # The previous herd is removed in bulk before the new one is loaded
+        with PROFILER.stage("remove previous herd"):
+            herd = bpy.data.collections.get("Herd")
+            if herd is None:
+                herd = bpy.data.collections.new("Herd")
+                herd["creature_herd"] = True
+                context.scene.collection.children.link(herd)
+            for member in list(herd.children):
+                if "creature_collection" in member:
+                    remove_creature(member)
+
+        with PROFILER.stage("material"):
+            material = create_painted_texture_material(bpy.path.abspath(props.material_path))
+        with PROFILER.stage("load herd"):
+            build_herd(plans, parts, herd_offsets(len(members), props.herd_spacing), herd, material)
+        purge_texture_materials(keep=material)
+
+        PROFILER.end({"params": params, "herd_size": props.herd_size, "herd_variations": props.herd_variations})
+        print(f"Generated a herd of {len(members)} creatures with {len(tasks)} distinct meshes")
+        return {'FINISHED'}
+
+'''Start a new creature in a collection of its own, so the next Generate Creature leaves the current one as it is.'''
+class OBJECT_OT_NewCreature(bpy.types.Operator):
+    bl_idname = "object.new_creature"
+    bl_label = "New Creature"
 
+    def execute(self, context):
+        props = context.scene.creature_properties
+        # Blender numbers the name if "Creature" is taken
+        collection = bpy.data.collections.new("Creature")
+        collection["creature_collection"] = True
+        context.scene.collection.children.link(collection)
+        props.creature_collection = collection.name
+        return {'FINISHED'}
+
+'''Delete the creature of the current collection with its meshes and materials.'''
+class OBJECT_OT_DeleteCreature(bpy.types.Operator):
+    bl_idname = "object.delete_creature"
+    bl_label = "Delete Creature"
+
+    def execute(self, context):
+        props = context.scene.creature_properties
+        collection = bpy.data.collections.get(props.creature_collection)
+        if collection is None or "creature_collection" not in collection:
+            print("No creature collection named", props.creature_collection)
+            return {'CANCELLED'}
+        if herd_member(collection):
+            print(props.creature_collection, "is a herd member; Generate Herd replaces the whole herd")
+            return {'CANCELLED'}
+        remove_creature(collection)
+        return {'FINISHED'}
+
+'''Set the panel to a (collection, params) snapshot of HISTORY and generate the creature again from it. Its parts are
+served by the part cache, so stepping through the history is about as fast as an unchanged regeneration. The update
+callbacks are held off while the properties are set, so live preview does not rebuild the creature for each of them.'''
+def restore_snapshot(context, snapshot):
+    collection, params = snapshot
+    props = context.scene.creature_properties
+    LIVE_PREVIEW.restoring = True
+    try:
+        props.creature_collection = collection
+        for field, value in params.items():
+            setattr(props, field, value)
+    finally:
+        LIVE_PREVIEW.restoring = False
+    generate_creature(context, params, label="creature_history", record=False)
+
+'''Go back to the creature of the previous generation.'''
+class OBJECT_OT_CreatureUndo(bpy.types.Operator):
+    bl_idname = "object.creature_undo"
+    bl_label = "Undo Creature"
+
+    @classmethod
+    def poll(cls, context):
+        return HISTORY.can_undo()
+
+    def execute(self, context):
+        restore_snapshot(context, HISTORY.undo())
+        return {'FINISHED'}
+
+'''Go forward to the creature of the generation that was undone.'''
+class OBJECT_OT_CreatureRedo(bpy.types.Operator):
+    bl_idname = "object.creature_redo"
+    bl_label = "Redo Creature"
+
+    @classmethod
+    def poll(cls, context):
+        return HISTORY.can_redo()
+
+    def execute(self, context):
+        restore_snapshot(context, HISTORY.redo())
+        return {'FINISHED'}
+
+'''Empty the in-memory part cache and reset its statistics.'''
+class OBJECT_OT_ClearPartCache(bpy.types.Operator):
+    bl_idname = "object.clear_part_cache"
+    bl_label = "Clear Part Cache"
+
+    def execute(self, context):
+        PART_CACHE.clear()
         return {'FINISHED'}
 
 ''' Register the PropertyGroup and Panel classes to the Blender scene'''
@@ -772,6 +1399,13 @@ def register():
     bpy.utils.register_class(CreatureProperties)
     bpy.utils.register_class(CreaturePropertiesPanel)
     bpy.utils.register_class(OBJECT_OT_GenerateCreature)
+    bpy.utils.register_class(OBJECT_OT_GenerateCreatureBackground)
+    bpy.utils.register_class(OBJECT_OT_ClearPartCache)
+    bpy.utils.register_class(OBJECT_OT_NewCreature)
+    bpy.utils.register_class(OBJECT_OT_DeleteCreature)
+    bpy.utils.register_class(OBJECT_OT_GenerateHerd)
+    bpy.utils.register_class(OBJECT_OT_CreatureUndo)
+    bpy.utils.register_class(OBJECT_OT_CreatureRedo)
     bpy.types.Scene.creature_properties = bpy.props.PointerProperty(type=CreatureProperties)
 
 '''Unregisters the previous properties and appends it with new one in case there are changes to the properties and panel class'''
@@ -779,6 +1413,13 @@ def unregister():
     bpy.utils.unregister_class(CreatureProperties)
     bpy.utils.unregister_class(CreaturePropertiesPanel)
     bpy.utils.unregister_class(OBJECT_OT_GenerateCreature)
+    bpy.utils.unregister_class(OBJECT_OT_GenerateCreatureBackground)
+    bpy.utils.unregister_class(OBJECT_OT_ClearPartCache)
+    bpy.utils.unregister_class(OBJECT_OT_NewCreature)
+    bpy.utils.unregister_class(OBJECT_OT_DeleteCreature)
+    bpy.utils.unregister_class(OBJECT_OT_GenerateHerd)
+    bpy.utils.unregister_class(OBJECT_OT_CreatureUndo)
+    bpy.utils.unregister_class(OBJECT_OT_CreatureRedo)
     del bpy.types.Scene.creature_properties
 
 '''Main function to run the script.'''
@@ -0,0 +1,62 @@
+'''Tests of the background Generate Creature operator, run against the stand-in of blender_standin.py outside Blender.'''
+import functools
+import threading
+import time
+import types
+
+import blender_standin
+
+bpy, _ = blender_standin.install()
+
+import procedural_content_generation as pcg
+
+class Anything:
+    '''Window manager and workspace whose every method does nothing.'''
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+'''Run the operator to the end, polling it like Blender's event timer does.'''
+def run_background(context):
+    operator = pcg.OBJECT_OT_GenerateCreatureBackground()
+    operator.report = lambda *args: None
+    assert operator.invoke(context, None) == {'RUNNING_MODAL'}
+    timer = types.SimpleNamespace(type='TIMER', value=None)
+    while True:
+        result = operator.modal(context, timer)
+        if result != {'PASS_THROUGH'}:
+            return result
+        time.sleep(0.01)
+
+'''The ring savings and the interpenetration check run in the worker thread with the parts, not on the main thread
+once they are done.'''
+def test_reports_run_in_the_worker(monkeypatch):
+    if not hasattr(bpy.types.Scene, "creature_properties"):
+        pcg.register()
+    props = bpy.context.scene.creature_properties
+    props.creature_collection = "Creature"
+    props.live_preview = False
+    props.adaptive_rings = True
+    props.check_interpenetration = True
+    props.generate_legs = True
+    props.single_mesh = False
+    props.use_part_cache = True
+    props.body_length = 10.5
+    pcg.PART_CACHE.clear()
+
+    threads = []
+    for name in ("ring_savings", "part_collisions"):
+        function = getattr(pcg, name)
+        @functools.wraps(function)
+        def recorded(*args, function=function):
+            threads.append(threading.current_thread())
+            return function(*args)
+        monkeypatch.setattr(pcg, name, recorded)
+
+    context = types.SimpleNamespace(scene=bpy.context.scene, window_manager=Anything(), workspace=Anything(),
+                                    window=None)
+    assert run_background(context) == {'FINISHED'}
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    assert set(pcg.RING_REPORT) == {"Body", "Neck", "Tail", "Leg"}
+    assert pcg.COLLISION_REPORT
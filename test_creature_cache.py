@@ -0,0 +1,74 @@
+'''Tests of the part cache in creature_cache.py.'''
+import numpy as np
+import pytest
+
+from creature_cache import PartCache
+
+'''A part of n float64 vertices (n * 24 bytes) whose shape does not depend on name, with every call recorded in
+calls.'''
+def make_part(calls):
+    def part(name, n=10):
+        calls.append(name)
+        return np.zeros((n, 3)), np.zeros((0, 3), dtype=np.int32)
+    return part
+
+def test_hit_does_not_recompute():
+    calls = []
+    part = make_part(calls)
+    cache = PartCache()
+    first = cache.get(part, "a")
+    second = cache.get(part, "a")
+    assert second is first
+    assert calls == ["a"]
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Cached arrays are shared, so they are read-only
+    with pytest.raises(ValueError):
+        first[0][0, 0] = 1.0
+
+def test_least_recently_used_is_evicted():
+    calls = []
+    part = make_part(calls)
+    # Room for two parts of 10 vertices
+    cache = PartCache(max_bytes=2 * 10 * 24)
+    cache.get(part, "a")
+    cache.get(part, "b")
+    cache.get(part, "a")
+    cache.get(part, "c")
+    assert cache.size == cache.max_bytes
+    assert cache.cached(cache.key(part, ("b",))) is None
+    assert cache.cached(cache.key(part, ("a",))) is not None
+    assert cache.cached(cache.key(part, ("c",))) is not None
+    assert calls == ["a", "b", "c"]
+
+def test_shrinking_evicts():
+    part = make_part([])
+    cache = PartCache()
+    for name in "abcde":
+        cache.get(part, name)
+    cache.configure(max_bytes=2 * 10 * 24)
+    assert len(cache.entries) == 2
+    assert cache.cached(cache.key(part, ("e",))) is not None
+
+def test_disk_round_trip(tmp_path):
+    calls = []
+    part = make_part(calls)
+    verts, faces = PartCache(directory=str(tmp_path)).get(part, "a")
+
+    # A new cache, e.g. after a restart, finds the part on disk
+    cache = PartCache(directory=str(tmp_path))
+    loaded = cache.get(part, "a")
+    assert calls == ["a"]
+    assert cache.disk_hits == 1
+    assert np.array_equal(loaded[0], verts) and np.array_equal(loaded[1], faces)
+    assert loaded[1].dtype == faces.dtype
+    assert not loaded[0].flags.writeable
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_disabled_cache_always_computes():
+    calls = []
+    part = make_part(calls)
+    cache = PartCache(enabled=False)
+    cache.get(part, "a")
+    cache.get(part, "a")
+    assert calls == ["a", "a"]
+    assert cache.size == 0
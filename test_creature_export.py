@@ -0,0 +1,86 @@
+'''Tests of the streaming writers in creature_export.py: the files are read back and compared with the objects.'''
+import json
+import struct
+
+import numpy as np
+
+from creature_export import write_glb, write_ply
+from creature_geometry import DEFAULT_PARAMS, creature_objects, iter_creature_objects
+
+PARAMS = dict(DEFAULT_PARAMS, generate_legs=True, generate_wings=True, body_num_verts=16, neck_num_verts=16,
+              tail_num_verts=16, head_num_segments=16, head_num_rings=8)
+
+'''Vertices and faces of a binary PLY file written by write_ply.'''
+def read_ply(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    end = data.index(b"end_header\n") + len(b"end_header\n")
+    header = data[:end].decode("ascii").splitlines()
+    num_verts = int(next(line for line in header if line.startswith("element vertex")).split()[-1])
+    num_faces = int(next(line for line in header if line.startswith("element face")).split()[-1])
+    verts = np.frombuffer(data, dtype="<f4", count=num_verts * 3, offset=end).reshape(-1, 3)
+    faces = []
+    position = end + verts.nbytes
+    for _ in range(num_faces):
+        count = data[position]
+        faces.append(np.frombuffer(data, dtype="<i4", count=count, offset=position + 1))
+        position += 1 + 4 * count
+    assert position == len(data)
+    return verts, faces
+
+'''JSON document and binary chunk of a .glb file written by write_glb.'''
+def read_glb(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, length = struct.unpack_from("<III", data, 0)
+    assert (magic, version, length) == (0x46546C67, 2, len(data))
+    json_length, json_type = struct.unpack_from("<II", data, 12)
+    assert json_type == 0x4E4F534A
+    document = json.loads(data[20:20 + json_length])
+    binary_length, binary_type = struct.unpack_from("<II", data, 20 + json_length)
+    assert binary_type == 0x004E4942
+    return document, data[28 + json_length:28 + json_length + binary_length]
+
+def test_ply_matches_the_objects(tmp_path):
+    objects = creature_objects(PARAMS)
+    path = tmp_path / "creature.ply"
+    write_ply(str(path), iter_creature_objects(PARAMS))
+    verts, faces = read_ply(path)
+
+    assert np.allclose(verts, np.concatenate([object_verts for _, object_verts, _ in objects]), atol=1e-5)
+    expected = []
+    offset = 0
+    for _, object_verts, object_faces in objects:
+        expected.extend(object_faces + offset)
+        offset += len(object_verts)
+    assert len(faces) == len(expected)
+    assert all(np.array_equal(face, face_expected) for face, face_expected in zip(faces, expected))
+    # Only the output is left in the directory, the spools are gone
+    assert [entry.name for entry in tmp_path.iterdir()] == ["creature.ply"]
+
+def test_glb_matches_the_objects(tmp_path):
+    objects = creature_objects(PARAMS)
+    path = tmp_path / "creature.glb"
+    write_glb(str(path), iter_creature_objects(PARAMS))
+    document, binary = read_glb(path)
+
+    assert [node["name"] for node in document["nodes"]] == [name for name, _, _ in objects]
+    assert document["buffers"][0]["byteLength"] == len(binary)
+    for mesh, (_, verts, faces) in zip(document["meshes"], objects):
+        primitive = mesh["primitives"][0]
+        positions = document["accessors"][primitive["attributes"]["POSITION"]]
+        indices = document["accessors"][primitive["indices"]]
+        position_view = document["bufferViews"][positions["bufferView"]]
+        index_view = document["bufferViews"][indices["bufferView"]]
+        assert position_view["byteOffset"] % 4 == 0 and index_view["byteOffset"] % 4 == 0
+
+        stored = np.frombuffer(binary, dtype="<f4", count=positions["count"] * 3,
+                               offset=position_view["byteOffset"]).reshape(-1, 3)
+        # Blender's Z-up is glTF's Y-up
+        assert np.allclose(stored, verts[:, [0, 2, 1]] * (1, 1, -1), atol=1e-5)
+        assert np.allclose(positions["min"], stored.min(axis=0)) and np.allclose(positions["max"], stored.max(axis=0))
+
+        stored_indices = np.frombuffer(binary, dtype="<u4", count=indices["count"], offset=index_view["byteOffset"])
+        corners = faces.shape[1]
+        assert indices["count"] == len(faces) * 3 * (corners - 2)
+        assert stored_indices.max() == len(verts) - 1
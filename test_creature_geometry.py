@@ -0,0 +1,137 @@
+'''Tests of the Blender-free geometry in creature_geometry.py. Run with python -m pytest.'''
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from creature_geometry import (DEFAULT_PARAMS, bridge_rings, create_head_rings, create_rings, creature_lod_layout,
+                               part_geometry, part_spine, parts_layout, ring_savings, single_mesh_geometry,
+                               spine_deviation, triangle_allocation, triangulate, uniform_samples,
+                               wing_geometry)
+
+'''Edges of a face array, each as a sorted pair of vertex indices, once for every face using it.'''
+def edge_counts(faces):
+    faces = np.asarray(faces)
+    edges = np.stack((faces, np.roll(faces, -1, axis=1)), axis=-1).reshape(-1, 2)
+    return Counter(map(tuple, np.sort(edges, axis=1).tolist()))
+
+'''Signed volume enclosed by the triangles of a mesh, around the center of its vertices. Positive when the faces face
+outwards; the open ends of the tubes barely change it.'''
+def signed_volume(verts, faces):
+    verts = np.asarray(verts, dtype=np.float64)
+    triangles = verts[triangulate(np.asarray(faces))] - verts.mean(axis=0)
+    return np.einsum("ij,ij->i", triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])).sum() / 6
+
+def test_ring_and_face_counts():
+    centers = np.stack((np.linspace(0, 1, 7), np.zeros(7), np.zeros(7)), axis=-1)
+    verts = create_rings(centers, np.full(7, 0.5), 12)
+    faces = bridge_rings(7, 12)
+    assert verts.shape == (7 * 12, 3)
+    assert faces.shape == (2 * 6 * 12, 3)
+    assert faces.min() == 0 and faces.max() == len(verts) - 1
+    # Every vertex is on its ring
+    assert np.allclose(np.linalg.norm(verts[:, 1:], axis=1), 0.5)
+
+def test_bridge_rings_of_a_single_ring():
+    assert bridge_rings(1, 12).shape == (0, 3)
+
+def test_head_has_no_duplicate_vertices():
+    verts = create_head_rings((0, 0, 0), (1.0, 0.8, 1.2), 24, 12)
+    assert len(verts) == (12 - 1) * 24 + 2
+    assert len(np.unique(np.round(verts, 9), axis=0)) == len(verts)
+
+@pytest.mark.parametrize("rows, columns", [(2, 2), (20, 10), (7, 31)])
+def test_wing_is_closed(rows, columns):
+    verts, faces = wing_geometry(3.0, 1.0, 0.5, rows, columns, thickness=0.1)
+    counts = edge_counts(faces)
+    assert set(counts.values()) == {2}
+    assert np.asarray(faces).max() == len(verts) - 1
+
+@pytest.mark.parametrize("part", ["Body", "Neck", "Tail", "Leg", "Head", "Wing"])
+def test_part_faces_outwards(part):
+    verts, faces = part_geometry(part, dict(DEFAULT_PARAMS, generate_legs=True, generate_wings=True))
+    assert signed_volume(verts, faces) > 0
+
+'''The junction rings of a low detail creature are far apart compared to the weld distance; checking them must not
+search a grid of weld distance sized cells.'''
+@pytest.mark.parametrize("detail", [1.0, 0.25, 0.05])
+def test_single_mesh_at_low_detail(detail):
+    params = dict(DEFAULT_PARAMS, single_mesh=True, generate_legs=True, generate_wings=True)
+    verts, faces = single_mesh_geometry(params, detail)
+    assert len(verts) and len(faces)
+    assert faces.max() == len(verts) - 1
+
+'''A weld distance of 0 welds nothing: every junction is bridged and no vertex is merged.'''
+def test_single_mesh_without_welding():
+    params = dict(DEFAULT_PARAMS, single_mesh=True, weld_distance=0.0, cull_hidden=False)
+    welded = single_mesh_geometry(dict(params, weld_distance=0.001))[0]
+    verts, faces = single_mesh_geometry(params)
+    assert len(verts) > len(welded)
+    assert faces.max() == len(verts) - 1
+
+'''Only LOD0 of a single mesh creature is welded; its lower levels are the separate parts at lower detail.'''
+def test_single_mesh_lods_are_parts():
+    params = dict(DEFAULT_PARAMS, single_mesh=True, generate_lods=True, num_lods=3, lod_ratio=0.5, generate_legs=True)
+    layout = creature_lod_layout(params)
+    assert [entry[:2] for entry in layout if entry[4] == 1.0] == [("Creature", "Creature")]
+    parts = [name for name, *_ in parts_layout(params)]
+    for level in (1, 2):
+        entries = [entry for entry in layout if entry[4] == 0.5 ** level]
+        assert [entry[0] for entry in entries] == [f"{name}_LOD{level}" for name in parts]
+        assert all(entry[2] == "Creature" and entry[1] != "Creature" for entry in entries)
+
+'''Adaptive rings never need more rings than even spacing within the same tolerance, and even spacing stays within it.'''
+@pytest.mark.parametrize("tolerance", [0.001, 0.01, 0.05])
+def test_adaptive_rings_beat_even_spacing(tolerance):
+    params = dict(DEFAULT_PARAMS, generate_legs=True, ring_tolerance=tolerance)
+    report = ring_savings(params)
+    assert set(report) == {"Body", "Neck", "Tail", "Leg"}
+    for part, savings in report.items():
+        assert savings["max_deviation"] <= tolerance
+        assert savings["adaptive_rings"] <= savings["uniform_rings"] <= savings["fixed_rings"]
+        spine, steps, _ = part_spine(part, params)
+        assert spine_deviation(spine, steps, uniform_samples(spine, steps, tolerance)) <= tolerance
+    # The kinks of the leg are followed by a few adaptive rings, even spacing needs every ring
+    assert report["Leg"]["adaptive_rings"] < report["Leg"]["uniform_rings"]
+
+'''Welding merges the two junction rings of the neck and the tail into those of the body, and adds no faces.'''
+def test_single_mesh_weld_counts():
+    params = dict(DEFAULT_PARAMS, single_mesh=True, cull_hidden=False)
+    parts = [part_geometry(part, params) for _, part, _, _ in parts_layout(params)]
+    part_verts = sum(len(verts) for verts, _ in parts)
+    part_faces = sum(len(triangulate(faces)) for _, faces in parts)
+    ring_verts = params["body_num_verts"]
+    assert params["neck_num_verts"] == params["tail_num_verts"] == ring_verts
+
+    verts, faces = single_mesh_geometry(params)
+    assert len(verts) == part_verts - 2 * ring_verts
+    assert len(faces) == part_faces
+
+    # Without welding, both junctions are bridged with a strip of two triangles per ring vertex
+    verts, faces = single_mesh_geometry(dict(params, weld_distance=0.0))
+    assert len(verts) == part_verts
+    assert len(faces) == part_faces + 2 * 2 * ring_verts
+
+'''Culling removes the faces of the legs and the wings inside the body, and the vertices only they used.'''
+def test_single_mesh_cull_counts():
+    params = dict(DEFAULT_PARAMS, single_mesh=True, generate_legs=True, generate_wings=True)
+    kept_verts, kept_faces = single_mesh_geometry(dict(params, cull_hidden=False))
+    verts, faces = single_mesh_geometry(params)
+    assert 0 < len(kept_faces) - len(faces) < len(kept_faces) / 4
+    assert len(verts) < len(kept_verts)
+    assert np.array_equal(np.unique(faces), np.arange(len(verts)))
+
+'''The triangles of every part, legs and wings counted once per instance, stay within the budget and use most of it,
+and the generated parts have exactly the allocated triangles.'''
+@pytest.mark.parametrize("budget", [2000, 20000, 100000])
+def test_triangle_allocation_stays_within_budget(budget):
+    params = dict(DEFAULT_PARAMS, use_triangle_budget=True, triangle_budget=budget, generate_legs=True,
+                  generate_wings=True)
+    allocation = triangle_allocation(params)
+    total = sum(entry["total_triangles"] for entry in allocation.values())
+    assert 0.8 * budget < total <= budget
+    assert allocation["Leg"]["instances"] == params["num_legs"]
+    assert allocation["Wing"]["instances"] == params["num_wings"]
+    assert sum(entry["share"] for entry in allocation.values()) == pytest.approx(1.0)
+    for part, entry in allocation.items():
+        assert len(triangulate(part_geometry(part, params)[1])) == entry["triangles"]
@@ -0,0 +1,58 @@
+'''Tests of the herd planning in creature_herd.py.'''
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from creature_cache import PartCache
+from creature_geometry import DEFAULT_PARAMS, creature_lod_layout
+from creature_herd import herd_geometry, herd_offsets, herd_params, herd_plan, parse_variations
+
+BASE = dict(DEFAULT_PARAMS, generate_legs=True, body_num_verts=16, neck_num_verts=16, tail_num_verts=16,
+            head_num_segments=16, head_num_rings=8)
+
+def test_parse_variations():
+    assert parse_variations("body_length=12:8; num_legs = 2:6,") == {"body_length": (8.0, 12.0),
+                                                                      "num_legs": (2.0, 6.0)}
+    assert parse_variations("body_length=9") == {"body_length": (9.0, 9.0)}
+    with pytest.raises(ValueError):
+        parse_variations("generate_legs=0:1")
+    with pytest.raises(ValueError):
+        parse_variations("body_length=short:long")
+
+def test_herd_params_are_seeded_per_field():
+    members = herd_params(BASE, 20, 7, {"body_length": (8.0, 12.0), "num_legs": (2, 6)}, steps=4)
+    assert members == herd_params(BASE, 20, 7, {"body_length": (8.0, 12.0), "num_legs": (2, 6)}, steps=4)
+    assert {member["body_length"] for member in members} <= set(np.linspace(8.0, 12.0, 4).tolist())
+    assert {member["num_legs"] for member in members} <= set(range(2, 7))
+    assert all(isinstance(member["num_legs"], int) for member in members)
+    # Adding a field does not change the values drawn for the others
+    more = herd_params(BASE, 20, 7, {"body_length": (8.0, 12.0), "num_legs": (2, 6), "tail_length": (1.0, 3.0)}, 4)
+    assert [member["body_length"] for member in more] == [member["body_length"] for member in members]
+
+def test_herd_offsets_form_a_grid():
+    offsets = herd_offsets(5, 2.0)
+    assert offsets.tolist() == [[0, 0, 0], [2, 0, 0], [4, 0, 0], [0, 2, 0], [2, 2, 0]]
+
+def test_plan_shares_equal_parts():
+    members = herd_params(BASE, 12, 3, {"body_length": (8.0, 12.0)}, steps=2)
+    plans, tasks = herd_plan(members, PartCache(enabled=False))
+    assert len(plans) == len(members)
+    for params, entries in zip(members, plans):
+        assert [entry[0] for entry in entries] == [entry[0] for entry in creature_lod_layout(params)]
+    keys = {entry[-1] for entries in plans for entry in entries}
+    assert keys == set(tasks)
+    # The body, and the neck and tail that start at its radius, come in both lengths; the head and every leg of every
+    # member share one part each
+    assert {params["body_length"] for params in members} == {8.0, 12.0}
+    assert Counter(part for part, _, _ in tasks.values()) == {"Body": 2, "Neck": 2, "Tail": 2, "Head": 1, "Leg": 1}
+
+def test_herd_geometry_fills_the_cache():
+    members = herd_params(BASE, 3, 1, {"body_length": (8.0, 12.0)}, steps=2)
+    cache = PartCache()
+    plans, tasks = herd_plan(members, cache)
+    parts = herd_geometry(tasks, cache, workers=1)
+    assert set(parts) == set(tasks)
+    for key, (verts, faces, uvs, normals) in parts.items():
+        assert faces.max() < len(verts) and len(normals) == len(verts)
+        assert cache.cached(key) is parts[key]
@@ -0,0 +1,53 @@
+'''Tests of the generation history in creature_history.py.'''
+from creature_history import CreatureHistory
+
+def test_undo_and_redo():
+    history = CreatureHistory()
+    for length in (1.0, 2.0, 3.0):
+        history.push("Creature", {"body_length": length})
+    assert history.summary() == "Step 3 of 3"
+    assert not history.can_redo()
+
+    assert history.undo() == ("Creature", {"body_length": 2.0})
+    assert history.undo() == ("Creature", {"body_length": 1.0})
+    assert history.undo() is None
+    assert history.redo() == ("Creature", {"body_length": 2.0})
+    assert history.summary() == "Step 2 of 3"
+
+def test_push_after_undo_drops_the_undone_steps():
+    history = CreatureHistory()
+    history.push("Creature", {"body_length": 1.0})
+    history.push("Creature", {"body_length": 2.0})
+    history.undo()
+    history.push("Creature", {"body_length": 5.0})
+    assert not history.can_redo()
+    assert [params["body_length"] for _, params in history.steps] == [1.0, 5.0]
+
+def test_same_snapshot_is_recorded_once():
+    history = CreatureHistory()
+    params = {"body_length": 1.0}
+    history.push("Creature", params)
+    history.push("Creature", params)
+    assert len(history.steps) == 1
+    # Other collections are other snapshots
+    history.push("Creature.001", params)
+    assert len(history.steps) == 2
+
+def test_snapshot_is_a_copy():
+    history = CreatureHistory()
+    params = {"body_length": 1.0}
+    history.push("Creature", params)
+    params["body_length"] = 9.0
+    assert history.steps[0][1] == {"body_length": 1.0}
+
+def test_oldest_steps_are_dropped():
+    history = CreatureHistory(max_steps=3)
+    for length in range(5):
+        history.push("Creature", {"body_length": length})
+    assert [params["body_length"] for _, params in history.steps] == [2, 3, 4]
+    assert history.position == 2
+
+    history.configure(2)
+    assert [params["body_length"] for _, params in history.steps] == [3, 4]
+    assert history.undo() == ("Creature", {"body_length": 3})
+    assert history.undo() is None
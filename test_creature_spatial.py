@@ -0,0 +1,39 @@
+'''Tests of SpatialHash in creature_spatial.py against brute force searches.'''
+import numpy as np
+import pytest
+
+from creature_spatial import SpatialHash
+
+'''Random points in a box, with some exact duplicates, and queries inside and far outside it.'''
+def random_points(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(-1.0, 1.0, (500, 3)) * (2.0, 1.0, 0.5)
+    points = np.concatenate((points, points[:20]))
+    queries = np.concatenate((rng.uniform(-1.5, 1.5, (200, 3)), rng.uniform(-1.0, 1.0, (20, 3)) + 40.0))
+    return points, queries
+
+@pytest.mark.parametrize("cell_size, radius", [(0.1, 0.1), (0.05, 0.2), (0.5, 0.05)])
+def test_within_matches_brute_force(cell_size, radius):
+    points, queries = random_points(1)
+    found = set(zip(*(indices.tolist() for indices in SpatialHash(points, cell_size).within(queries, radius,
+                                                                                             chunk=50))))
+    distances = np.linalg.norm(queries[:, np.newaxis] - points[np.newaxis], axis=-1)
+    assert found == set(zip(*(indices.tolist() for indices in np.nonzero(distances < radius))))
+
+def test_within_zero_radius_finds_nothing():
+    points, queries = random_points(2)
+    query_index, point_index = SpatialHash(points, 0.1).within(points, 0.0)
+    assert len(query_index) == len(point_index) == 0
+
+@pytest.mark.parametrize("cell_size", [0.01, 0.1, 1.0])
+def test_nearest_matches_brute_force(cell_size):
+    points, queries = random_points(3)
+    index, distance = SpatialHash(points, cell_size).nearest(queries, chunk=50)
+    distances = np.linalg.norm(queries[:, np.newaxis] - points[np.newaxis], axis=-1)
+    assert np.allclose(distance, distances.min(axis=1))
+    assert np.allclose(distances[np.arange(len(queries)), index], distances.min(axis=1))
+
+def test_empty_index():
+    index, distance = SpatialHash(np.zeros((0, 3)), 0.1).nearest(np.ones((4, 3)))
+    assert index.tolist() == [-1] * 4 and np.all(np.isinf(distance))
+    assert len(SpatialHash(np.zeros((0, 3)), 0.1).within(np.ones((4, 3)), 1.0)[0]) == 0
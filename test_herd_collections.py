@@ -0,0 +1,32 @@
+'''Tests of the herd collections in Blender, run against the stand-in of blender_standin.py outside Blender.'''
+import blender_standin
+
+bpy, _ = blender_standin.install()
+
+import procedural_content_generation as pcg
+
+'''Generate Creature and Delete Creature leave the members of a herd alone, which are found from their own tag.'''
+def test_creature_operators_refuse_herd_members():
+    if not hasattr(bpy.types.Scene, "creature_properties"):
+        pcg.register()
+    context = bpy.context
+    props = context.scene.creature_properties
+    props.live_preview = False
+    props.herd_size = 3
+    props.herd_variations = "body_length=8:12"
+    props.creature_collection = "Creature"
+    assert pcg.OBJECT_OT_GenerateHerd().execute(context) == {'FINISHED'}
+    members = list(bpy.data.collections["Herd"].children)
+    assert len(members) == 3
+    assert all(member.name.startswith("HerdMember") and pcg.herd_member(member) for member in members)
+
+    assert pcg.OBJECT_OT_GenerateCreature().execute(context) == {'FINISHED'}
+    creature = bpy.data.collections[props.creature_collection]
+    assert not pcg.herd_member(creature)
+    assert creature not in members
+
+    props.creature_collection = members[0].name
+    assert pcg.OBJECT_OT_GenerateCreature().execute(context) == {'CANCELLED'}
+    assert pcg.OBJECT_OT_DeleteCreature().execute(context) == {'CANCELLED'}
+    assert list(bpy.data.collections["Herd"].children) == members
+    props.creature_collection = creature.name
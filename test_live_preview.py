@@ -0,0 +1,51 @@
+'''Tests of the live preview, run against the stand-in of blender_standin.py outside Blender.'''
+import blender_standin
+
+bpy, _ = blender_standin.install()
+
+import procedural_content_generation as pcg
+
+'''A scene with the creature properties registered and live preview on.'''
+def preview_scene(**fields):
+    if not hasattr(bpy.types.Scene, "creature_properties"):
+        pcg.register()
+    props = bpy.context.scene.creature_properties
+    props.creature_collection = "Creature"
+    props.live_preview = True
+    for field, value in fields.items():
+        setattr(props, field, value)
+    pcg.LIVE_PREVIEW.scene_name = bpy.context.scene.name
+    pcg.LIVE_PREVIEW.detail = None
+    return props
+
+'''A frame budget no proxy can meet drives the proxy detail down to PREVIEW_MIN_DETAIL, where the single mesh weld
+and culling must still finish. A budget of 0 ms is missed by every proxy, however fast.'''
+def test_single_mesh_proxy_over_budget():
+    props = preview_scene(single_mesh=True, generate_legs=True, generate_wings=True, preview_budget_ms=0.0,
+                          preview_refine_delay=60.0)
+    details = []
+    for _ in range(12):
+        pcg.LIVE_PREVIEW.needs_proxy = True
+        details.append(pcg.LIVE_PREVIEW.detail)
+        assert pcg.live_preview_tick() == pcg.PREVIEW_DEBOUNCE
+    assert details[1:] == sorted(details[1:], reverse=True)
+    assert pcg.LIVE_PREVIEW.detail == pcg.PREVIEW_MIN_DETAIL
+    collection = bpy.data.collections[props.creature_collection]
+    assert set(pcg.find_creature_objects(collection)) == {"Creature"}
+
+'''Stepping back through the history sets every property of the snapshot without starting the live preview.'''
+def test_history_undo_does_not_start_preview():
+    props = preview_scene(live_preview=False, single_mesh=False, body_length=10.0)
+    context = bpy.context
+    pcg.generate_creature(context)
+    props.body_length = 12.0
+    pcg.generate_creature(context)
+
+    props.live_preview = True
+    if bpy.app.timers.is_registered(pcg.live_preview_tick):
+        bpy.app.timers.unregister(pcg.live_preview_tick)
+    pcg.LIVE_PREVIEW.needs_proxy = False
+    assert pcg.OBJECT_OT_CreatureUndo().execute(context) == {'FINISHED'}
+    assert props.body_length == 10.0
+    assert not pcg.LIVE_PREVIEW.needs_proxy
+    assert not bpy.app.timers.is_registered(pcg.live_preview_tick)